@@ -0,0 +1,59 @@
+"""Delta sync: created_at/updated_at on reference tables, sync tombstones
+
+Revision ID: a5e9d2c47b10
+Revises: f1c8a3d5b7e2
+Create Date: 2026-10-18
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = "a5e9d2c47b10"
+down_revision = "f1c8a3d5b7e2"
+branch_labels = None
+depends_on = None
+
+TIMESTAMPED_TABLES = ("companies", "device_types", "warehouses", "employees")
+
+
+def upgrade() -> None:
+    # Existing rows get the migration time (UTC, like datetime.utcnow in the models)
+    for table in TIMESTAMPED_TABLES:
+        op.add_column(
+            table,
+            sa.Column("created_at", sa.DateTime(), nullable=False, server_default=sa.text("(now() at time zone 'utc')")),
+        )
+        op.add_column(
+            table,
+            sa.Column("updated_at", sa.DateTime(), nullable=False, server_default=sa.text("(now() at time zone 'utc')")),
+        )
+        op.alter_column(table, "created_at", server_default=None)
+        op.alter_column(table, "updated_at", server_default=None)
+
+    for table in TIMESTAMPED_TABLES + ("vendors", "assets"):
+        op.create_index(op.f(f"ix_{table}_updated_at"), table, ["updated_at"], unique=False)
+
+    op.create_table(
+        "sync_tombstones",
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("table_name", sa.String(length=32), nullable=False),
+        sa.Column("row_id", sa.Integer(), nullable=False),
+        sa.Column("deleted_at", sa.DateTime(), nullable=False),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.create_index(op.f("ix_sync_tombstones_id"), "sync_tombstones", ["id"], unique=False)
+    op.create_index("ix_sync_tombstones_deleted_at", "sync_tombstones", ["deleted_at", "table_name"], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index("ix_sync_tombstones_deleted_at", table_name="sync_tombstones")
+    op.drop_index(op.f("ix_sync_tombstones_id"), table_name="sync_tombstones")
+    op.drop_table("sync_tombstones")
+
+    for table in TIMESTAMPED_TABLES + ("vendors", "assets"):
+        op.drop_index(op.f(f"ix_{table}_updated_at"), table_name=table)
+
+    for table in TIMESTAMPED_TABLES:
+        op.drop_column(table, "updated_at")
+        op.drop_column(table, "created_at")
@@ -0,0 +1,34 @@
+"""Inventory results: one result per asset per session
+
+Revision ID: b8d4f6a21c93
+Revises: a5e9d2c47b10
+Create Date: 2026-10-18
+"""
+
+from alembic import op
+
+
+revision = "b8d4f6a21c93"
+down_revision = "a5e9d2c47b10"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # Keep the earliest result for duplicates that slipped past the old check-then-insert
+    op.execute(
+        """
+        DELETE FROM inventory_results r
+        USING inventory_results keep
+        WHERE r.session_id = keep.session_id
+          AND r.asset_id = keep.asset_id
+          AND r.id > keep.id;
+        """
+    )
+    op.create_unique_constraint(
+        "uq_inventory_results_session_asset", "inventory_results", ["session_id", "asset_id"]
+    )
+
+
+def downgrade() -> None:
+    op.drop_constraint("uq_inventory_results_session_asset", "inventory_results", type_="unique")
@@ -0,0 +1,93 @@
+"""Inventory sessions: materialized progress counters
+
+Revision ID: c9e1a7f3b482
+Revises: b8d4f6a21c93
+Create Date: 2026-10-18
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = "c9e1a7f3b482"
+down_revision = "b8d4f6a21c93"
+branch_labels = None
+depends_on = None
+
+COUNTER_COLUMNS = ("total_assets", "checked_count", "found_count", "not_found_count")
+
+
+def upgrade() -> None:
+    for name in COUNTER_COLUMNS:
+        op.add_column(
+            "inventory_sessions",
+            sa.Column(name, sa.Integer(), nullable=False, server_default="0"),
+        )
+        op.alter_column("inventory_sessions", name, server_default=None)
+
+    op.create_table(
+        "inventory_session_stats",
+        sa.Column("session_id", sa.Integer(), nullable=False),
+        sa.Column("device_type_code", sa.String(length=2), nullable=False),
+        sa.Column("total_assets", sa.Integer(), nullable=False),
+        sa.Column("checked_count", sa.Integer(), nullable=False),
+        sa.Column("found_count", sa.Integer(), nullable=False),
+        sa.Column("not_found_count", sa.Integer(), nullable=False),
+        sa.ForeignKeyConstraint(["session_id"], ["inventory_sessions.id"], ondelete="CASCADE"),
+        sa.ForeignKeyConstraint(["device_type_code"], ["device_types.code"]),
+        sa.PrimaryKeyConstraint("session_id", "device_type_code"),
+    )
+
+    # Backfill: totals are taken from the current assets (the creation-time snapshot is lost),
+    # counts from existing results within the session scope (no scope rows = all device types)
+    op.execute(
+        """
+        WITH scoped AS (
+            SELECT s.id AS session_id, a.device_type_code, a.id AS asset_id
+            FROM inventory_sessions s
+            JOIN assets a ON NOT EXISTS (
+                    SELECT 1 FROM inventory_session_device_types sd WHERE sd.session_id = s.id
+                ) OR a.device_type_code IN (
+                    SELECT sd.device_type_code FROM inventory_session_device_types sd WHERE sd.session_id = s.id
+                )
+        )
+        INSERT INTO inventory_session_stats
+            (session_id, device_type_code, total_assets, checked_count, found_count, not_found_count)
+        SELECT
+            scoped.session_id,
+            scoped.device_type_code,
+            COUNT(*),
+            COUNT(r.id),
+            COUNT(r.id) FILTER (WHERE r.found),
+            COUNT(r.id) FILTER (WHERE NOT r.found)
+        FROM scoped
+        LEFT JOIN inventory_results r
+            ON r.session_id = scoped.session_id AND r.asset_id = scoped.asset_id
+        GROUP BY scoped.session_id, scoped.device_type_code;
+        """
+    )
+    op.execute(
+        """
+        UPDATE inventory_sessions s
+        SET total_assets = t.total_assets,
+            checked_count = t.checked_count,
+            found_count = t.found_count,
+            not_found_count = t.not_found_count
+        FROM (
+            SELECT session_id,
+                   SUM(total_assets) AS total_assets,
+                   SUM(checked_count) AS checked_count,
+                   SUM(found_count) AS found_count,
+                   SUM(not_found_count) AS not_found_count
+            FROM inventory_session_stats
+            GROUP BY session_id
+        ) t
+        WHERE t.session_id = s.id;
+        """
+    )
+
+
+def downgrade() -> None:
+    op.drop_table("inventory_session_stats")
+    for name in reversed(COUNTER_COLUMNS):
+        op.drop_column("inventory_sessions", name)
@@ -0,0 +1,29 @@
+"""Movements: composite indexes for asset and location history
+
+Revision ID: d2a8c5e7f914
+Revises: c9e1a7f3b482
+Create Date: 2026-10-18
+"""
+
+from alembic import op
+
+
+revision = "d2a8c5e7f914"
+down_revision = "c9e1a7f3b482"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_index("ix_movements_asset_moved_at", "movements", ["asset_id", "moved_at"])
+    op.create_index("ix_movements_to_location_moved_at", "movements", ["to_type", "to_id", "moved_at"])
+    op.create_index("ix_movements_from_location_moved_at", "movements", ["from_type", "from_id", "moved_at"])
+    # Covered by the (asset_id, moved_at) prefix
+    op.drop_index("ix_movements_asset_id", table_name="movements")
+
+
+def downgrade() -> None:
+    op.create_index("ix_movements_asset_id", "movements", ["asset_id"])
+    op.drop_index("ix_movements_from_location_moved_at", table_name="movements")
+    op.drop_index("ix_movements_to_location_moved_at", table_name="movements")
+    op.drop_index("ix_movements_asset_moved_at", table_name="movements")
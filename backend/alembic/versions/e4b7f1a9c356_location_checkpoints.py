@@ -0,0 +1,50 @@
+"""Location checkpoints for point-in-time asset locations
+
+Revision ID: e4b7f1a9c356
+Revises: d2a8c5e7f914
+Create Date: 2026-10-18
+"""
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+revision = "e4b7f1a9c356"
+down_revision = "d2a8c5e7f914"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "location_checkpoints",
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("taken_at", sa.DateTime(), nullable=False),
+        sa.Column("asset_count", sa.Integer(), nullable=False),
+        sa.Column("created_at", sa.DateTime(), nullable=False),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.create_index(op.f("ix_location_checkpoints_id"), "location_checkpoints", ["id"], unique=False)
+    op.create_index(op.f("ix_location_checkpoints_taken_at"), "location_checkpoints", ["taken_at"], unique=True)
+
+    op.create_table(
+        "location_checkpoint_entries",
+        sa.Column("checkpoint_id", sa.Integer(), nullable=False),
+        sa.Column("asset_id", sa.Integer(), nullable=False),
+        # The locationtype enum already exists (assets, movements)
+        sa.Column("location_type", postgresql.ENUM("employee", "warehouse", name="locationtype", create_type=False), nullable=False),
+        sa.Column("location_id", sa.Integer(), nullable=False),
+        sa.ForeignKeyConstraint(["checkpoint_id"], ["location_checkpoints.id"], ondelete="CASCADE"),
+        sa.PrimaryKeyConstraint("checkpoint_id", "asset_id"),
+    )
+    # Replaying movements forward from a checkpoint
+    op.create_index("ix_movements_moved_at", "movements", ["moved_at"])
+
+
+def downgrade() -> None:
+    op.drop_index("ix_movements_moved_at", table_name="movements")
+    op.drop_table("location_checkpoint_entries")
+    op.drop_index(op.f("ix_location_checkpoints_taken_at"), table_name="location_checkpoints")
+    op.drop_index(op.f("ix_location_checkpoints_id"), table_name="location_checkpoints")
+    op.drop_table("location_checkpoints")
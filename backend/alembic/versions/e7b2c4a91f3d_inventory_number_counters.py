@@ -0,0 +1,43 @@
+"""Inventory number counters per company + device type prefix
+
+Revision ID: e7b2c4a91f3d
+Revises: d4d6d9b6c6a8
+Create Date: 2026-10-18
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = "e7b2c4a91f3d"
+down_revision = "d4d6d9b6c6a8"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "inventory_number_counters",
+        sa.Column("company_code", sa.String(length=3), nullable=False),
+        sa.Column("device_type_code", sa.String(length=2), nullable=False),
+        sa.Column("last_number", sa.Integer(), nullable=False),
+        sa.ForeignKeyConstraint(["company_code"], ["companies.code"]),
+        sa.ForeignKeyConstraint(["device_type_code"], ["device_types.code"]),
+        sa.PrimaryKeyConstraint("company_code", "device_type_code"),
+    )
+
+    # Seed counters from existing assets (max numeric suffix per prefix)
+    op.execute(
+        """
+        INSERT INTO inventory_number_counters (company_code, device_type_code, last_number)
+        SELECT company_code, device_type_code, MAX(CAST(split_part(inventory_number, '/', 2) AS INTEGER))
+        FROM assets
+        WHERE inventory_number LIKE company_code || '-' || device_type_code || '/%'
+          AND split_part(inventory_number, '/', 2) ~ '^[0-9]{4}$'
+        GROUP BY company_code, device_type_code;
+        """
+    )
+
+
+def downgrade() -> None:
+    op.drop_table("inventory_number_counters")
@@ -0,0 +1,34 @@
+"""Assets: pg_trgm GIN indexes for substring / similarity search
+
+Revision ID: f1c8a3d5b7e2
+Revises: e7b2c4a91f3d
+Create Date: 2026-10-18
+"""
+
+from alembic import op
+
+
+revision = "f1c8a3d5b7e2"
+down_revision = "e7b2c4a91f3d"
+branch_labels = None
+depends_on = None
+
+SEARCH_COLUMNS = ("inventory_number", "serial_number", "vendor", "model")
+
+
+def upgrade() -> None:
+    op.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+    for column in SEARCH_COLUMNS:
+        op.create_index(
+            f"ix_assets_{column}_trgm",
+            "assets",
+            [column],
+            unique=False,
+            postgresql_using="gin",
+            postgresql_ops={column: "gin_trgm_ops"},
+        )
+
+
+def downgrade() -> None:
+    for column in SEARCH_COLUMNS:
+        op.drop_index(f"ix_assets_{column}_trgm", table_name="assets")
@@ -1,8 +1,8 @@
 from typing import Generator, Optional
-from fastapi import Depends, HTTPException, status
+from fastapi import Depends, HTTPException, Query, status
 from fastapi.security import OAuth2PasswordBearer
 from sqlalchemy.orm import Session
-from app.database import get_db
+from app.database import DbRunner, get_db, get_db_runner
 from app.models.user import User, UserRole
 from app.core.security import decode_access_token
 
@@ -13,6 +13,18 @@ def get_current_user(
     token: str = Depends(oauth2_scheme),
     db: Session = Depends(get_db)
 ) -> User:
+    return _user_from_token(db, token)
+
+
+def get_current_user_from_query(
+    token: str = Query(..., description="Access token (EventSource cannot send Authorization header)"),
+    db: Session = Depends(get_db)
+) -> User:
+    """Аутентификация по токену в query string — для SSE (EventSource)"""
+    return _user_from_token(db, token)
+
+
+def _user_from_token(db: Session, token: str) -> User:
     credentials_exception = HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
         detail="Could not validate credentials",
@@ -37,6 +49,14 @@ def get_current_active_user(
     return current_user
 
 
+async def get_current_active_user_async(
+    token: str = Depends(oauth2_scheme),
+    runner: DbRunner = Depends(get_db_runner)
+) -> User:
+    """Для async-эндпоинтов: тот же пользователь, но без занятого на запрос потока"""
+    return await runner.run(_user_from_token, token)
+
+
 def require_admin(
     current_user: User = Depends(get_current_active_user)
 ) -> User:
@@ -1,5 +1,5 @@
 from fastapi import APIRouter
-from app.api.v1 import auth, assets, movements, inventory, print, reports, references
+from app.api.v1 import auth, assets, movements, inventory, print, reports, references, sync
 
 api_router = APIRouter()
 
@@ -10,4 +10,4 @@ api_router.include_router(inventory.router, prefix="/inventory", tags=["inventor
 api_router.include_router(print.router, prefix="/print", tags=["print"])
 api_router.include_router(reports.router, prefix="/reports", tags=["reports"])
 api_router.include_router(references.router, prefix="/references", tags=["references"])
-
+api_router.include_router(sync.router, prefix="/sync", tags=["sync"])
@@ -1,34 +1,66 @@
-from typing import List, Optional
-from fastapi import APIRouter, Depends, HTTPException, status, Query
+from typing import List, Literal, Optional
+from fastapi import APIRouter, Depends, HTTPException, status, Query, UploadFile, File, Response
 from sqlalchemy.orm import Session
-from sqlalchemy import or_
-from app.database import get_db
+from app.database import DbRunner, get_db, get_db_runner
 from app.models.asset import Asset, LocationType
-from app.models.vendor import Vendor
-from app.models.company import Company
-from app.models.device_type import DeviceType
-from app.models.employee import Employee
-from app.models.warehouse import Warehouse
-from app.schemas.asset import Asset as AssetSchema, AssetCreate, AssetUpdate
-from app.api.deps import get_current_active_user
+from app.models.movement import Movement
+from app.schemas.asset import Asset as AssetSchema, AssetCreate, AssetUpdate, AssetImportResult
+from app.api.deps import get_current_active_user, get_current_active_user_async
 from app.core.inventory_number import generate_inventory_number
+from app.core.asset_import import READ_ERRORS, import_assets, iter_csv_rows, iter_xlsx_rows
+from app.core.asset_search import asset_search_filter, asset_search_rank
+from app.core.reference_cache import get_reference
+from app.core.sync import record_tombstone
+from app.core.asset_summary import mark_assets_changed
+from app.core.pagination import encode_cursor, decode_cursor, estimated_row_count, count_rows
 
 router = APIRouter()
 
 
 @router.get("/", response_model=List[AssetSchema])
-def read_assets(
+async def read_assets(
+    response: Response,
     skip: int = Query(0, ge=0),
     limit: int = Query(100, ge=1, le=1000),
+    cursor: Optional[str] = None,
+    include_total: bool = False,
     device_type_code: Optional[str] = None,
     location_type: Optional[LocationType] = None,
     location_id: Optional[int] = None,
     search: Optional[str] = None,
-    db: Session = Depends(get_db),
-    current_user = Depends(get_current_active_user)
+    search_mode: Literal["contains", "ranked"] = "contains",
+    runner: DbRunner = Depends(get_db_runner),
+    current_user = Depends(get_current_active_user_async)
 ):
+    """
+    Список активов по инвентарному номеру.
+    Постраничный обход — по курсору из заголовка X-Next-Cursor (skip оставлен для совместимости).
+    include_total=true добавляет X-Total-Count; без фильтров это оценка по статистике Postgres.
+    search_mode=ranked сортирует результаты поиска по похожести и находит опечатки (Postgres).
+    """
+    # Без commit атрибуты не истекают — ORM-объекты можно сериализовать вне run()
+    return await runner.run(
+        _read_assets, response, skip, limit, cursor, include_total,
+        device_type_code, location_type, location_id, search, search_mode,
+    )
+
+
+def _read_assets(
+    db: Session,
+    response: Response,
+    skip: int,
+    limit: int,
+    cursor: Optional[str],
+    include_total: bool,
+    device_type_code: Optional[str],
+    location_type: Optional[LocationType],
+    location_id: Optional[int],
+    search: Optional[str],
+    search_mode: str,
+) -> List[Asset]:
     query = db.query(Asset)
-    
+    filtered = bool(device_type_code or location_type or search)
+
     if device_type_code:
         query = query.filter(Asset.device_type_code == device_type_code)
     
@@ -37,16 +69,38 @@ def read_assets(
         if location_id:
             query = query.filter(Asset.location_id == location_id)
     
+    ranked = bool(search) and search_mode == "ranked"
     if search:
-        search_filter = or_(
-            Asset.inventory_number.ilike(f"%{search}%"),
-            Asset.serial_number.ilike(f"%{search}%"),
-            Asset.vendor.ilike(f"%{search}%"),
-            Asset.model.ilike(f"%{search}%")
-        )
-        query = query.filter(search_filter)
-    
-    assets = query.offset(skip).limit(limit).all()
+        query = query.filter(asset_search_filter(db, search, fuzzy=ranked))
+
+    if include_total:
+        total = None if filtered else estimated_row_count(db, Asset.__tablename__)
+        if total is None:
+            total = count_rows(query)
+        response.headers["X-Total-Count"] = str(total)
+
+    if ranked:
+        # Порядок по релевантности не годится для курсора — страницы через skip
+        query = query.order_by(asset_search_rank(db, search).desc(), Asset.inventory_number.asc())
+        return query.offset(skip).limit(limit).all()
+
+    # inventory_number уникален, поэтому одного его достаточно как ключа страницы
+    query = query.order_by(Asset.inventory_number.asc())
+    if cursor:
+        try:
+            (last_inventory_number,) = decode_cursor(cursor, (str,))
+        except ValueError:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Invalid cursor"
+            )
+        query = query.filter(Asset.inventory_number > last_inventory_number)
+    elif skip:
+        query = query.offset(skip)
+
+    assets = query.limit(limit).all()
+    if len(assets) == limit:
+        response.headers["X-Next-Cursor"] = encode_cursor([assets[-1].inventory_number])
     return assets
 
 
@@ -88,23 +142,21 @@ def create_asset(
     current_user = Depends(get_current_active_user)
 ):
     # Validate company exists
-    company = db.query(Company).filter(Company.code == asset_in.company_code).first()
-    if not company:
+    if not get_reference(db, "companies", asset_in.company_code):
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail=f"Company with code {asset_in.company_code} not found"
         )
     
     # Validate device type exists
-    device_type = db.query(DeviceType).filter(DeviceType.code == asset_in.device_type_code).first()
-    if not device_type:
+    if not get_reference(db, "device_types", asset_in.device_type_code):
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail=f"Device type with code {asset_in.device_type_code} not found"
         )
     
     # Validate vendor exists
-    vendor = db.query(Vendor).filter(Vendor.id == asset_in.vendor_id).first()
+    vendor = get_reference(db, "vendors", asset_in.vendor_id)
     if not vendor:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
@@ -120,15 +172,13 @@ def create_asset(
     
     # Validate location exists
     if asset_in.location_type == LocationType.employee:
-        employee = db.query(Employee).filter(Employee.id == asset_in.location_id).first()
-        if not employee:
+        if not get_reference(db, "employees", asset_in.location_id):
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST,
                 detail=f"Employee with id {asset_in.location_id} not found"
             )
     elif asset_in.location_type == LocationType.warehouse:
-        warehouse = db.query(Warehouse).filter(Warehouse.id == asset_in.location_id).first()
-        if not warehouse:
+        if not get_reference(db, "warehouses", asset_in.location_id):
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST,
                 detail=f"Warehouse with id {asset_in.location_id} not found"
@@ -148,17 +198,50 @@ def create_asset(
         inventory_number=inventory_number,
         serial_number=asset_in.serial_number,
         vendor_id=asset_in.vendor_id,
-        vendor=vendor.name,
+        vendor=vendor["name"],
         model=asset_in.model,
         location_type=asset_in.location_type,
         location_id=asset_in.location_id
     )
     db.add(db_asset)
+    mark_assets_changed(db)
     db.commit()
     db.refresh(db_asset)
     return db_asset
 
 
+@router.post("/bulk", response_model=AssetImportResult)
+def bulk_import_assets(
+    file: UploadFile = File(..., description="CSV or XLSX with a header row"),
+    db: Session = Depends(get_db),
+    current_user = Depends(get_current_active_user)
+):
+    """
+    Массовый импорт активов из CSV/XLSX.
+    Колонки: company_code, device_type_code, serial_number, vendor_id (или vendor), model, location_type, location_id
+    """
+    filename = (file.filename or "").lower()
+    if filename.endswith(".csv"):
+        rows = iter_csv_rows(file.file)
+    elif filename.endswith(".xlsx"):
+        rows = iter_xlsx_rows(file.file)
+    else:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Unsupported file format. Upload .csv or .xlsx"
+        )
+
+    try:
+        return import_assets(db, rows)
+    except READ_ERRORS as e:
+        # Файл не читается с самого начала (заголовок, повреждённый xlsx и т.п.) — ничего не записано
+        db.rollback()
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Cannot read file: {e}"
+        )
+
+
 @router.put("/{asset_id}", response_model=AssetSchema)
 def update_asset(
     asset_id: int,
@@ -176,15 +259,13 @@ def update_asset(
     # Validate location if provided
     if asset_in.location_type and asset_in.location_id:
         if asset_in.location_type == LocationType.employee:
-            employee = db.query(Employee).filter(Employee.id == asset_in.location_id).first()
-            if not employee:
+            if not get_reference(db, "employees", asset_in.location_id):
                 raise HTTPException(
                     status_code=status.HTTP_400_BAD_REQUEST,
                     detail=f"Employee with id {asset_in.location_id} not found"
                 )
         elif asset_in.location_type == LocationType.warehouse:
-            warehouse = db.query(Warehouse).filter(Warehouse.id == asset_in.location_id).first()
-            if not warehouse:
+            if not get_reference(db, "warehouses", asset_in.location_id):
                 raise HTTPException(
                     status_code=status.HTTP_400_BAD_REQUEST,
                     detail=f"Warehouse with id {asset_in.location_id} not found"
@@ -200,23 +281,35 @@ def update_asset(
 
     # Validate vendor if provided; keep vendor string in sync
     if asset_in.vendor_id is not None and asset_in.vendor_id != asset.vendor_id:
-        vendor = db.query(Vendor).filter(Vendor.id == asset_in.vendor_id).first()
+        vendor = get_reference(db, "vendors", asset_in.vendor_id)
         if not vendor:
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST,
                 detail=f"Vendor with id {asset_in.vendor_id} not found"
             )
-        asset.vendor_id = vendor.id
-        asset.vendor = vendor.name
+        asset.vendor_id = vendor["id"]
+        asset.vendor = vendor["name"]
 
     # Update fields
+    previous_location = (asset.location_type, asset.location_id)
     update_data = asset_in.dict(exclude_unset=True)
     for field, value in update_data.items():
         if field in ("vendor_id", "vendor"):
             # vendor_id handled above, vendor is derived from Vendor
             continue
         setattr(asset, field, value)
+
+    # Смена места через редактирование тоже попадает в журнал перемещений (история по датам)
+    if (asset.location_type, asset.location_id) != previous_location:
+        db.add(Movement(
+            asset_id=asset.id,
+            from_type=previous_location[0],
+            from_id=previous_location[1],
+            to_type=asset.location_type,
+            to_id=asset.location_id,
+        ))
     
+    mark_assets_changed(db)
     db.commit()
     db.refresh(asset)
     return asset
@@ -235,6 +328,8 @@ def delete_asset(
             detail="Asset not found"
         )
     db.delete(asset)
+    record_tombstone(db, "assets", asset.id)
+    mark_assets_changed(db)
     db.commit()
     return None
 
@@ -1,27 +1,73 @@
-from typing import List
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
-from sqlalchemy import func
+import asyncio
+import json
+import logging
+from typing import List, Optional
+from fastapi import APIRouter, Depends, HTTPException, Query, Response, status
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import StreamingResponse
+from sqlalchemy.orm import Session, contains_eager
+from sqlalchemy import exists, func
 from datetime import datetime
-from app.database import get_db
+from app.database import DbRunner, SessionLocal, get_db, get_db_runner
 from app.models.inventory_session import InventorySession
 from app.models.inventory_session_device_type import InventorySessionDeviceType
 from app.models.inventory_result import InventoryResult
-from app.models.asset import Asset
-from app.models.device_type import DeviceType
+from app.models.inventory_session_stats import InventorySessionStats
+from app.models.asset import Asset, LocationType
 from app.schemas.inventory import (
     InventorySession as InventorySessionSchema,
     InventorySessionCreate,
     InventoryResult as InventoryResultSchema,
     InventoryResultCreate,
+    InventoryResultBatch,
+    InventoryResultBatchResponse,
+    InventoryScanRequest,
+    InventoryScanResult,
     InventoryProgress,
+    InventoryDeviceTypeProgress,
     InventoryCheckedItem,
+    InventoryCheckedRow,
+    InventoryRemainingLocation,
 )
 from app.schemas.asset import Asset as AssetSchema
-from app.api.deps import get_current_active_user
+from app.api.deps import (
+    get_current_active_user,
+    get_current_active_user_async,
+    get_current_user_from_query,
+    require_admin,
+)
+from app.core.pagination import (
+    decode_cursor,
+    decode_timestamp_cursor,
+    encode_cursor,
+    encode_timestamp_cursor,
+    older_than,
+)
+from app.core.reference_cache import get_reference, get_snapshot
+from app.core.inventory_results import (
+    record_results,
+    record_scan,
+    CREATED,
+    DUPLICATE,
+    NOT_FOUND,
+    OUT_OF_SCOPE,
+    SESSION_COMPLETED,
+)
+from app.core.inventory_state import get_session_state, mark_session_changed
+from app.core.inventory_number import extract_inventory_number
+from app.core.inventory_counters import snapshot_session_totals, rebuild_session_counters, session_progress
+from app.core.inventory_events import (
+    SSE_KEEPALIVE_SECONDS,
+    SSE_RETRY_MS,
+    add_subscriber,
+    publish_session_completed,
+    remove_subscriber,
+)
 
 router = APIRouter()
 
+logger = logging.getLogger(__name__)
+
 
 @router.post("/sessions", response_model=InventorySessionSchema, status_code=status.HTTP_201_CREATED)
 def create_inventory_session(
@@ -33,23 +79,20 @@ def create_inventory_session(
     codes: List[str] = []
     if session_in.device_type_codes:
         codes = [c.strip() for c in session_in.device_type_codes if c and c.strip()]
-        existing_codes = {c for (c,) in db.query(DeviceType.code).filter(DeviceType.code.in_(codes)).all()}
-        missing = [c for c in codes if c not in existing_codes]
+        missing = [c for c in codes if not get_reference(db, "device_types", c)]
         if missing:
             raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=f"Unknown device types: {', '.join(missing)}")
 
     session = InventorySession(
         description=session_in.description
     )
+    for code in sorted(set(codes)):
+        session.device_type_scopes.append(InventorySessionDeviceType(device_type_code=code))
     db.add(session)
+    db.flush()
+    snapshot_session_totals(db, session)
     db.commit()
     db.refresh(session)
-
-    if codes:
-        for code in sorted(set(codes)):
-            db.add(InventorySessionDeviceType(session_id=session.id, device_type_code=code))
-        db.commit()
-        db.refresh(session)
     return session
 
 
@@ -95,19 +138,15 @@ def complete_inventory_session(
             detail="Session already completed"
         )
     session.completed_at = datetime.utcnow()
+    mark_session_changed(db, session_id)
+    publish_session_completed(db, session_id)
     db.commit()
     db.refresh(session)
     return session
 
 
-@router.post("/sessions/{session_id}/results", response_model=InventoryResultSchema, status_code=status.HTTP_201_CREATED)
-def add_inventory_result(
-    session_id: int,
-    result_in: InventoryResultCreate,
-    db: Session = Depends(get_db),
-    current_user = Depends(get_current_active_user)
-):
-    # Validate session exists and not completed
+def get_open_session(db: Session, session_id: int) -> InventorySession:
+    """Сессия для записи результатов: 404, если нет, 400, если уже завершена"""
     session = db.query(InventorySession).filter(InventorySession.id == session_id).first()
     if not session:
         raise HTTPException(
@@ -119,45 +158,120 @@ def add_inventory_result(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Cannot add results to completed session"
         )
-    
-    # Validate asset exists
-    asset = db.query(Asset).filter(Asset.id == result_in.asset_id).first()
-    if not asset:
+    return session
+
+
+@router.post("/sessions/{session_id}/results", response_model=InventoryResultSchema, status_code=status.HTTP_201_CREATED)
+async def add_inventory_result(
+    session_id: int,
+    result_in: InventoryResultCreate,
+    runner: DbRunner = Depends(get_db_runner),
+    current_user = Depends(get_current_active_user_async)
+):
+    return await runner.run(_add_inventory_result, session_id, result_in)
+
+
+def _add_inventory_result(db: Session, session_id: int, result_in: InventoryResultCreate) -> InventoryResultSchema:
+    session = get_open_session(db, session_id)
+    (outcome,) = record_results(db, session, [result_in])
+
+    if outcome.status == NOT_FOUND:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Asset not found"
         )
-
-    # Enforce session scope if set (empty scope = all)
-    scope_codes = session.device_type_codes
-    if scope_codes and asset.device_type_code not in scope_codes:
+    if outcome.status == OUT_OF_SCOPE:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Asset is not in this inventory session scope"
         )
-    
-    # Check if result already exists for this asset in this session
-    existing = db.query(InventoryResult).filter(
-        InventoryResult.session_id == session_id,
-        InventoryResult.asset_id == result_in.asset_id
-    ).first()
-    if existing:
+    if outcome.status == DUPLICATE:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Result already exists for this asset in this session"
         )
-    
-    result = InventoryResult(
+    return InventoryResultSchema.model_validate(db.get(InventoryResult, outcome.result_id))
+
+
+@router.post("/sessions/{session_id}/results/batch", response_model=InventoryResultBatchResponse)
+async def add_inventory_results_batch(
+    session_id: int,
+    batch_in: InventoryResultBatch,
+    runner: DbRunner = Depends(get_db_runner),
+    current_user = Depends(get_current_active_user_async)
+):
+    """
+    Пакетная отправка сканов: все элементы проверяются и вставляются за один проход.
+    Ошибка одного элемента не отменяет остальные — итог по каждому в items.
+    """
+    outcomes = await runner.run(
+        lambda db: record_results(db, get_open_session(db, session_id), batch_in.items)
+    )
+    created = sum(1 for o in outcomes if o.status == CREATED)
+    duplicates = sum(1 for o in outcomes if o.status == DUPLICATE)
+    return InventoryResultBatchResponse(
         session_id=session_id,
-        asset_id=result_in.asset_id,
-        found=result_in.found,
-        actual_location_type=result_in.actual_location_type,
-        actual_location_id=result_in.actual_location_id
+        created=created,
+        duplicates=duplicates,
+        rejected=len(outcomes) - created - duplicates,
+        items=outcomes,
     )
-    db.add(result)
-    db.commit()
-    db.refresh(result)
-    return result
+
+
+@router.post("/sessions/{session_id}/scan", response_model=InventoryScanResult)
+async def scan_inventory_asset(
+    session_id: int,
+    scan_in: InventoryScanRequest,
+    runner: DbRunner = Depends(get_db_runner),
+    current_user = Depends(get_current_active_user_async)
+):
+    """
+    Скан QR кода в сессии: поиск актива по инвентарному номеру и запись результата
+    в одной транзакции. Повторный скан возвращает status=duplicate.
+    """
+    return await runner.run(_scan_inventory_asset, session_id, scan_in)
+
+
+def _scan_inventory_asset(db: Session, session_id: int, scan_in: InventoryScanRequest) -> InventoryScanResult:
+    state = get_session_state(db, session_id)
+    if state is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Inventory session not found"
+        )
+    if state.completed:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Cannot add results to completed session"
+        )
+
+    inventory_number = extract_inventory_number(scan_in.payload)
+    asset = db.query(Asset).filter(Asset.inventory_number == inventory_number).first()
+    if not asset:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Asset {inventory_number} not found"
+        )
+    # Сериализуем до commit, чтобы не перечитывать актив после него
+    asset_out = AssetSchema.model_validate(asset)
+
+    outcome, result_id = record_scan(
+        db, state, asset,
+        found=scan_in.found,
+        actual_location_type=scan_in.actual_location_type,
+        actual_location_id=scan_in.actual_location_id,
+    )
+    if outcome == OUT_OF_SCOPE:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Asset is not in this inventory session scope"
+        )
+    if outcome == SESSION_COMPLETED:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Cannot add results to completed session"
+        )
+    return InventoryScanResult(status=outcome, result_id=result_id, asset=asset_out)
 
 
 @router.get("/sessions/{session_id}/results", response_model=List[InventoryResultSchema])
@@ -185,48 +299,161 @@ def get_inventory_progress(
     db: Session = Depends(get_db),
     current_user = Depends(get_current_active_user)
 ):
-    session = db.query(InventorySession).filter(InventorySession.id == session_id).first()
+    """Прогресс из счётчиков сессии (одно чтение по первичному ключу)"""
+    session = db.get(InventorySession, session_id)
     if not session:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Inventory session not found"
         )
-    
-    scope_codes = session.device_type_codes
+    return InventoryProgress(**session_progress(
+        session_id, session.total_assets, session.checked_count, session.found_count, session.not_found_count
+    ))
 
-    assets_q = db.query(Asset.id)
-    if scope_codes:
-        assets_q = assets_q.filter(Asset.device_type_code.in_(scope_codes))
-    total = int(assets_q.count())
 
-    checked_q = db.query(func.count(InventoryResult.id)).filter(InventoryResult.session_id == session_id)
-    if scope_codes:
-        checked_q = checked_q.join(Asset, Asset.id == InventoryResult.asset_id).filter(Asset.device_type_code.in_(scope_codes))
-    checked = int(checked_q.scalar() or 0)
-    remaining = max(total - checked, 0)
+@router.get("/sessions/{session_id}/progress/device-types", response_model=List[InventoryDeviceTypeProgress])
+def get_inventory_progress_by_device_type(
+    session_id: int,
+    db: Session = Depends(get_db),
+    current_user = Depends(get_current_active_user)
+):
+    if not db.get(InventorySession, session_id):
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Inventory session not found"
+        )
+    stats = db.query(InventorySessionStats).filter(
+        InventorySessionStats.session_id == session_id
+    ).order_by(InventorySessionStats.device_type_code.asc()).all()
+    return [
+        InventoryDeviceTypeProgress(
+            device_type_code=s.device_type_code,
+            checked=s.checked_count,
+            total=s.total_assets,
+            remaining=max(s.total_assets - s.checked_count, 0),
+            found=s.found_count,
+            not_found=s.not_found_count,
+        )
+        for s in stats
+    ]
 
-    return InventoryProgress(session_id=session_id, checked=checked, total=total, remaining=remaining)
 
+@router.post("/sessions/{session_id}/progress/rebuild", response_model=InventoryProgress)
+def rebuild_inventory_progress(
+    session_id: int,
+    db: Session = Depends(get_db),
+    current_user = Depends(require_admin)
+):
+    """Проверка согласованности: пересчёт счётчиков сессии по результатам"""
+    # Блокировка сессии: параллельные записи результатов ждут окончания пересчёта
+    session = db.query(InventorySession).filter(InventorySession.id == session_id).with_for_update().first()
+    if not session:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Inventory session not found"
+        )
+    if rebuild_session_counters(db, session):
+        logger.warning("Inventory session %s counters were out of sync and have been rebuilt", session_id)
+    db.commit()
+    return get_inventory_progress(session_id, db, current_user)
 
-@router.get("/sessions/{session_id}/checked", response_model=List[InventoryCheckedItem])
-def get_checked_assets(
+
+def _load_progress(session_id: int) -> Optional[dict]:
+    """Итоги сессии для потока событий (свой Session: вызывается из генератора, вне запроса)"""
+    with SessionLocal() as db:
+        session = db.get(InventorySession, session_id)
+        if session is None:
+            return None
+        progress = session_progress(
+            session_id, session.total_assets, session.checked_count, session.found_count, session.not_found_count
+        )
+        progress["completed"] = session.completed_at is not None
+        return progress
+
+
+def _sse(event: str, data: dict) -> str:
+    return f"event: {event}\ndata: {json.dumps(data, default=str)}\n\n"
+
+
+@router.get("/sessions/{session_id}/events")
+def stream_inventory_events(
     session_id: int,
     db: Session = Depends(get_db),
-    current_user = Depends(get_current_active_user)
+    current_user = Depends(get_current_user_from_query)
 ):
+    """
+    Server-Sent Events по сессии: progress (снимок при подключении), results (новые результаты
+    с итогами), resync (события могли потеряться — пришёл свежий снимок), completed (поток закрывается).
+    Токен передаётся в ?token=, так как EventSource не умеет заголовки.
+    """
+    if not db.get(InventorySession, session_id):
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Inventory session not found"
+        )
+    # Соединение не держим на всё время потока: наблюдателей может быть много
+    db.close()
+
+    async def stream():
+        # Подписка до снимка: событие между ними не потеряется (итоги в событиях абсолютные)
+        subscriber = add_subscriber(session_id)
+        try:
+            progress = await run_in_threadpool(_load_progress, session_id)
+            yield f"retry: {SSE_RETRY_MS}\n"
+            yield _sse("progress", progress)
+            if progress is None or progress["completed"]:
+                yield _sse("completed", {"type": "completed", "session_id": session_id})
+                return
+            while True:
+                try:
+                    event = await asyncio.wait_for(subscriber.queue.get(), SSE_KEEPALIVE_SECONDS)
+                except asyncio.TimeoutError:
+                    yield ": keepalive\n\n"
+                    continue
+                if event["type"] == "resync" or subscriber.overflowed:
+                    subscriber.drain()
+                    yield _sse("resync", await run_in_threadpool(_load_progress, session_id))
+                    continue
+                yield _sse(event["type"], event)
+                if event["type"] == "completed":
+                    return
+        finally:
+            remove_subscriber(subscriber)
+
+    return StreamingResponse(
+        stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+def _get_session_or_404(db: Session, session_id: int) -> InventorySession:
     session = db.query(InventorySession).filter(InventorySession.id == session_id).first()
     if not session:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Inventory session not found"
         )
+    return session
+
+
+@router.get("/sessions/{session_id}/checked", response_model=List[InventoryCheckedItem])
+def get_checked_assets(
+    session_id: int,
+    db: Session = Depends(get_db),
+    current_user = Depends(get_current_active_user)
+):
+    session = _get_session_or_404(db, session_id)
     scope_codes = session.device_type_codes
 
-    q = db.query(InventoryResult).filter(InventoryResult.session_id == session_id).join(Asset, Asset.id == InventoryResult.asset_id)
+    # Актив берётся из того же JOIN (contains_eager), без отдельного SELECT на каждый результат
+    q = db.query(InventoryResult).filter(InventoryResult.session_id == session_id).join(
+        Asset, Asset.id == InventoryResult.asset_id
+    ).options(contains_eager(InventoryResult.asset))
     if scope_codes:
         q = q.filter(Asset.device_type_code.in_(scope_codes))
 
-    results = q.order_by(InventoryResult.confirmed_at.desc()).all()
+    results = q.order_by(InventoryResult.confirmed_at.desc(), InventoryResult.id.desc()).all()
     return [
         InventoryCheckedItem(
             id=r.id,
@@ -238,24 +465,131 @@ def get_checked_assets(
     ]
 
 
-@router.get("/sessions/{session_id}/remaining", response_model=List[AssetSchema])
-def get_remaining_assets(
+@router.get("/sessions/{session_id}/checked/compact", response_model=List[InventoryCheckedRow])
+def get_checked_assets_compact(
     session_id: int,
+    response: Response,
+    limit: int = Query(500, ge=1, le=5000),
+    cursor: Optional[str] = None,
     db: Session = Depends(get_db),
     current_user = Depends(get_current_active_user)
 ):
-    session = db.query(InventorySession).filter(InventorySession.id == session_id).first()
-    if not session:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="Inventory session not found"
-        )
+    """
+    Облегчённый список проверенных: только нужные для таблицы колонки, страницами
+    (новые сверху, следующая страница — по курсору из X-Next-Cursor).
+    """
+    session = _get_session_or_404(db, session_id)
     scope_codes = session.device_type_codes
 
-    checked_ids_q = db.query(InventoryResult.asset_id).filter(InventoryResult.session_id == session_id)
-    q = db.query(Asset).filter(~Asset.id.in_(checked_ids_q))
+    q = db.query(
+        InventoryResult.id,
+        InventoryResult.found,
+        InventoryResult.confirmed_at,
+        Asset.id,
+        Asset.inventory_number,
+        Asset.device_type_code,
+        Asset.model,
+        Asset.location_type,
+        Asset.location_id,
+    ).join(Asset, Asset.id == InventoryResult.asset_id).filter(InventoryResult.session_id == session_id)
     if scope_codes:
         q = q.filter(Asset.device_type_code.in_(scope_codes))
-    return q.order_by(Asset.inventory_number.asc()).all()
+    if cursor:
+        try:
+            last_confirmed_at, last_id = decode_timestamp_cursor(cursor)
+        except ValueError:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Invalid cursor"
+            )
+        q = q.filter(older_than(InventoryResult.confirmed_at, InventoryResult.id, last_confirmed_at, last_id))
+
+    rows = q.order_by(InventoryResult.confirmed_at.desc(), InventoryResult.id.desc()).limit(limit).all()
+    if len(rows) == limit:
+        response.headers["X-Next-Cursor"] = encode_timestamp_cursor(rows[-1][2], rows[-1][0])
+    return [dict(zip(InventoryCheckedRow.model_fields, row)) for row in rows]
 
 
+def _remaining_assets_query(db: Session, session: InventorySession):
+    """Активы в области сессии без результата: NOT EXISTS по уникальному (session_id, asset_id)"""
+    checked = exists().where(
+        InventoryResult.session_id == session.id,
+        InventoryResult.asset_id == Asset.id,
+    )
+    q = db.query(Asset).filter(~checked)
+    scope_codes = session.device_type_codes
+    if scope_codes:
+        q = q.filter(Asset.device_type_code.in_(scope_codes))
+    return q
+
+
+@router.get("/sessions/{session_id}/remaining", response_model=List[AssetSchema])
+def get_remaining_assets(
+    session_id: int,
+    response: Response,
+    limit: Optional[int] = Query(None, ge=1, le=1000),
+    cursor: Optional[str] = None,
+    location_type: Optional[LocationType] = None,
+    location_id: Optional[int] = None,
+    db: Session = Depends(get_db),
+    current_user = Depends(get_current_active_user)
+):
+    """
+    Непроверенные активы по inventory_number. Без limit — весь список (как раньше);
+    с limit — страница, следующая по курсору из X-Next-Cursor.
+    location_type/location_id — только активы одного места (см. /remaining/locations).
+    """
+    session = _get_session_or_404(db, session_id)
+    q = _remaining_assets_query(db, session)
+    if location_type is not None:
+        q = q.filter(Asset.location_type == location_type)
+    if location_id is not None:
+        q = q.filter(Asset.location_id == location_id)
+
+    q = q.order_by(Asset.inventory_number.asc())
+    if cursor:
+        try:
+            (last_inventory_number,) = decode_cursor(cursor, (str,))
+        except ValueError:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Invalid cursor"
+            )
+        q = q.filter(Asset.inventory_number > last_inventory_number)
+    if limit is None:
+        return q.all()
+
+    assets = q.limit(limit).all()
+    if len(assets) == limit:
+        response.headers["X-Next-Cursor"] = encode_cursor([assets[-1].inventory_number])
+    return assets
+
+
+@router.get("/sessions/{session_id}/remaining/locations", response_model=List[InventoryRemainingLocation])
+def get_remaining_by_location(
+    session_id: int,
+    db: Session = Depends(get_db),
+    current_user = Depends(get_current_active_user)
+):
+    """Сколько непроверенных активов в каждом месте (сотрудник/склад), по убыванию"""
+    session = _get_session_or_404(db, session_id)
+    remaining = func.count(Asset.id).label("remaining")
+    rows = _remaining_assets_query(db, session).with_entities(
+        Asset.location_type, Asset.location_id, remaining
+    ).group_by(Asset.location_type, Asset.location_id).order_by(
+        remaining.desc(), Asset.location_type, Asset.location_id
+    ).all()
+
+    names = {
+        LocationType.employee: get_snapshot(db, "employees").by_key,
+        LocationType.warehouse: get_snapshot(db, "warehouses").by_key,
+    }
+    return [
+        InventoryRemainingLocation(
+            location_type=location_type,
+            location_id=location_id,
+            location_name=(names[location_type].get(location_id) or {}).get("name"),
+            remaining=count,
+        )
+        for location_type, location_id, count in rows
+    ]
@@ -1,23 +1,29 @@
-from typing import List
-from fastapi import APIRouter, Depends, HTTPException, status
+from typing import List, Optional
+from fastapi import APIRouter, Depends, HTTPException, Query, Response, status
 from sqlalchemy.orm import Session
-from app.database import get_db
+from app.database import DbRunner, get_db, get_db_runner
 from app.models.asset import Asset, LocationType
-from app.models.employee import Employee
-from app.models.warehouse import Warehouse
 from app.models.movement import Movement
-from app.schemas.movement import Movement as MovementSchema, MovementCreate
-from app.api.deps import get_current_active_user
+from app.schemas.movement import Movement as MovementSchema, MovementCreate, MovementBulkCreate, MovementBulkResponse
+from app.api.deps import get_current_active_user, get_current_active_user_async
+from app.core.pagination import decode_timestamp_cursor, encode_timestamp_cursor, older_than
+from app.core.reference_cache import get_reference
+from app.core.asset_movements import move_assets, MOVED
+from app.core.asset_summary import mark_assets_changed
 
 router = APIRouter()
 
 
 @router.post("/", response_model=MovementSchema, status_code=status.HTTP_201_CREATED)
-def create_movement(
+async def create_movement(
     movement_in: MovementCreate,
-    db: Session = Depends(get_db),
-    current_user = Depends(get_current_active_user)
+    runner: DbRunner = Depends(get_db_runner),
+    current_user = Depends(get_current_active_user_async)
 ):
+    return await runner.run(_create_movement, movement_in)
+
+
+def _create_movement(db: Session, movement_in: MovementCreate) -> MovementSchema:
     # Get asset
     asset = db.query(Asset).filter(Asset.id == movement_in.asset_id).first()
     if not asset:
@@ -28,15 +34,13 @@ def create_movement(
     
     # Validate destination location exists
     if movement_in.to_type == LocationType.employee:
-        employee = db.query(Employee).filter(Employee.id == movement_in.to_id).first()
-        if not employee:
+        if not get_reference(db, "employees", movement_in.to_id):
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST,
                 detail=f"Employee with id {movement_in.to_id} not found"
             )
     elif movement_in.to_type == LocationType.warehouse:
-        warehouse = db.query(Warehouse).filter(Warehouse.id == movement_in.to_id).first()
-        if not warehouse:
+        if not get_reference(db, "warehouses", movement_in.to_id):
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST,
                 detail=f"Warehouse with id {movement_in.to_id} not found"
@@ -62,27 +66,61 @@ def create_movement(
     # Update asset location
     asset.location_type = movement_in.to_type
     asset.location_id = movement_in.to_id
+    mark_assets_changed(db)
     
     db.commit()
     db.refresh(movement)
-    return movement
+    return MovementSchema.model_validate(movement)
+
+
+@router.post("/bulk", response_model=MovementBulkResponse)
+async def create_movements_bulk(
+    bulk_in: MovementBulkCreate,
+    runner: DbRunner = Depends(get_db_runner),
+    current_user = Depends(get_current_active_user_async)
+):
+    """
+    Перемещение пачки активов (до 1000) в одной транзакции. Активы, которые нельзя
+    переместить, пропускаются с причиной в status, остальные перемещаются.
+    """
+    outcomes = await runner.run(move_assets, bulk_in.moves())
+    moved = sum(1 for o in outcomes if o.status == MOVED)
+    return MovementBulkResponse(moved=moved, skipped=len(outcomes) - moved, items=outcomes)
 
 
 @router.get("/{asset_id}", response_model=List[MovementSchema])
 def get_asset_movements(
     asset_id: int,
+    response: Response,
+    limit: Optional[int] = Query(None, ge=1, le=1000),
+    cursor: Optional[str] = None,
     db: Session = Depends(get_db),
     current_user = Depends(get_current_active_user)
 ):
+    """История перемещений актива, новые сверху. С limit — страницами по курсору из X-Next-Cursor."""
     # Check asset exists
-    asset = db.query(Asset).filter(Asset.id == asset_id).first()
+    asset = db.query(Asset.id).filter(Asset.id == asset_id).first()
     if not asset:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Asset not found"
         )
-    
-    movements = db.query(Movement).filter(Movement.asset_id == asset_id).order_by(Movement.moved_at.desc()).all()
-    return movements
 
+    q = db.query(Movement).filter(Movement.asset_id == asset_id)
+    if cursor:
+        try:
+            last_moved_at, last_id = decode_timestamp_cursor(cursor)
+        except ValueError:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Invalid cursor"
+            )
+        q = q.filter(older_than(Movement.moved_at, Movement.id, last_moved_at, last_id))
+    q = q.order_by(Movement.moved_at.desc(), Movement.id.desc())
+    if limit is None:
+        return q.all()
 
+    movements = q.limit(limit).all()
+    if len(movements) == limit:
+        response.headers["X-Next-Cursor"] = encode_timestamp_cursor(movements[-1].moved_at, movements[-1].id)
+    return movements
@@ -1,7 +1,8 @@
 from typing import List, Optional
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
-from sqlalchemy import func, or_
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response, status
+from fastapi.responses import JSONResponse
+from sqlalchemy.orm import Session, contains_eager
+from sqlalchemy import func, select, union
 from datetime import datetime
 from app.database import get_db
 from app.models.company import Company
@@ -15,6 +16,9 @@ from app.models.asset import LocationType as AssetLocationType
 from app.models.movement import Movement
 from app.models.movement import LocationType as MovementLocationType
 from app.api.deps import get_current_active_user, require_admin
+from app.core.pagination import decode_timestamp_cursor, encode_timestamp_cursor, older_than
+from app.core.reference_cache import get_snapshot, mark_reference_changed
+from app.core.sync import record_tombstone
 from pydantic import BaseModel
 
 router = APIRouter()
@@ -124,14 +128,42 @@ class VendorCreate(BaseModel):
     name: str
 
 
+# Справочники отдаются из кэша (app.core.reference_cache) с ETag по содержимому снимка.
+# no-cache: клиент хранит ответ, но каждый раз перепроверяет его через If-None-Match.
+REFERENCE_CACHE_CONTROL = "private, no-cache"
+
+
+def _etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    if not if_none_match:
+        return False
+    candidates = [tag.strip() for tag in if_none_match.split(",")]
+    # If-None-Match сравнивается слабо: W/"x" совпадает с "x"
+    return "*" in candidates or etag in (tag[2:] if tag.startswith("W/") else tag for tag in candidates)
+
+
+def _reference_response(request: Request, db: Session, table: str, response_model, sort_by: Optional[str] = None) -> Response:
+    """Ответ со списком справочника; 304 без сериализации, если у клиента актуальная версия."""
+    snapshot = get_snapshot(db, table)
+    etag = f'"{snapshot.etag}"'
+    headers = {"ETag": etag, "Cache-Control": REFERENCE_CACHE_CONTROL}
+    if _etag_matches(request.headers.get("if-none-match"), etag):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+
+    rows = snapshot.rows
+    if sort_by:
+        rows = sorted(rows, key=lambda row: str(row[sort_by]).casefold())
+    content = [response_model.model_validate(row).model_dump(mode="json") for row in rows]
+    return JSONResponse(content=content, headers=headers)
+
+
 # Companies
 @router.get("/companies", response_model=List[CompanyResponse])
 def get_companies(
+    request: Request,
     db: Session = Depends(get_db),
     current_user = Depends(get_current_active_user)
 ):
-    companies = db.query(Company).all()
-    return companies
+    return _reference_response(request, db, "companies", CompanyResponse)
 
 
 @router.post("/companies", response_model=CompanyResponse, status_code=status.HTTP_201_CREATED)
@@ -152,6 +184,7 @@ def create_company(
         )
     company = Company(code=company_in.code, name=company_in.name)
     db.add(company)
+    mark_reference_changed(db, "companies")
     db.commit()
     db.refresh(company)
     return company
@@ -183,6 +216,7 @@ def update_company(
         )
     company.code = company_in.code
     company.name = company_in.name
+    mark_reference_changed(db, "companies")
     db.commit()
     db.refresh(company)
     return company
@@ -201,6 +235,8 @@ def delete_company(
             detail="Company not found"
         )
     db.delete(company)
+    record_tombstone(db, "companies", company.id)
+    mark_reference_changed(db, "companies")
     db.commit()
     return None
 
@@ -208,11 +244,11 @@ def delete_company(
 # Device Types
 @router.get("/device-types", response_model=List[DeviceTypeResponse])
 def get_device_types(
+    request: Request,
     db: Session = Depends(get_db),
     current_user = Depends(get_current_active_user)
 ):
-    device_types = db.query(DeviceType).all()
-    return device_types
+    return _reference_response(request, db, "device_types", DeviceTypeResponse)
 
 
 @router.post("/device-types", response_model=DeviceTypeResponse, status_code=status.HTTP_201_CREATED)
@@ -233,6 +269,7 @@ def create_device_type(
         )
     device_type = DeviceType(code=device_type_in.code, name=device_type_in.name)
     db.add(device_type)
+    mark_reference_changed(db, "device_types")
     db.commit()
     db.refresh(device_type)
     return device_type
@@ -264,6 +301,7 @@ def update_device_type(
         )
     device_type.code = device_type_in.code
     device_type.name = device_type_in.name
+    mark_reference_changed(db, "device_types")
     db.commit()
     db.refresh(device_type)
     return device_type
@@ -282,6 +320,8 @@ def delete_device_type(
             detail="Device type not found"
         )
     db.delete(device_type)
+    record_tombstone(db, "device_types", device_type.id)
+    mark_reference_changed(db, "device_types")
     db.commit()
     return None
 
@@ -289,11 +329,11 @@ def delete_device_type(
 # Warehouses
 @router.get("/warehouses", response_model=List[WarehouseResponse])
 def get_warehouses(
+    request: Request,
     db: Session = Depends(get_db),
     current_user = Depends(get_current_active_user)
 ):
-    warehouses = db.query(Warehouse).all()
-    return warehouses
+    return _reference_response(request, db, "warehouses", WarehouseResponse)
 
 
 @router.post("/warehouses", response_model=WarehouseResponse, status_code=status.HTTP_201_CREATED)
@@ -304,6 +344,7 @@ def create_warehouse(
 ):
     warehouse = Warehouse(name=warehouse_in.name, address=warehouse_in.address)
     db.add(warehouse)
+    mark_reference_changed(db, "warehouses")
     db.commit()
     db.refresh(warehouse)
     return warehouse
@@ -324,6 +365,7 @@ def update_warehouse(
         )
     warehouse.name = warehouse_in.name
     warehouse.address = warehouse_in.address
+    mark_reference_changed(db, "warehouses")
     db.commit()
     db.refresh(warehouse)
     return warehouse
@@ -342,6 +384,8 @@ def delete_warehouse(
             detail="Warehouse not found"
         )
     db.delete(warehouse)
+    record_tombstone(db, "warehouses", warehouse.id)
+    mark_reference_changed(db, "warehouses")
     db.commit()
     return None
 
@@ -349,11 +393,11 @@ def delete_warehouse(
 # Employees
 @router.get("/employees", response_model=List[EmployeeResponse])
 def get_employees(
+    request: Request,
     db: Session = Depends(get_db),
     current_user = Depends(get_current_active_user)
 ):
-    employees = db.query(Employee).all()
-    return employees
+    return _reference_response(request, db, "employees", EmployeeResponse)
 
 
 @router.post("/employees", response_model=EmployeeResponse, status_code=status.HTTP_201_CREATED)
@@ -377,6 +421,7 @@ def create_employee(
         status=EmployeeStatus(status_value)
     )
     db.add(employee)
+    mark_reference_changed(db, "employees")
     db.commit()
     db.refresh(employee)
     return employee
@@ -437,6 +482,7 @@ def update_employee(
     employee.phone = employee_in.phone
     employee.position = employee_in.position
     employee.status = EmployeeStatus(status_value)
+    mark_reference_changed(db, "employees")
     db.commit()
     db.refresh(employee)
     return employee
@@ -455,6 +501,8 @@ def delete_employee(
             detail="Employee not found"
         )
     db.delete(employee)
+    record_tombstone(db, "employees", employee.id)
+    mark_reference_changed(db, "employees")
     db.commit()
     return None
 
@@ -509,22 +557,45 @@ def get_employee_assigned_assets(
 @router.get("/employees/{employee_id}/asset-history", response_model=List[EmployeeAssetHistoryEvent])
 def get_employee_asset_history(
     employee_id: int,
+    response: Response,
+    limit: Optional[int] = Query(None, ge=1, le=1000),
+    cursor: Optional[str] = None,
     db: Session = Depends(get_db),
     current_user = Depends(get_current_active_user)
 ):
+    """История выдачи/возврата активов сотрудника, новые сверху. С limit — страницами по X-Next-Cursor."""
     employee = db.query(Employee).filter(Employee.id == employee_id).first()
     if not employee:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Employee not found")
 
-    q = db.query(Movement).join(Asset, Asset.id == Movement.asset_id).filter(
-        or_(
-            (Movement.from_type == MovementLocationType.employee) & (Movement.from_id == employee_id),
-            (Movement.to_type == MovementLocationType.employee) & (Movement.to_id == employee_id),
-        )
-    ).order_by(Movement.moved_at.desc())
+    try:
+        keyset = decode_timestamp_cursor(cursor) if cursor else None
+    except ValueError:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid cursor")
+
+    # OR по двум сторонам не использует индексы с сортировкой: каждая сторона берётся
+    # отдельно по своему индексу (from_*/to_*, moved_at), затем UNION
+    def side(type_column, id_column):
+        q = select(Movement.id).where(type_column == MovementLocationType.employee, id_column == employee_id)
+        if keyset:
+            q = q.where(older_than(Movement.moved_at, Movement.id, *keyset))
+        if limit is not None:
+            q = q.order_by(Movement.moved_at.desc(), Movement.id.desc()).limit(limit)
+        return select(q.subquery().c.id)
+
+    movement_ids = union(
+        side(Movement.from_type, Movement.from_id),
+        side(Movement.to_type, Movement.to_id),
+    ).subquery()
+    q = db.query(Movement).join(movement_ids, movement_ids.c.id == Movement.id).join(
+        Asset, Asset.id == Movement.asset_id
+    ).options(contains_eager(Movement.asset)).order_by(Movement.moved_at.desc(), Movement.id.desc())
+    movements = q.limit(limit).all() if limit is not None else q.all()
+    if limit is not None and len(movements) == limit:
+        response.headers["X-Next-Cursor"] = encode_timestamp_cursor(movements[-1].moved_at, movements[-1].id)
 
     events: List[EmployeeAssetHistoryEvent] = []
-    for m in q.all():
+    for m in movements:
         action = "assigned" if (m.to_type == MovementLocationType.employee and m.to_id == employee_id) else "unassigned"
         events.append(
             EmployeeAssetHistoryEvent(
@@ -550,11 +621,11 @@ def get_employee_asset_history(
 # Vendors
 @router.get("/vendors", response_model=List[VendorResponse])
 def get_vendors(
+    request: Request,
     db: Session = Depends(get_db),
     current_user = Depends(get_current_active_user)
 ):
-    vendors = db.query(Vendor).order_by(Vendor.name.asc()).all()
-    return vendors
+    return _reference_response(request, db, "vendors", VendorResponse, sort_by="name")
 
 
 @router.post("/vendors", response_model=VendorResponse, status_code=status.HTTP_201_CREATED)
@@ -570,6 +641,7 @@ def create_vendor(
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Vendor already exists")
     vendor = Vendor(name=name)
     db.add(vendor)
+    mark_reference_changed(db, "vendors")
     db.commit()
     db.refresh(vendor)
     return vendor
@@ -593,6 +665,7 @@ def update_vendor(
     vendor.name = name
     # Keep denormalized Asset.vendor in sync for labels/reports
     db.query(Asset).filter(Asset.vendor_id == vendor_id).update({Asset.vendor: name})
+    mark_reference_changed(db, "vendors")
     db.commit()
     db.refresh(vendor)
     return vendor
@@ -611,5 +684,7 @@ def delete_vendor(
     if db.query(Asset).filter(Asset.vendor_id == vendor_id).first():
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Vendor is used by assets")
     db.delete(vendor)
+    record_tombstone(db, "vendors", vendor.id)
+    mark_reference_changed(db, "vendors")
     db.commit()
     return None
@@ -1,25 +1,67 @@
-from typing import Optional
+from datetime import datetime, timezone
+from io import BytesIO
+from typing import Iterable, Iterator, List, Optional
 from fastapi import APIRouter, Depends, Query, HTTPException, status
-from fastapi.responses import Response
+from fastapi.responses import StreamingResponse
 from sqlalchemy.orm import Session
-from sqlalchemy import or_
-from io import BytesIO
+from sqlalchemy import and_, func
+import tempfile
 from pydantic import BaseModel
 from app.database import get_db
 from app.models.asset import Asset, LocationType
 from app.models.employee import Employee
 from app.models.warehouse import Warehouse
 from app.models.device_type import DeviceType
-from app.api.deps import get_current_active_user
+from app.api.deps import get_current_active_user, require_admin
+from app.core.asset_summary import get_asset_counts
+from app.core.location_history import create_checkpoint, locations_at
+from app.core.reference_cache import get_snapshot
+from app.models.location_checkpoint import LocationCheckpoint
+from app.core.file_stream import stream_file
+from app.core.pdf_stream import PdfConcatenator
 from openpyxl import Workbook
+from openpyxl.cell import WriteOnlyCell
+from openpyxl.utils import get_column_letter
 from openpyxl.styles import Font, Alignment
 from reportlab.lib.pagesizes import letter
-from reportlab.platypus import SimpleDocTemplate, Table, TableStyle, Paragraph
-from reportlab.lib.styles import getSampleStyleSheet
+from reportlab.pdfbase.pdfmetrics import stringWidth
+from reportlab.pdfgen import canvas
+from reportlab.platypus import Table, TableStyle
 from reportlab.lib import colors
 
 router = APIRouter()
 
+REPORT_HEADERS = ["Device Type", "Vendor+Model", "Serial", "Inventory", "Location", "Phone"]
+
+# Сколько строк отчёта забирать из курсора БД за раз при экспорте
+EXPORT_YIELD_PER = 1000
+
+# Сетка PDF отчёта (letter, pt): фиксированные ширины колонок и высоты строк,
+# чтобы reportlab не измерял каждую ячейку
+PDF_MARGIN = 36
+PDF_TITLE_HEIGHT = 36
+PDF_HEADER_HEIGHT = 20
+PDF_ROW_HEIGHT = 12
+PDF_CELL_PADDING = 12
+PDF_COLUMN_WIDTHS = [75, 135, 95, 70, 120, 45]
+PDF_ROWS_PER_PAGE = int((letter[1] - 2 * PDF_MARGIN - PDF_HEADER_HEIGHT) // PDF_ROW_HEIGHT)
+PDF_ROWS_FIRST_PAGE = int((letter[1] - 2 * PDF_MARGIN - PDF_TITLE_HEIGHT - PDF_HEADER_HEIGHT) // PDF_ROW_HEIGHT)
+# Страниц в одной части PDF: часть рендерится отдельно и сразу отдаётся клиенту
+PDF_PAGES_PER_PART = 10
+PDF_TABLE_STYLE = TableStyle([
+    ('BACKGROUND', (0, 0), (-1, 0), colors.grey),
+    ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
+    ('ALIGN', (0, 0), (-1, -1), 'LEFT'),
+    ('VALIGN', (0, 0), (-1, -1), 'MIDDLE'),
+    ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
+    ('FONTSIZE', (0, 0), (-1, 0), 10),
+    ('BACKGROUND', (0, 1), (-1, -1), colors.beige),
+    ('GRID', (0, 0), (-1, -1), 1, colors.black),
+    ('FONTSIZE', (0, 1), (-1, -1), 8),
+    ('TOPPADDING', (0, 1), (-1, -1), 1),
+    ('BOTTOMPADDING', (0, 1), (-1, -1), 2),
+])
+
 
 class ReportRow(BaseModel):
     device_type: str
@@ -33,22 +75,84 @@ class ReportDataResponse(BaseModel):
     rows: list[ReportRow]
 
 
-def get_location_name(db: Session, location_type: LocationType, location_id: int) -> str:
-    """Получает название локации (имя сотрудника или название склада)"""
-    if location_type == LocationType.employee:
-        employee = db.query(Employee).filter(Employee.id == location_id).first()
-        return employee.name if employee else f"Employee #{location_id}"
+def build_report_query(
+    db: Session,
+    device_type_code: Optional[str] = None,
+    employee_id: Optional[int] = None,
+    warehouse_id: Optional[int] = None,
+):
+    """
+    Один запрос для всего отчёта: активы + тип устройства + сотрудник/склад (LEFT JOIN),
+    вместо отдельных запросов локации и телефона на каждую строку.
+    """
+    query = db.query(
+        DeviceType.name.label("device_type_name"),
+        Asset.device_type_code,
+        Asset.vendor,
+        Asset.model,
+        Asset.serial_number,
+        Asset.inventory_number,
+        Asset.location_type,
+        Asset.location_id,
+        Employee.name.label("employee_name"),
+        Employee.phone.label("employee_phone"),
+        Warehouse.name.label("warehouse_name"),
+    ).select_from(Asset).outerjoin(
+        DeviceType, DeviceType.code == Asset.device_type_code
+    ).outerjoin(
+        Employee, and_(Asset.location_type == LocationType.employee, Employee.id == Asset.location_id)
+    ).outerjoin(
+        Warehouse, and_(Asset.location_type == LocationType.warehouse, Warehouse.id == Asset.location_id)
+    )
+
+    if device_type_code:
+        query = query.filter(Asset.device_type_code == device_type_code)
+
+    if employee_id:
+        query = query.filter(Asset.location_type == LocationType.employee, Asset.location_id == employee_id)
+
+    if warehouse_id:
+        query = query.filter(Asset.location_type == LocationType.warehouse, Asset.location_id == warehouse_id)
+
+    return query.order_by(Asset.inventory_number.asc())
+
+
+def to_report_row(row) -> ReportRow:
+    """Преобразует строку build_report_query в ReportRow"""
+    if row.location_type == LocationType.employee:
+        location = row.employee_name or f"Employee #{row.location_id}"
+        phone = row.employee_phone or ""
     else:  # warehouse
-        warehouse = db.query(Warehouse).filter(Warehouse.id == location_id).first()
-        return warehouse.name if warehouse else f"Warehouse #{location_id}"
+        location = row.warehouse_name or f"Warehouse #{row.location_id}"
+        phone = ""
+    return ReportRow(
+        device_type=row.device_type_name or row.device_type_code,
+        vendor_model=f"{row.vendor} {row.model}",
+        serial=row.serial_number,
+        inventory=row.inventory_number,
+        location=location,
+        phone=phone,
+    )
 
 
-def get_phone_number(db: Session, location_type: LocationType, location_id: int) -> Optional[str]:
-    """Получает телефонный номер (только для сотрудников)"""
-    if location_type == LocationType.employee:
-        employee = db.query(Employee).filter(Employee.id == location_id).first()
-        return employee.phone if employee else None
-    return None
+def report_column_widths(query) -> list[int]:
+    """
+    Ширины колонок Excel по максимальной длине значений, посчитанные агрегатом в БД.
+    В write-only режиме openpyxl ширины пишутся до строк, поэтому считаем их заранее,
+    не загружая отчёт в память.
+    """
+    lengths = query.order_by(None).with_entities(
+        func.max(func.length(func.coalesce(DeviceType.name, Asset.device_type_code))),
+        func.max(func.length(Asset.vendor) + 1 + func.length(Asset.model)),
+        func.max(func.length(Asset.serial_number)),
+        func.max(func.length(Asset.inventory_number)),
+        func.max(func.length(func.coalesce(Employee.name, Warehouse.name))),
+        func.max(func.length(Employee.phone)),
+    ).one()
+    return [
+        min(max(length or 0, len(header)) + 2, 50)
+        for length, header in zip(lengths, REPORT_HEADERS)
+    ]
 
 
 @router.get("/data", response_model=ReportDataResponse)
@@ -60,38 +164,8 @@ def get_report_data(
     current_user = Depends(get_current_active_user)
 ):
     """Получение данных отчета в JSON формате для отображения в таблице"""
-    # Build query
-    query = db.query(Asset)
-    
-    if device_type_code:
-        query = query.filter(Asset.device_type_code == device_type_code)
-    
-    if employee_id:
-        query = query.filter(Asset.location_type == LocationType.employee, Asset.location_id == employee_id)
-    
-    if warehouse_id:
-        query = query.filter(Asset.location_type == LocationType.warehouse, Asset.location_id == warehouse_id)
-    
-    assets = query.all()
-    
-    # Get device types for lookup
-    device_types = {dt.code: dt.name for dt in db.query(DeviceType).all()}
-    
-    rows = []
-    for asset in assets:
-        device_type_name = device_types.get(asset.device_type_code, asset.device_type_code)
-        vendor_model = f"{asset.vendor} {asset.model}"
-        location_name = get_location_name(db, asset.location_type, asset.location_id)
-        phone = get_phone_number(db, asset.location_type, asset.location_id) or ""
-        
-        rows.append(ReportRow(
-            device_type=device_type_name,
-            vendor_model=vendor_model,
-            serial=asset.serial_number,
-            inventory=asset.inventory_number,
-            location=location_name,
-            phone=phone
-        ))
+    query = build_report_query(db, device_type_code, employee_id, warehouse_id)
+    rows = [to_report_row(row) for row in query]
     
     return ReportDataResponse(rows=rows)
 
@@ -105,81 +179,50 @@ def export_report(
     db: Session = Depends(get_db),
     current_user = Depends(get_current_active_user)
 ):
-    # Build query
-    query = db.query(Asset)
-    
-    if device_type_code:
-        query = query.filter(Asset.device_type_code == device_type_code)
-    
-    if employee_id:
-        query = query.filter(Asset.location_type == LocationType.employee, Asset.location_id == employee_id)
-    
-    if warehouse_id:
-        query = query.filter(Asset.location_type == LocationType.warehouse, Asset.location_id == warehouse_id)
-    
-    assets = query.all()
+    query = build_report_query(db, device_type_code, employee_id, warehouse_id)
+    # Серверный курсор: строки читаются из БД пачками, а не все сразу
+    rows = (to_report_row(row) for row in query.yield_per(EXPORT_YIELD_PER))
     
     if format == "excel":
-        return export_excel(assets, db)
+        return export_excel(rows, report_column_widths(query))
     else:  # pdf
-        return export_pdf(assets, db)
+        return export_pdf(rows)
 
 
-def export_excel(assets, db: Session) -> Response:
-    """Экспорт в Excel"""
-    wb = Workbook()
-    ws = wb.active
-    ws.title = "Assets Report"
+def export_excel(rows: Iterable[ReportRow], column_widths: list[int]) -> StreamingResponse:
+    """Экспорт в Excel (write-only книга во временном файле, отдаётся потоком)"""
+    wb = Workbook(write_only=True)
+    ws = wb.create_sheet("Assets Report")
     
-    # Headers
-    headers = ["Device Type", "Vendor+Model", "Serial", "Inventory", "Location", "Phone"]
-    ws.append(headers)
+    for index, width in enumerate(column_widths, start=1):
+        ws.column_dimensions[get_column_letter(index)].width = width
     
-    # Style headers
+    # Headers
     header_font = Font(bold=True)
-    for cell in ws[1]:
+    header_cells = []
+    for header in REPORT_HEADERS:
+        cell = WriteOnlyCell(ws, value=header)
         cell.font = header_font
         cell.alignment = Alignment(horizontal='center')
-    
-    # Get device types for lookup
-    device_types = {dt.code: dt.name for dt in db.query(DeviceType).all()}
+        header_cells.append(cell)
+    ws.append(header_cells)
     
     # Add data
-    for asset in assets:
-        device_type_name = device_types.get(asset.device_type_code, asset.device_type_code)
-        vendor_model = f"{asset.vendor} {asset.model}"
-        location_name = get_location_name(db, asset.location_type, asset.location_id)
-        phone = get_phone_number(db, asset.location_type, asset.location_id) or ""
-        
+    for row in rows:
         ws.append([
-            device_type_name,
-            vendor_model,
-            asset.serial_number,
-            asset.inventory_number,
-            location_name,
-            phone
+            row.device_type,
+            row.vendor_model,
+            row.serial,
+            row.inventory,
+            row.location,
+            row.phone
         ])
     
-    # Auto-adjust column widths
-    for column in ws.columns:
-        max_length = 0
-        column_letter = column[0].column_letter
-        for cell in column:
-            try:
-                if len(str(cell.value)) > max_length:
-                    max_length = len(str(cell.value))
-            except:
-                pass
-        adjusted_width = min(max_length + 2, 50)
-        ws.column_dimensions[column_letter].width = adjusted_width
-    
-    # Save to BytesIO
-    buffer = BytesIO()
-    wb.save(buffer)
-    buffer.seek(0)
+    output = tempfile.TemporaryFile()
+    wb.save(output)
     
-    return Response(
-        content=buffer.read(),
+    return StreamingResponse(
+        stream_file(output),
         media_type="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
         headers={
             "Content-Disposition": "attachment; filename=assets_report.xlsx"
@@ -187,60 +230,94 @@ def export_excel(assets, db: Session) -> Response:
     )
 
 
-def export_pdf(assets, db: Session) -> Response:
-    """Экспорт в PDF"""
-    buffer = BytesIO()
-    doc = SimpleDocTemplate(buffer, pagesize=letter)
-    elements = []
-    
-    styles = getSampleStyleSheet()
-    
-    # Title
-    title = Paragraph("Assets Report", styles['Title'])
-    elements.append(title)
-    elements.append(Paragraph("<br/>", styles['Normal']))
-    
-    # Prepare data
-    data = [["Device Type", "Vendor+Model", "Serial", "Inventory", "Location", "Phone"]]
-    
-    device_types = {dt.code: dt.name for dt in db.query(DeviceType).all()}
-    
-    for asset in assets:
-        device_type_name = device_types.get(asset.device_type_code, asset.device_type_code)
-        vendor_model = f"{asset.vendor} {asset.model}"
-        location_name = get_location_name(db, asset.location_type, asset.location_id)
-        phone = get_phone_number(db, asset.location_type, asset.location_id) or ""
-        
+def _fit_text(text: str, max_chars: int, width: float, font_name: str, font_size: int) -> str:
+    """Обрезает текст ячейки по числу символов и по ширине колонки"""
+    text = text[:max_chars]
+    while text and stringWidth(text, font_name, font_size) > width:
+        text = text[:-1]
+    return text
+
+
+def _pdf_report_table(data: list) -> Table:
+    """Таблица одной страницы: заголовок + до PDF_ROWS_PER_PAGE строк с фиксированной сеткой"""
+    row_heights = [PDF_HEADER_HEIGHT] + [PDF_ROW_HEIGHT] * (len(data) - 1)
+    table = Table(data, colWidths=PDF_COLUMN_WIDTHS, rowHeights=row_heights)
+    table.setStyle(PDF_TABLE_STYLE)
+    return table
+
+
+def _pdf_report_pages(rows: Iterable[ReportRow]) -> Iterator[list]:
+    """Раскладывает строки по страницам: [заголовок, строки...]; первая страница короче из-за названия"""
+    header = list(REPORT_HEADERS)
+    data = [header]
+    first_page = True
+    capacity = PDF_ROWS_FIRST_PAGE
+    for row in rows:
         data.append([
-            device_type_name,
-            vendor_model[:30],  # Limit length
-            asset.serial_number[:20],
-            asset.inventory_number,
-            location_name[:30],
-            phone
+            _fit_text(row.device_type, 30, PDF_COLUMN_WIDTHS[0] - PDF_CELL_PADDING, "Helvetica", 8),
+            _fit_text(row.vendor_model, 30, PDF_COLUMN_WIDTHS[1] - PDF_CELL_PADDING, "Helvetica", 8),
+            _fit_text(row.serial, 20, PDF_COLUMN_WIDTHS[2] - PDF_CELL_PADDING, "Helvetica", 8),
+            _fit_text(row.inventory, 20, PDF_COLUMN_WIDTHS[3] - PDF_CELL_PADDING, "Helvetica", 8),
+            _fit_text(row.location, 30, PDF_COLUMN_WIDTHS[4] - PDF_CELL_PADDING, "Helvetica", 8),
+            _fit_text(row.phone, 10, PDF_COLUMN_WIDTHS[5] - PDF_CELL_PADDING, "Helvetica", 8),
         ])
-    
-    # Create table
-    table = Table(data)
-    table.setStyle(TableStyle([
-        ('BACKGROUND', (0, 0), (-1, 0), colors.grey),
-        ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
-        ('ALIGN', (0, 0), (-1, -1), 'LEFT'),
-        ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
-        ('FONTSIZE', (0, 0), (-1, 0), 10),
-        ('BOTTOMPADDING', (0, 0), (-1, 0), 12),
-        ('BACKGROUND', (0, 1), (-1, -1), colors.beige),
-        ('GRID', (0, 0), (-1, -1), 1, colors.black),
-        ('FONTSIZE', (0, 1), (-1, -1), 8),
-    ]))
-    
-    elements.append(table)
-    
-    doc.build(elements)
-    buffer.seek(0)
-    
-    return Response(
-        content=buffer.read(),
+        if len(data) - 1 >= capacity:
+            yield data
+            data = [header]
+            first_page = False
+            capacity = PDF_ROWS_PER_PAGE
+    if len(data) > 1 or first_page:
+        yield data
+
+
+def _render_pdf_part(pages: list, first_page: bool) -> bytes:
+    """Рендерит несколько страниц отчёта в отдельный небольшой PDF"""
+    output = BytesIO()
+    page_width, page_height = letter
+    c = canvas.Canvas(output, pagesize=letter)
+    for data in pages:
+        top = page_height - PDF_MARGIN
+        if first_page:
+            c.setFont("Helvetica-Bold", 18)
+            c.drawCentredString(page_width / 2, top - 18, "Assets Report")
+            top -= PDF_TITLE_HEIGHT
+            first_page = False
+        table = _pdf_report_table(data)
+        _, table_height = table.wrapOn(c, page_width - 2 * PDF_MARGIN, top - PDF_MARGIN)
+        table.drawOn(c, PDF_MARGIN, top - table_height)
+        c.showPage()
+    c.save()
+    return output.getvalue()
+
+
+def _pdf_report_chunks(rows: Iterable[ReportRow]) -> Iterator[bytes]:
+    """Куски итогового PDF: заголовок файла, части по PDF_PAGES_PER_PART страниц, xref"""
+    pdf = PdfConcatenator(title="Assets Report")
+    yield pdf.header()
+    part: list = []
+    first_part = True
+    for page in _pdf_report_pages(rows):
+        part.append(page)
+        if len(part) >= PDF_PAGES_PER_PART:
+            yield pdf.append(_render_pdf_part(part, first_part))
+            part = []
+            first_part = False
+    if part:
+        yield pdf.append(_render_pdf_part(part, first_part))
+    yield pdf.finish()
+
+
+def export_pdf(rows: Iterable[ReportRow]) -> StreamingResponse:
+    """
+    Экспорт в PDF.
+    Строки рисуются постранично: на каждую страницу своя небольшая таблица с заголовком
+    и заранее рассчитанной сеткой, поэтому время вёрстки растёт линейно.
+    Документ отдаётся по мере вёрстки: каждые PDF_PAGES_PER_PART страниц рендерятся
+    отдельным PDF и сразу дописываются в ответ (PdfConcatenator), поэтому первые байты
+    приходят до конца выборки, а в памяти находится только текущая часть.
+    """
+    return StreamingResponse(
+        _pdf_report_chunks(rows),
         media_type="application/pdf",
         headers={
             "Content-Disposition": "attachment; filename=assets_report.pdf"
@@ -248,3 +325,185 @@ def export_pdf(assets, db: Session) -> Response:
     )
 
 
+class SummaryBucket(BaseModel):
+    key: str
+    name: str
+    count: int
+
+
+class AssetSummaryResponse(BaseModel):
+    total: int
+    by_device_type: List[SummaryBucket]
+    by_company: List[SummaryBucket]
+    by_location_type: List[SummaryBucket]
+    by_warehouse: List[SummaryBucket]
+    top_employees: List[SummaryBucket]
+    computed_at: datetime
+
+
+class LocationAtRow(BaseModel):
+    asset_id: int
+    inventory_number: str
+    device_type_code: str
+    vendor_model: str
+    serial: str
+    location_type: LocationType
+    location_id: int
+    location: str
+
+
+class LocationsAtResponse(BaseModel):
+    at: datetime
+    checkpoint_taken_at: Optional[datetime] = None
+    replayed_assets: int
+    rows: List[LocationAtRow]
+
+
+class LocationCheckpointCreate(BaseModel):
+    taken_at: Optional[datetime] = None
+
+
+class LocationCheckpointInfo(BaseModel):
+    id: int
+    taken_at: datetime
+    asset_count: int
+    created_at: datetime
+
+    class Config:
+        from_attributes = True
+
+
+def _buckets(counts, names, limit: Optional[int] = None) -> List[SummaryBucket]:
+    """Счётчики по убыванию с названиями из справочника (текущими, не из кэша сводки)"""
+    items = sorted(counts.items(), key=lambda item: (-item[1], str(item[0])))
+    if limit is not None:
+        items = items[:limit]
+    return [
+        SummaryBucket(key=str(key), name=(names.get(key) or {}).get("name", str(key)), count=count)
+        for key, count in items
+    ]
+
+
+@router.get("/summary", response_model=AssetSummaryResponse)
+def get_summary(
+    top_employees: int = Query(20, ge=0, le=500),
+    db: Session = Depends(get_db),
+    current_user = Depends(get_current_active_user)
+):
+    """
+    Сводка для дашборда: число активов по типу устройства, компании, типу места, складам
+    и сотрудникам (top_employees с наибольшим числом). Считается GROUP BY и кэшируется в воркере
+    до изменения активов (см. app.core.asset_summary).
+    """
+    counts = get_asset_counts(db)
+    by_warehouse = {
+        location_id: count for (location_type, location_id), count in counts.by_location.items()
+        if location_type == LocationType.warehouse
+    }
+    by_employee = {
+        location_id: count for (location_type, location_id), count in counts.by_location.items()
+        if location_type == LocationType.employee
+    }
+    return AssetSummaryResponse(
+        total=counts.total,
+        by_device_type=_buckets(counts.by_device_type, get_snapshot(db, "device_types").by_key),
+        by_company=_buckets(counts.by_company, get_snapshot(db, "companies").by_key),
+        by_location_type=[
+            SummaryBucket(key=location_type.value, name=location_type.value, count=count)
+            for location_type, count in counts.by_location_type.items()
+        ],
+        by_warehouse=_buckets(by_warehouse, get_snapshot(db, "warehouses").by_key),
+        top_employees=_buckets(by_employee, get_snapshot(db, "employees").by_key, limit=top_employees),
+        computed_at=counts.computed_at,
+    )
+
+
+def _utc_naive(moment: datetime) -> datetime:
+    """В БД время хранится в UTC без зоны (datetime.utcnow)"""
+    if moment.tzinfo is not None:
+        moment = moment.astimezone(timezone.utc).replace(tzinfo=None)
+    return moment
+
+
+@router.get("/locations-at", response_model=LocationsAtResponse)
+def get_locations_at(
+    at: datetime,
+    device_type_code: Optional[str] = None,
+    employee_id: Optional[int] = None,
+    warehouse_id: Optional[int] = None,
+    db: Session = Depends(get_db),
+    current_user = Depends(get_current_active_user)
+):
+    """
+    Где был каждый актив на момент at (для аудита). Восстанавливается по журналу перемещений
+    от ближайшего опорного снимка, поэтому время ответа не растёт с длиной истории.
+    Названия мест — текущие.
+    """
+    at = _utc_naive(at)
+    snapshot = locations_at(db, at)
+
+    query = db.query(
+        Asset.id, Asset.inventory_number, Asset.device_type_code, Asset.vendor, Asset.model, Asset.serial_number
+    ).filter(Asset.created_at <= at)
+    if device_type_code:
+        query = query.filter(Asset.device_type_code == device_type_code)
+
+    names = {
+        LocationType.employee: get_snapshot(db, "employees").by_key,
+        LocationType.warehouse: get_snapshot(db, "warehouses").by_key,
+    }
+    rows: List[LocationAtRow] = []
+    for asset_id, inventory_number, type_code, vendor, model, serial in query.order_by(Asset.inventory_number.asc()):
+        location = snapshot.locations.get(asset_id)
+        if location is None:
+            continue
+        location_type, location_id = location
+        if employee_id and location != (LocationType.employee, employee_id):
+            continue
+        if warehouse_id and location != (LocationType.warehouse, warehouse_id):
+            continue
+        rows.append(LocationAtRow(
+            asset_id=asset_id,
+            inventory_number=inventory_number,
+            device_type_code=type_code,
+            vendor_model=f"{vendor} {model}",
+            serial=serial,
+            location_type=location_type,
+            location_id=location_id,
+            location=(names[location_type].get(location_id) or {}).get("name", ""),
+        ))
+    return LocationsAtResponse(
+        at=at,
+        checkpoint_taken_at=snapshot.checkpoint_taken_at,
+        replayed_assets=snapshot.replayed_assets,
+        rows=rows,
+    )
+
+
+@router.get("/location-checkpoints", response_model=List[LocationCheckpointInfo])
+def get_location_checkpoints(
+    db: Session = Depends(get_db),
+    current_user = Depends(get_current_active_user)
+):
+    return db.query(LocationCheckpoint).order_by(LocationCheckpoint.taken_at.desc()).all()
+
+
+@router.post("/location-checkpoints", response_model=LocationCheckpointInfo, status_code=status.HTTP_201_CREATED)
+def create_location_checkpoint(
+    checkpoint_in: LocationCheckpointCreate,
+    db: Session = Depends(get_db),
+    current_user = Depends(require_admin)
+):
+    """
+    Опорный снимок расположения активов (по умолчанию — на 5 минут назад). Предполагается
+    периодический вызов (например, раз в сутки по cron), чтобы ограничить проигрывание журнала.
+    """
+    try:
+        checkpoint = create_checkpoint(
+            db, _utc_naive(checkpoint_in.taken_at) if checkpoint_in.taken_at else None
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+    db.commit()
+    db.refresh(checkpoint)
+    return checkpoint
@@ -0,0 +1,67 @@
+from typing import Generic, List, Optional, TypeVar
+from fastapi import APIRouter, Depends, HTTPException, status
+from sqlalchemy.orm import Session
+from pydantic import BaseModel
+from app.database import get_db
+from app.api.deps import get_current_active_user
+from app.api.v1.references import (
+    CompanyResponse,
+    DeviceTypeResponse,
+    VendorResponse,
+    EmployeeResponse,
+    WarehouseResponse,
+)
+from app.schemas.asset import Asset as AssetSchema
+from app.core.sync import SyncToken, collect_changes
+
+router = APIRouter()
+
+T = TypeVar("T")
+
+
+class SyncChanges(BaseModel, Generic[T]):
+    upserted: List[T]
+    deleted: List[int]
+
+
+class SyncResponse(BaseModel):
+    token: str
+    has_more: bool
+    reset: bool
+    companies: SyncChanges[CompanyResponse]
+    device_types: SyncChanges[DeviceTypeResponse]
+    vendors: SyncChanges[VendorResponse]
+    employees: SyncChanges[EmployeeResponse]
+    warehouses: SyncChanges[WarehouseResponse]
+    assets: SyncChanges[AssetSchema]
+
+
+@router.get("", response_model=SyncResponse)
+def sync(
+    since: Optional[str] = None,
+    db: Session = Depends(get_db),
+    current_user = Depends(get_current_active_user)
+):
+    """
+    Дельта-синхронизация справочников и активов для офлайн-копии на устройстве.
+    Без since — полная выгрузка. Клиент применяет upserted, затем deleted, сохраняет token
+    и при has_more сразу запрашивает следующую порцию.
+    reset=true — локальную копию нужно заменить (первая выгрузка или устаревший токен).
+    """
+    token = None
+    if since:
+        try:
+            token = SyncToken.decode(since)
+        except ValueError:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Invalid sync token"
+            )
+
+    changes, next_token, has_more, reset = collect_changes(db, token)
+    return SyncResponse(
+        token=next_token.encode(),
+        has_more=has_more,
+        reset=reset,
+        **changes,
+    )
@@ -0,0 +1,268 @@
+import csv
+import zipfile
+from collections import defaultdict
+from typing import BinaryIO, Dict, Iterator, List, Optional, Tuple, Union
+from openpyxl import load_workbook
+from openpyxl.utils.exceptions import InvalidFileException
+from pydantic import ValidationError
+from sqlalchemy import insert
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+from app.models.asset import Asset, LocationType
+from app.schemas.asset import AssetCreate, AssetImportError, AssetImportResult
+from app.core.reference_cache import get_snapshot
+from app.core.asset_summary import mark_assets_changed
+from app.core.inventory_number import reserve_inventory_numbers, format_inventory_number
+
+# Размер пачки: валидация серийников и вставка идут по BATCH_SIZE строк в одной транзакции
+BATCH_SIZE = 1000
+
+# Ошибки чтения файла (кодировка, битый CSV/XLSX). Ошибки в данных строки сюда не входят —
+# они разбираются в _parse_row, а прочие исключения — ошибки кода и не глушатся
+READ_ERRORS = (UnicodeDecodeError, csv.Error, zipfile.BadZipFile, InvalidFileException)
+
+
+class UnreadableRow:
+    """Строка файла, которую не удалось прочитать: попадает в отчёт, импорт продолжается."""
+
+    def __init__(self, message: str):
+        self.message = message
+
+
+Row = Tuple[int, Union[Dict[str, str], UnreadableRow]]
+
+
+def _cell(value) -> str:
+    """Приводит значение ячейки к строке (Excel отдаёт числа как int/float)."""
+    if value is None:
+        return ""
+    if isinstance(value, float) and value.is_integer():
+        value = int(value)
+    return str(value).strip()
+
+
+def iter_csv_rows(file: BinaryIO) -> Iterator[Row]:
+    """
+    Построчно читает CSV (первая строка — заголовок). Возвращает (номер строки, данные).
+    Каждая строка файла декодируется отдельно: строка не в UTF-8 возвращается как UnreadableRow.
+    """
+    bad_lines = set()
+
+    def decoded_lines() -> Iterator[str]:
+        for line_number, line in enumerate(file, start=1):
+            try:
+                yield line.decode("utf-8-sig" if line_number == 1 else "utf-8")
+            except UnicodeDecodeError:
+                bad_lines.add(line_number)
+                yield line.decode("utf-8", errors="replace")
+
+    reader = csv.DictReader(decoded_lines())
+    if reader.fieldnames:
+        reader.fieldnames = [(name or "").strip().lower() for name in reader.fieldnames]
+    if bad_lines:
+        raise csv.Error("Header row is not valid UTF-8")
+    last_line = reader.line_num
+    for row in reader:
+        # Запись CSV может занимать несколько строк файла (перевод строки в кавычках)
+        first_line, last_line = last_line + 1, reader.line_num
+        if not bad_lines.isdisjoint(range(first_line, last_line + 1)):
+            yield last_line, UnreadableRow("Row is not valid UTF-8")
+            continue
+        yield last_line, {k: _cell(v) for k, v in row.items() if k}
+
+
+def iter_xlsx_rows(file: BinaryIO) -> Iterator[Row]:
+    """Построчно читает первый лист XLSX в режиме read-only (первая строка — заголовок)."""
+    try:
+        wb = load_workbook(file, read_only=True, data_only=True)
+    except (KeyError, ValueError) as e:
+        # ZIP-архив без частей книги Excel (нет [Content_Types].xml, чужой тип содержимого)
+        raise InvalidFileException(f"Not an XLSX workbook: {e}") from e
+    try:
+        rows = wb.worksheets[0].iter_rows(values_only=True)
+        header = next(rows, None)
+        if not header:
+            return
+        names = [_cell(h).lower() for h in header]
+        for row_number, values in enumerate(rows, start=2):
+            if values is None or all(v is None for v in values):
+                continue
+            yield row_number, {name: _cell(v) for name, v in zip(names, values) if name}
+    finally:
+        wb.close()
+
+
+class _ReferenceSets:
+    """Справочники на весь импорт (из кэша справочников)."""
+
+    def __init__(self, db: Session):
+        self.company_codes = set(get_snapshot(db, "companies").by_key)
+        self.device_type_codes = set(get_snapshot(db, "device_types").by_key)
+        self.vendors_by_id = {i: row["name"] for i, row in get_snapshot(db, "vendors").by_key.items()}
+        self.vendors_by_name = {n: i for i, n in self.vendors_by_id.items()}
+        self.employee_ids = set(get_snapshot(db, "employees").by_key)
+        self.warehouse_ids = set(get_snapshot(db, "warehouses").by_key)
+
+
+def _parse_row(raw: Dict[str, str], refs: _ReferenceSets) -> Tuple[Optional[AssetCreate], List[str]]:
+    errors: List[str] = []
+
+    vendor_id = raw.get("vendor_id") or None
+    if vendor_id is None and raw.get("vendor"):
+        vendor_id = refs.vendors_by_name.get(raw["vendor"])
+        if vendor_id is None:
+            errors.append(f"Vendor {raw['vendor']} not found")
+            return None, errors
+
+    device_type_code = raw.get("device_type_code", "")
+    if device_type_code.isdigit() and len(device_type_code) == 1:
+        device_type_code = device_type_code.zfill(2)
+
+    try:
+        asset_in = AssetCreate(
+            company_code=raw.get("company_code", ""),
+            device_type_code=device_type_code,
+            serial_number=raw.get("serial_number", ""),
+            vendor_id=vendor_id,
+            model=raw.get("model", ""),
+            location_type=raw.get("location_type", ""),
+            location_id=raw.get("location_id") or None,
+        )
+    except ValidationError as e:
+        for err in e.errors():
+            field = ".".join(str(p) for p in err["loc"])
+            errors.append(f"{field}: {err['msg']}")
+        return None, errors
+    except ValueError as e:
+        errors.append(str(e))
+        return None, errors
+
+    if not asset_in.serial_number.strip():
+        errors.append("Serial number is required")
+    if asset_in.company_code not in refs.company_codes:
+        errors.append(f"Company with code {asset_in.company_code} not found")
+    if asset_in.device_type_code not in refs.device_type_codes:
+        errors.append(f"Device type with code {asset_in.device_type_code} not found")
+    if asset_in.vendor_id not in refs.vendors_by_id:
+        errors.append(f"Vendor with id {asset_in.vendor_id} not found")
+    if asset_in.location_type == LocationType.employee and asset_in.location_id not in refs.employee_ids:
+        errors.append(f"Employee with id {asset_in.location_id} not found")
+    if asset_in.location_type == LocationType.warehouse and asset_in.location_id not in refs.warehouse_ids:
+        errors.append(f"Warehouse with id {asset_in.location_id} not found")
+    return asset_in, errors
+
+
+def _insert_batch(
+    db: Session,
+    batch: List[Tuple[int, AssetCreate]],
+    refs: _ReferenceSets,
+    result: AssetImportResult,
+) -> None:
+    """Проверяет серийники пачки одним запросом и вставляет её в одной транзакции."""
+    serials = [a.serial_number for _, a in batch]
+    existing = {s for (s,) in db.query(Asset.serial_number).filter(Asset.serial_number.in_(serials)).all()}
+
+    valid: List[Tuple[int, AssetCreate]] = []
+    for row_number, asset_in in batch:
+        if asset_in.serial_number in existing:
+            result.errors.append(AssetImportError(
+                row=row_number,
+                serial_number=asset_in.serial_number,
+                errors=["Serial number already exists"],
+            ))
+        else:
+            valid.append((row_number, asset_in))
+    if not valid:
+        return
+
+    # Один диапазон номеров на каждый префикс пачки
+    by_prefix: Dict[Tuple[str, str], List[AssetCreate]] = defaultdict(list)
+    for _, asset_in in valid:
+        by_prefix[(asset_in.company_code, asset_in.device_type_code)].append(asset_in)
+
+    values = []
+    try:
+        for (company_code, device_type_code), assets_in in by_prefix.items():
+            last_number = reserve_inventory_numbers(db, company_code, device_type_code, count=len(assets_in))
+            first_number = last_number - len(assets_in) + 1
+            for offset, asset_in in enumerate(assets_in):
+                values.append({
+                    "company_code": company_code,
+                    "device_type_code": device_type_code,
+                    "inventory_number": format_inventory_number(company_code, device_type_code, first_number + offset),
+                    "serial_number": asset_in.serial_number,
+                    "vendor_id": asset_in.vendor_id,
+                    "vendor": refs.vendors_by_id[asset_in.vendor_id],
+                    "model": asset_in.model,
+                    "location_type": asset_in.location_type,
+                    "location_id": asset_in.location_id,
+                })
+        db.execute(insert(Asset), values)
+        mark_assets_changed(db)
+        db.commit()
+    except (IntegrityError, ValueError) as e:
+        db.rollback()
+        detail = str(e.orig) if isinstance(e, IntegrityError) else str(e)
+        for row_number, asset_in in valid:
+            result.errors.append(AssetImportError(
+                row=row_number,
+                serial_number=asset_in.serial_number,
+                errors=[f"Batch rejected: {detail}"],
+            ))
+        return
+
+    result.created += len(values)
+
+
+def import_assets(db: Session, rows: Iterator[Row]) -> AssetImportResult:
+    """
+    Импортирует активы из потока строк.
+    Ошибочные строки пропускаются и попадают в отчёт, остальные вставляются пачками.
+    Если файл перестаёт читаться после первых строк, прочитанное импортируется,
+    а место обрыва попадает в отчёт: пачки до него уже закоммичены.
+    """
+    refs = _ReferenceSets(db)
+    result = AssetImportResult(total_rows=0, created=0, failed=0, errors=[])
+    seen_serials = set()
+    batch: List[Tuple[int, AssetCreate]] = []
+
+    row_number = 0
+    try:
+        for row_number, raw in rows:
+            result.total_rows += 1
+            if isinstance(raw, UnreadableRow):
+                result.errors.append(AssetImportError(row=row_number, errors=[raw.message]))
+                continue
+
+            asset_in, errors = _parse_row(raw, refs)
+            if asset_in is not None and not errors:
+                if asset_in.serial_number in seen_serials:
+                    errors.append("Duplicate serial number in file")
+                seen_serials.add(asset_in.serial_number)
+            if errors:
+                result.errors.append(AssetImportError(
+                    row=row_number,
+                    serial_number=raw.get("serial_number") or None,
+                    errors=errors,
+                ))
+                continue
+
+            batch.append((row_number, asset_in))
+            if len(batch) >= BATCH_SIZE:
+                _insert_batch(db, batch, refs, result)
+                batch = []
+    except READ_ERRORS as e:
+        # Не прочитано ни одной строки — файл битый целиком, в БД ничего не записано
+        if result.total_rows == 0:
+            raise
+        result.errors.append(AssetImportError(
+            row=row_number + 1,
+            errors=[f"Cannot read file from this row: {e}. Remaining rows were not imported"],
+        ))
+
+    if batch:
+        _insert_batch(db, batch, refs, result)
+
+    result.errors.sort(key=lambda e: e.row)
+    result.failed = len(result.errors)
+    return result
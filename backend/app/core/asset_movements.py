@@ -0,0 +1,96 @@
+from collections import defaultdict
+from typing import Dict, List, Sequence, Tuple
+from sqlalchemy import insert, update
+from sqlalchemy.orm import Session
+from app.core.asset_summary import mark_assets_changed
+from app.core.reference_cache import get_reference
+from app.models.asset import Asset, LocationType
+from app.models.movement import Movement
+from app.schemas.movement import MovementBulkOutcome, MovementCreate
+
+# Итог по одному активу (MovementBulkOutcome.status)
+MOVED = "moved"
+NOT_FOUND = "not_found"
+SAME_LOCATION = "same_location"
+INVALID_DESTINATION = "invalid_destination"
+DUPLICATE = "duplicate"
+
+_LOCATION_TABLES = {
+    LocationType.employee: "employees",
+    LocationType.warehouse: "warehouses",
+}
+
+
+def move_assets(db: Session, moves: Sequence[MovementCreate]) -> List[MovementBulkOutcome]:
+    """
+    Перемещает активы пачкой и коммитит. Места назначения проверяются по одному разу,
+    активы блокируются одним SELECT ... FOR UPDATE (по id — без взаимных блокировок),
+    движения вставляются одним INSERT, локации обновляются одним UPDATE на место назначения.
+    Итоги возвращаются в порядке moves; повтор актива в пачке — duplicate.
+    """
+    destinations = {(move.to_type, move.to_id) for move in moves}
+    valid_destinations = {
+        (to_type, to_id) for to_type, to_id in destinations
+        if get_reference(db, _LOCATION_TABLES[LocationType(to_type)], to_id)
+    }
+
+    asset_ids = sorted({move.asset_id for move in moves})
+    locations: Dict[int, Tuple[LocationType, int]] = {
+        asset_id: (location_type, location_id)
+        for asset_id, location_type, location_id in db.query(
+            Asset.id, Asset.location_type, Asset.location_id
+        ).filter(Asset.id.in_(asset_ids)).order_by(Asset.id).with_for_update()
+    } if asset_ids else {}
+
+    statuses: Dict[int, str] = {}
+    rows = []
+    by_destination: Dict[Tuple[LocationType, int], List[int]] = defaultdict(list)
+    for move in moves:
+        if move.asset_id in statuses:
+            continue
+        location = locations.get(move.asset_id)
+        if location is None:
+            statuses[move.asset_id] = NOT_FOUND
+        elif (move.to_type, move.to_id) not in valid_destinations:
+            statuses[move.asset_id] = INVALID_DESTINATION
+        elif location == (move.to_type, move.to_id):
+            statuses[move.asset_id] = SAME_LOCATION
+        else:
+            statuses[move.asset_id] = MOVED
+            rows.append({
+                "asset_id": move.asset_id,
+                "from_type": location[0],
+                "from_id": location[1],
+                "to_type": move.to_type,
+                "to_id": move.to_id,
+            })
+            by_destination[(move.to_type, move.to_id)].append(move.asset_id)
+
+    movement_ids: Dict[int, int] = {}
+    if rows:
+        stmt = insert(Movement).returning(Movement.id, Movement.asset_id)
+        for movement_id, asset_id in db.execute(stmt, rows):
+            movement_ids[asset_id] = movement_id
+        for (to_type, to_id), ids in by_destination.items():
+            db.execute(
+                update(Asset)
+                .where(Asset.id.in_(ids))
+                .values(location_type=to_type, location_id=to_id)
+                .execution_options(synchronize_session=False)
+            )
+        mark_assets_changed(db)
+    db.commit()
+
+    outcomes: List[MovementBulkOutcome] = []
+    reported = set()
+    for move in moves:
+        if move.asset_id in reported:
+            outcomes.append(MovementBulkOutcome(asset_id=move.asset_id, status=DUPLICATE))
+            continue
+        reported.add(move.asset_id)
+        outcomes.append(MovementBulkOutcome(
+            asset_id=move.asset_id,
+            status=statuses[move.asset_id],
+            movement_id=movement_ids.get(move.asset_id),
+        ))
+    return outcomes
@@ -0,0 +1,46 @@
+from sqlalchemy import case, func, literal, or_
+from sqlalchemy.orm import Session
+from app.database import is_postgresql
+from app.models.asset import Asset
+
+# Поля поиска; на Postgres для каждого есть GIN индекс pg_trgm (ix_assets_<поле>_trgm)
+SEARCH_COLUMNS = (Asset.inventory_number, Asset.serial_number, Asset.vendor, Asset.model)
+
+LIKE_ESCAPE = "\\"
+
+
+def _like_literal(term: str) -> str:
+    """Экранирует % и _ (и сам escape-символ): термин ищется буквально, как в similarity/%."""
+    return term.replace(LIKE_ESCAPE, LIKE_ESCAPE * 2).replace("%", LIKE_ESCAPE + "%").replace("_", LIKE_ESCAPE + "_")
+
+
+def asset_search_filter(db: Session, search: str, fuzzy: bool = False):
+    """
+    Условие поиска подстроки по SEARCH_COLUMNS.
+    ILIKE '%term%' на Postgres обслуживается триграммными индексами (для term от 3 символов).
+    fuzzy добавляет совпадения с опечатками (оператор pg_trgm %), только на Postgres.
+    """
+    pattern = f"%{_like_literal(search)}%"
+    conditions = [column.ilike(pattern, escape=LIKE_ESCAPE) for column in SEARCH_COLUMNS]
+    if fuzzy and is_postgresql(db):
+        conditions += [column.op("%")(search) for column in SEARCH_COLUMNS]
+    return or_(*conditions)
+
+
+def asset_search_rank(db: Session, search: str):
+    """
+    Релевантность для сортировки по убыванию.
+    Postgres: максимальная триграммная похожесть по полям.
+    Прочие БД: точное совпадение номера/серийника > начало строки > вхождение.
+    """
+    if is_postgresql(db):
+        return func.greatest(*[func.similarity(column, search) for column in SEARCH_COLUMNS])
+
+    term = search.lower()
+    return case(
+        (or_(func.lower(Asset.inventory_number) == term, func.lower(Asset.serial_number) == term), 3),
+        (or_(*[
+            func.lower(column).like(f"{_like_literal(term)}%", escape=LIKE_ESCAPE) for column in SEARCH_COLUMNS
+        ]), 2),
+        else_=literal(1),
+    )
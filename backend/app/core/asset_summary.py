@@ -0,0 +1,84 @@
+import threading
+import time
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Dict, Optional, Tuple
+from sqlalchemy import func
+from sqlalchemy.orm import Session
+from app.config import settings
+from app.core.notifications import notify, on_listener_reconnect, subscribe
+from app.models.asset import Asset, LocationType
+
+# Сводные счётчики активов для дашборда в памяти воркера. Любое изменение активов
+# (создание, правка, удаление, импорт, перемещение) вызывает mark_assets_changed():
+# после коммита сводка сбрасывается здесь и, через LISTEN/NOTIFY, в остальных воркерах.
+# Короткий TTL страхует от потерянных уведомлений.
+ASSETS_TOPIC = "assets_changed"
+
+
+@dataclass(frozen=True)
+class AssetCounts:
+    total: int
+    by_device_type: Dict[str, int]
+    by_company: Dict[str, int]
+    by_location_type: Dict[LocationType, int]
+    by_location: Dict[Tuple[LocationType, int], int]
+    computed_at: datetime
+
+
+_counts: Optional[AssetCounts] = None
+_loaded_at = 0.0
+_version = 0
+_lock = threading.Lock()
+
+
+def _compute(db: Session) -> AssetCounts:
+    # Три GROUP BY по индексированным колонкам; итог и разбивка по типу места — из разбивки по месту
+    by_device_type = dict(db.query(Asset.device_type_code, func.count(Asset.id)).group_by(Asset.device_type_code))
+    by_company = dict(db.query(Asset.company_code, func.count(Asset.id)).group_by(Asset.company_code))
+    by_location: Dict[Tuple[LocationType, int], int] = {}
+    by_location_type: Dict[LocationType, int] = {location_type: 0 for location_type in LocationType}
+    for location_type, location_id, count in db.query(
+        Asset.location_type, Asset.location_id, func.count(Asset.id)
+    ).group_by(Asset.location_type, Asset.location_id):
+        by_location[(location_type, location_id)] = count
+        by_location_type[location_type] += count
+    return AssetCounts(
+        total=sum(by_location_type.values()),
+        by_device_type=by_device_type,
+        by_company=by_company,
+        by_location_type=by_location_type,
+        by_location=by_location,
+        computed_at=datetime.utcnow(),
+    )
+
+
+def get_asset_counts(db: Session) -> AssetCounts:
+    global _counts, _loaded_at
+    with _lock:
+        counts, loaded_at, version = _counts, _loaded_at, _version
+    if counts is not None and time.monotonic() - loaded_at <= settings.SUMMARY_CACHE_TTL_SECONDS:
+        return counts
+
+    counts = _compute(db)
+    with _lock:
+        # Пока считали, активы могли измениться — такую сводку не сохраняем
+        if _version == version:
+            _counts, _loaded_at = counts, time.monotonic()
+    return counts
+
+
+def invalidate_asset_counts(_payload=None) -> None:
+    global _counts, _version
+    with _lock:
+        _version += 1
+        _counts = None
+
+
+def mark_assets_changed(db: Session) -> None:
+    """Вызывать в транзакции, меняющей активы или их расположение, до commit."""
+    notify(db, ASSETS_TOPIC)
+
+
+subscribe(ASSETS_TOPIC, invalidate_asset_counts)
+on_listener_reconnect(invalidate_asset_counts)
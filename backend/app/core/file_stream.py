@@ -0,0 +1,19 @@
+from typing import BinaryIO, Iterator
+
+CHUNK_SIZE = 64 * 1024
+
+
+def stream_file(file: BinaryIO, chunk_size: int = CHUNK_SIZE) -> Iterator[bytes]:
+    """
+    Отдаёт файл (обычно tempfile) кусками для StreamingResponse и закрывает его в конце.
+    Так большие выгрузки не копируются целиком в память процесса.
+    """
+    try:
+        file.seek(0)
+        while True:
+            chunk = file.read(chunk_size)
+            if not chunk:
+                break
+            yield chunk
+    finally:
+        file.close()
@@ -0,0 +1,134 @@
+from collections import defaultdict
+from typing import Dict, Iterable, List, Optional, Tuple
+from sqlalchemy import case, func, update
+from sqlalchemy.orm import Session
+from app.database import dialect_insert
+from app.models.asset import Asset
+from app.models.inventory_result import InventoryResult
+from app.models.inventory_session import InventorySession
+from app.models.inventory_session_stats import InventorySessionStats
+
+# Прогресс сессии хранится готовыми счётчиками, а не считается COUNT на каждый опрос:
+# итоги — в inventory_sessions, разбивка по типам устройств — в inventory_session_stats.
+
+
+def snapshot_session_totals(db: Session, session: InventorySession) -> None:
+    """Фиксирует число активов в области сессии по типам устройств. Вызывать при создании, до commit."""
+    query = db.query(Asset.device_type_code, func.count(Asset.id)).group_by(Asset.device_type_code)
+    scope_codes = session.device_type_codes
+    if scope_codes:
+        query = query.filter(Asset.device_type_code.in_(scope_codes))
+    totals = dict(query.all())
+    for code in scope_codes:
+        totals.setdefault(code, 0)
+
+    db.add_all(
+        InventorySessionStats(session_id=session.id, device_type_code=code, total_assets=total)
+        for code, total in totals.items()
+    )
+    session.total_assets = sum(totals.values())
+
+
+def apply_result_counts(
+    db: Session, session_id: int, results: Iterable[Tuple[str, bool]]
+) -> Optional[Dict[str, int]]:
+    """
+    Увеличивает счётчики на вставленные результаты: пары (device_type_code, found).
+    Вызывать в той же транзакции, что и вставку; UPDATE ... SET x = x + n атомарен.
+    Возвращает новые итоги сессии (как в InventoryProgress) или None, если нечего учитывать.
+    """
+    by_type: Dict[str, List[int]] = defaultdict(lambda: [0, 0])
+    for device_type_code, found in results:
+        by_type[device_type_code][0 if found else 1] += 1
+    if not by_type:
+        return None
+
+    found = sum(counts[0] for counts in by_type.values())
+    not_found = sum(counts[1] for counts in by_type.values())
+    totals = db.execute(
+        update(InventorySession)
+        .where(InventorySession.id == session_id)
+        .values(
+            checked_count=InventorySession.checked_count + found + not_found,
+            found_count=InventorySession.found_count + found,
+            not_found_count=InventorySession.not_found_count + not_found,
+        )
+        .returning(
+            InventorySession.total_assets,
+            InventorySession.checked_count,
+            InventorySession.found_count,
+            InventorySession.not_found_count,
+        )
+        .execution_options(synchronize_session=False)
+    ).one()
+
+    # Тип устройства мог появиться после создания сессии — тогда строки статистики ещё нет
+    stmt = dialect_insert(db, InventorySessionStats)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=["session_id", "device_type_code"],
+        set_={
+            "checked_count": InventorySessionStats.checked_count + stmt.excluded.checked_count,
+            "found_count": InventorySessionStats.found_count + stmt.excluded.found_count,
+            "not_found_count": InventorySessionStats.not_found_count + stmt.excluded.not_found_count,
+        },
+    )
+    db.execute(stmt, [
+        {
+            "session_id": session_id,
+            "device_type_code": code,
+            "total_assets": 0,
+            "checked_count": counts[0] + counts[1],
+            "found_count": counts[0],
+            "not_found_count": counts[1],
+        }
+        for code, counts in sorted(by_type.items())
+    ])
+    return session_progress(session_id, *totals)
+
+
+def session_progress(session_id: int, total: int, checked: int, found: int, not_found: int) -> Dict[str, int]:
+    return {
+        "session_id": session_id,
+        "checked": checked,
+        "total": total,
+        "remaining": max(total - checked, 0),
+        "found": found,
+        "not_found": not_found,
+    }
+
+
+def rebuild_session_counters(db: Session, session: InventorySession) -> bool:
+    """
+    Пересчитывает checked/found/not_found сессии по inventory_results (проверка согласованности).
+    total_assets не трогает — это снимок на момент создания. Возвращает True, если счётчики
+    расходились и были исправлены. Коммит — за вызывающим.
+    """
+    query = db.query(
+        Asset.device_type_code,
+        func.count(InventoryResult.id),
+        func.sum(case((InventoryResult.found.is_(True), 1), else_=0)),
+    ).join(Asset, Asset.id == InventoryResult.asset_id).filter(
+        InventoryResult.session_id == session.id
+    )
+    if session.device_type_codes:
+        query = query.filter(Asset.device_type_code.in_(session.device_type_codes))
+    actual = {code: (int(checked), int(found or 0)) for code, checked, found in query.group_by(Asset.device_type_code)}
+
+    changed = False
+    stats = {s.device_type_code: s for s in session.stats}
+    for code in set(stats) | set(actual):
+        checked, found = actual.get(code, (0, 0))
+        stat = stats.get(code)
+        if stat is None:
+            stat = InventorySessionStats(session_id=session.id, device_type_code=code, total_assets=0)
+            session.stats.append(stat)
+        if (stat.checked_count, stat.found_count, stat.not_found_count) != (checked, found, checked - found):
+            stat.checked_count, stat.found_count, stat.not_found_count = checked, found, checked - found
+            changed = True
+
+    checked = sum(c for c, _ in actual.values())
+    found = sum(f for _, f in actual.values())
+    if (session.checked_count, session.found_count, session.not_found_count) != (checked, found, checked - found):
+        session.checked_count, session.found_count, session.not_found_count = checked, found, checked - found
+        changed = True
+    return changed
@@ -0,0 +1,111 @@
+import asyncio
+import threading
+from collections import defaultdict
+from typing import Any, Dict, Optional, Sequence, Set
+from sqlalchemy.orm import Session
+from app.core.notifications import notify, on_listener_reconnect, subscribe
+
+# Живые события сессии инвентаризации для наблюдателей (SSE).
+# Запись результатов публикует одно событие через notifications: другие воркеры получают его
+# одним NOTIFY и раздают своим подписчикам, так что N наблюдателей не дают N опросов БД.
+EVENTS_TOPIC = "inventory_session_events"
+
+# Событие NOTIFY ограничено 8000 байт: длинные пачки передаются без списка активов
+EVENT_ASSET_IDS_LIMIT = 500
+SUBSCRIBER_QUEUE_SIZE = 100
+# Комментарий-пинг раз в 15 с держит соединение через прокси; retry — пауза переподключения EventSource
+SSE_KEEPALIVE_SECONDS = 15
+SSE_RETRY_MS = 3000
+
+
+class SessionEventSubscriber:
+    """Очередь событий одного наблюдателя; наполняется из любого потока через его event loop."""
+
+    def __init__(self, session_id: int, loop: asyncio.AbstractEventLoop):
+        self.session_id = session_id
+        self.loop = loop
+        self.queue: "asyncio.Queue[Dict[str, Any]]" = asyncio.Queue(maxsize=SUBSCRIBER_QUEUE_SIZE)
+        # Очередь переполнилась (медленный клиент) — вместо потерянных событий клиент получит resync
+        self.overflowed = False
+
+    def offer(self, event: Dict[str, Any]) -> None:
+        try:
+            self.loop.call_soon_threadsafe(self._put, event)
+        except RuntimeError:
+            pass  # event loop уже закрыт: клиент отключился при остановке воркера
+
+    def drain(self) -> None:
+        """Сбрасывает накопленные события: клиент получит свежий снимок вместо них."""
+        while not self.queue.empty():
+            self.queue.get_nowait()
+        self.overflowed = False
+
+    def _put(self, event: Dict[str, Any]) -> None:
+        try:
+            self.queue.put_nowait(event)
+        except asyncio.QueueFull:
+            self.overflowed = True
+
+
+_subscribers: Dict[int, Set[SessionEventSubscriber]] = defaultdict(set)
+_lock = threading.Lock()
+
+
+def add_subscriber(session_id: int) -> SessionEventSubscriber:
+    """Вызывать из корутины: очередь привязывается к текущему event loop."""
+    subscriber = SessionEventSubscriber(session_id, asyncio.get_running_loop())
+    with _lock:
+        _subscribers[session_id].add(subscriber)
+    return subscriber
+
+
+def remove_subscriber(subscriber: SessionEventSubscriber) -> None:
+    with _lock:
+        subscribers = _subscribers.get(subscriber.session_id)
+        if subscribers is not None:
+            subscribers.discard(subscriber)
+            if not subscribers:
+                del _subscribers[subscriber.session_id]
+
+
+def publish_results_added(
+    db: Session,
+    session_id: int,
+    asset_ids: Sequence[int],
+    progress: Dict[str, int],
+) -> None:
+    """Вызывать до commit, в транзакции записи результатов. progress — новые итоги сессии."""
+    notify(db, EVENTS_TOPIC, {
+        "type": "results",
+        "session_id": session_id,
+        "count": len(asset_ids),
+        "asset_ids": list(asset_ids) if len(asset_ids) <= EVENT_ASSET_IDS_LIMIT else None,
+        "progress": progress,
+    })
+
+
+def publish_session_completed(db: Session, session_id: int) -> None:
+    notify(db, EVENTS_TOPIC, {"type": "completed", "session_id": session_id})
+
+
+def _dispatch(event: Dict[str, Any], session_id: Optional[int] = None) -> None:
+    with _lock:
+        if session_id is None:
+            subscribers = [s for group in _subscribers.values() for s in group]
+        else:
+            subscribers = list(_subscribers.get(session_id, ()))
+    for subscriber in subscribers:
+        subscriber.offer(event)
+
+
+def _on_event(payload: Dict[str, Any]) -> None:
+    _dispatch(payload, payload["session_id"])
+
+
+def _on_reconnect() -> None:
+    # Пока слушатель был отключён, события других воркеров потеряны
+    _dispatch({"type": "resync"})
+
+
+subscribe(EVENTS_TOPIC, _on_event)
+on_listener_reconnect(_on_reconnect)
@@ -1,7 +1,98 @@
+from typing import Optional
+from sqlalchemy import func, update
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.orm import Session
 from app.models.asset import Asset
+from app.models.inventory_number_counter import InventoryNumberCounter
 import re
 
+MAX_INVENTORY_NUMBER = 9999
+
+
+def _increment_counter(
+    db: Session,
+    company_code: str,
+    device_type_code: str,
+    count: int
+) -> Optional[int]:
+    """
+    Атомарно увеличивает счётчик (UPDATE ... RETURNING).
+    Строка счётчика остаётся заблокированной до конца транзакции, поэтому
+    параллельные запросы (в т.ч. из других воркеров) получают разные номера.
+    """
+    stmt = (
+        update(InventoryNumberCounter)
+        .where(
+            InventoryNumberCounter.company_code == company_code,
+            InventoryNumberCounter.device_type_code == device_type_code,
+            InventoryNumberCounter.last_number + count <= MAX_INVENTORY_NUMBER,
+        )
+        .values(last_number=InventoryNumberCounter.last_number + count)
+        .returning(InventoryNumberCounter.last_number)
+        .execution_options(synchronize_session=False)
+    )
+    return db.execute(stmt).scalar_one_or_none()
+
+
+def _seed_counter(db: Session, company_code: str, device_type_code: str) -> None:
+    """
+    Создаёт счётчик для нового префикса, начиная с максимального существующего номера.
+    Выполняется один раз на префикс.
+    """
+    prefix = f"{company_code}-{device_type_code}/"
+    # Номер дополнен нулями до 4 знаков, поэтому строковый максимум = числовой
+    last = db.query(func.max(Asset.inventory_number)).filter(
+        Asset.inventory_number.like(f"{prefix}%")
+    ).scalar()
+
+    last_number = 0
+    if last:
+        number_part = last.split('/')[-1]
+        if number_part.isdigit():
+            last_number = int(number_part)
+
+    try:
+        with db.begin_nested():
+            db.add(InventoryNumberCounter(
+                company_code=company_code,
+                device_type_code=device_type_code,
+                last_number=last_number
+            ))
+    except IntegrityError:
+        # Счётчик уже создан параллельным запросом
+        pass
+
+
+def reserve_inventory_numbers(
+    db: Session,
+    company_code: str,
+    device_type_code: str,
+    count: int = 1
+) -> int:
+    """
+    Резервирует `count` подряд идущих номеров для префикса и возвращает последний из них.
+    Номера считаются выданными только после коммита транзакции вызывающего.
+    """
+    last_number = _increment_counter(db, company_code, device_type_code, count)
+    if last_number is None:
+        exists = db.query(InventoryNumberCounter.last_number).filter(
+            InventoryNumberCounter.company_code == company_code,
+            InventoryNumberCounter.device_type_code == device_type_code
+        ).first()
+        if not exists:
+            _seed_counter(db, company_code, device_type_code)
+            last_number = _increment_counter(db, company_code, device_type_code, count)
+
+    if last_number is None:
+        raise ValueError(f"Maximum number of assets reached for {company_code}-{device_type_code}/")
+
+    return last_number
+
+
+def format_inventory_number(company_code: str, device_type_code: str, number: int) -> str:
+    """Форматирует номер с ведущими нулями: WWP-01/0030"""
+    return f"{company_code}-{device_type_code}/{number:04d}"
+
 
 def generate_inventory_number(
     db: Session,
@@ -12,40 +103,8 @@ def generate_inventory_number(
     Генерирует следующий инвентарный номер для комбинации company_code + device_type_code
     Формат: WWP-01/0030
     """
-    # Формируем префикс: COMPANY_CODE-DEVICE_TYPE_CODE/
-    prefix = f"{company_code}-{device_type_code}/"
-    
-    # Ищем последний номер для этой комбинации
-    pattern = f"^{re.escape(prefix)}\\d{{4}}$"
-    
-    # Получаем все активы с таким префиксом
-    assets = db.query(Asset).filter(
-        Asset.inventory_number.like(f"{prefix}%")
-    ).all()
-    
-    # Извлекаем номера и находим максимальный
-    max_number = 0
-    for asset in assets:
-        # Извлекаем числовую часть (последние 4 цифры после слеша)
-        number_part = asset.inventory_number.split('/')[-1]
-        try:
-            num = int(number_part)
-            if num > max_number:
-                max_number = num
-        except ValueError:
-            continue
-    
-    # Генерируем следующий номер
-    next_number = max_number + 1
-    
-    # Проверяем, что не превышен лимит 9999
-    if next_number > 9999:
-        raise ValueError(f"Maximum number of assets reached for {prefix}")
-    
-    # Форматируем номер с ведущими нулями
-    inventory_number = f"{prefix}{next_number:04d}"
-    
-    return inventory_number
+    number = reserve_inventory_numbers(db, company_code, device_type_code)
+    return format_inventory_number(company_code, device_type_code, number)
 
 
 def validate_inventory_number_format(inventory_number: str) -> bool:
@@ -56,3 +115,15 @@ def validate_inventory_number_format(inventory_number: str) -> bool:
     return bool(re.match(pattern, inventory_number))
 
 
+_INVENTORY_NUMBER_IN_TEXT = re.compile(r'[A-Z]{3}-\d{2}/\d{4}')
+
+
+def extract_inventory_number(payload: str) -> str:
+    """
+    Инвентарный номер из содержимого QR кода.
+    Наклейки кодируют сам номер; если номер встречается внутри текста (URL и т.п.) — берётся он,
+    иначе возвращается нормализованная строка как есть.
+    """
+    text = (payload or "").strip().upper()
+    match = _INVENTORY_NUMBER_IN_TEXT.search(text)
+    return match.group(0) if match else text
@@ -0,0 +1,142 @@
+from datetime import datetime
+from typing import Dict, List, Optional, Sequence, Tuple
+from sqlalchemy import exists, literal, select
+from sqlalchemy.orm import Session
+from app.database import dialect_insert
+from app.core.inventory_counters import apply_result_counts
+from app.core.inventory_events import publish_results_added
+from app.core.inventory_state import SessionState, mark_checked
+from app.models.asset import Asset
+from app.models.inventory_result import InventoryResult
+from app.models.inventory_session import InventorySession
+from app.schemas.inventory import InventoryResultCreate, InventoryResultOutcome
+
+# Итог по одному результату (InventoryResultOutcome.status)
+CREATED = "created"
+DUPLICATE = "duplicate"
+NOT_FOUND = "not_found"
+OUT_OF_SCOPE = "out_of_scope"
+SESSION_COMPLETED = "session_completed"
+
+
+def record_results(
+    db: Session,
+    session: InventorySession,
+    items: Sequence[InventoryResultCreate],
+) -> List[InventoryResultOutcome]:
+    """
+    Записывает результаты инвентаризации пачкой и коммитит.
+    Активы проверяются одним запросом, вставка — одним INSERT ... ON CONFLICT DO NOTHING
+    по (session_id, asset_id): повтор (в т.ч. параллельный) получает статус duplicate.
+    Итоги возвращаются в порядке items. Сессия должна быть проверена вызывающим (не завершена).
+    """
+    asset_ids = {item.asset_id for item in items}
+    device_types: Dict[int, str] = dict(
+        db.query(Asset.id, Asset.device_type_code).filter(Asset.id.in_(asset_ids)).all()
+    ) if asset_ids else {}
+    scope_codes = set(session.device_type_codes)
+
+    statuses: Dict[int, str] = {}
+    rows = []
+    for item in items:
+        if item.asset_id in statuses:
+            continue
+        device_type_code = device_types.get(item.asset_id)
+        if device_type_code is None:
+            statuses[item.asset_id] = NOT_FOUND
+        elif scope_codes and device_type_code not in scope_codes:
+            statuses[item.asset_id] = OUT_OF_SCOPE
+        else:
+            statuses[item.asset_id] = DUPLICATE  # станет created, если строка вставится
+            rows.append({
+                "session_id": session.id,
+                "asset_id": item.asset_id,
+                "found": item.found,
+                "actual_location_type": item.actual_location_type,
+                "actual_location_id": item.actual_location_id,
+            })
+
+    result_ids: Dict[int, int] = {}
+    if rows:
+        stmt = dialect_insert(db, InventoryResult).on_conflict_do_nothing(
+            index_elements=["session_id", "asset_id"]
+        ).returning(InventoryResult.id, InventoryResult.asset_id)
+        for result_id, asset_id in db.execute(stmt, rows):
+            result_ids[asset_id] = result_id
+            statuses[asset_id] = CREATED
+        progress = apply_result_counts(db, session.id, [
+            (device_types[row["asset_id"]], row["found"]) for row in rows if row["asset_id"] in result_ids
+        ])
+        if progress is not None:
+            publish_results_added(db, session.id, list(result_ids), progress)
+    db.commit()
+    mark_checked(session.id, result_ids)
+
+    # Повтор asset_id внутри одной пачки — duplicate для второго и следующих
+    outcomes: List[InventoryResultOutcome] = []
+    reported = set()
+    for item in items:
+        if item.asset_id in reported:
+            outcomes.append(InventoryResultOutcome(asset_id=item.asset_id, status=DUPLICATE))
+            continue
+        reported.add(item.asset_id)
+        outcomes.append(InventoryResultOutcome(
+            asset_id=item.asset_id,
+            status=statuses[item.asset_id],
+            result_id=result_ids.get(item.asset_id),
+        ))
+    return outcomes
+
+
+def record_scan(
+    db: Session,
+    state: SessionState,
+    asset: Asset,
+    found: bool = True,
+    actual_location_type=None,
+    actual_location_id: Optional[int] = None,
+) -> Tuple[str, Optional[int]]:
+    """
+    Записывает результат скана и коммитит. Возвращает (статус, id результата).
+    Область и повтор проверяются по состоянию сессии в памяти; вставка идёт одним
+    INSERT ... SELECT ... WHERE сессия не завершена ON CONFLICT DO NOTHING.
+    """
+    asset_id = asset.id  # после commit атрибуты asset истекают
+    device_type_code = asset.device_type_code
+    if not state.in_scope(device_type_code):
+        return OUT_OF_SCOPE, None
+    if asset_id in state.checked:
+        return DUPLICATE, None
+
+    columns = InventoryResult.__table__.c
+    values = select(
+        literal(state.session_id, columns.session_id.type),
+        literal(asset_id, columns.asset_id.type),
+        literal(found, columns.found.type),
+        literal(actual_location_type, columns.actual_location_type.type),
+        literal(actual_location_id, columns.actual_location_id.type),
+        literal(datetime.utcnow(), columns.confirmed_at.type),
+    ).where(
+        exists().where(InventorySession.id == state.session_id, InventorySession.completed_at.is_(None))
+    )
+    stmt = dialect_insert(db, InventoryResult).from_select(
+        ["session_id", "asset_id", "found", "actual_location_type", "actual_location_id", "confirmed_at"],
+        values,
+    ).on_conflict_do_nothing(index_elements=["session_id", "asset_id"]).returning(InventoryResult.id)
+    result_id = db.execute(stmt).scalar_one_or_none()
+
+    if result_id is None:
+        # Ничего не вставлено: либо сессию уже завершили (в другом воркере), либо повтор
+        completed_at = db.query(InventorySession.completed_at).filter(InventorySession.id == state.session_id).scalar()
+        db.commit()
+        if completed_at is not None:
+            state.completed = True
+            return SESSION_COMPLETED, None
+        state.checked.add(asset_id)
+        return DUPLICATE, None
+
+    progress = apply_result_counts(db, state.session_id, [(device_type_code, found)])
+    publish_results_added(db, state.session_id, [asset_id], progress)
+    db.commit()
+    state.checked.add(asset_id)
+    return CREATED, result_id
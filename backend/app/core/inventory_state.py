@@ -0,0 +1,99 @@
+import threading
+from collections import OrderedDict
+from typing import FrozenSet, Optional
+from sqlalchemy.orm import Session
+from app.core.notifications import notify, subscribe
+from app.models.inventory_result import InventoryResult
+from app.models.inventory_session import InventorySession
+
+# Состояние активных сессий инвентаризации в памяти воркера для быстрого скана:
+# область (типы устройств), признак завершения и битовая карта уже отмеченных активов.
+# Это подсказка, а не источник истины: вставка результата защищена уникальным ключом
+# и проверкой завершения в БД, поэтому устаревшее состояние в другом воркере безопасно.
+SESSION_STATE_CACHE_SIZE = 64
+SESSION_TOPIC = "inventory_session_changed"
+
+
+class AssetBitmap:
+    """Множество id активов в виде битовой карты (100k активов ~ 12.5 KB)."""
+
+    __slots__ = ("_bits",)
+
+    def __init__(self):
+        self._bits = bytearray()
+
+    def add(self, asset_id: int) -> None:
+        index = asset_id >> 3
+        if index >= len(self._bits):
+            self._bits.extend(bytes(index - len(self._bits) + 1))
+        self._bits[index] |= 1 << (asset_id & 7)
+
+    def __contains__(self, asset_id: int) -> bool:
+        index = asset_id >> 3
+        return index < len(self._bits) and bool(self._bits[index] & (1 << (asset_id & 7)))
+
+
+class SessionState:
+    __slots__ = ("session_id", "scope_codes", "completed", "checked")
+
+    def __init__(self, session_id: int, scope_codes: FrozenSet[str], completed: bool):
+        self.session_id = session_id
+        self.scope_codes = scope_codes  # пусто = все типы устройств
+        self.completed = completed
+        self.checked = AssetBitmap()
+
+    def in_scope(self, device_type_code: str) -> bool:
+        return not self.scope_codes or device_type_code in self.scope_codes
+
+
+_states: "OrderedDict[int, SessionState]" = OrderedDict()
+_lock = threading.Lock()
+
+
+def get_session_state(db: Session, session_id: int) -> Optional[SessionState]:
+    """Состояние сессии; при первом обращении в воркере загружается из БД. None — сессии нет."""
+    with _lock:
+        state = _states.get(session_id)
+        if state is not None:
+            _states.move_to_end(session_id)
+            return state
+
+    session = db.query(InventorySession).filter(InventorySession.id == session_id).first()
+    if session is None:
+        return None
+    state = SessionState(session.id, frozenset(session.device_type_codes), session.completed_at is not None)
+    for (asset_id,) in db.query(InventoryResult.asset_id).filter(InventoryResult.session_id == session_id):
+        state.checked.add(asset_id)
+
+    with _lock:
+        # Параллельная загрузка: оставляем уже сохранённое состояние
+        state = _states.setdefault(session_id, state)
+        _states.move_to_end(session_id)
+        while len(_states) > SESSION_STATE_CACHE_SIZE:
+            _states.popitem(last=False)
+    return state
+
+
+def mark_checked(session_id: int, asset_ids) -> None:
+    """Отмечает активы в уже загруженном состоянии сессии (не загружает его)."""
+    with _lock:
+        state = _states.get(session_id)
+    if state is not None:
+        for asset_id in asset_ids:
+            state.checked.add(asset_id)
+
+
+def drop_session_state(session_id: Optional[int] = None) -> None:
+    with _lock:
+        if session_id is None:
+            _states.clear()
+        else:
+            _states.pop(session_id, None)
+
+
+def mark_session_changed(db: Session, session_id: int) -> None:
+    """Вызывать до commit при изменении сессии (завершение, область): состояние перечитается."""
+    notify(db, SESSION_TOPIC, session_id)
+
+
+subscribe(SESSION_TOPIC, drop_session_state)
@@ -0,0 +1,193 @@
+import json
+import multiprocessing
+import os
+import re
+import tempfile
+import threading
+import time
+import uuid
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from datetime import datetime
+from typing import Optional
+from app.config import settings
+from app.core.labels import render_label_batch
+from app.core.pdf_stream import PdfConcatenator
+
+# Состояние задачи хранится в файлах (<job_id>.json + <job_id>.pdf), а не в памяти процесса:
+# статус может запросить любой из uvicorn воркеров. Пока задача идёт, рядом лежат
+# части от процессов рендера (<job_id>.part<N>.pdf) и недописанный <job_id>.pdf.tmp.
+_JOB_ID_RE = re.compile(r"^[0-9a-f]{32}$")
+
+# Координатор переписывает файл состояния не реже этого интервала, даже пока пачки ждут в очереди.
+# Задача без обновлений дольше LABEL_JOB_STALE_SECONDS осталась от остановленного воркера.
+_HEARTBEAT_SECONDS = 30
+_ACTIVE_STATUSES = ("queued", "running")
+
+_executor: Optional[ProcessPoolExecutor] = None
+_executor_lock = threading.Lock()
+
+
+def _jobs_dir() -> str:
+    path = settings.LABEL_JOBS_DIR or os.path.join(tempfile.gettempdir(), "inventorypro_label_jobs")
+    os.makedirs(path, exist_ok=True)
+    return path
+
+
+def _state_path(job_id: str) -> str:
+    return os.path.join(_jobs_dir(), f"{job_id}.json")
+
+
+def label_job_pdf_path(job_id: str) -> str:
+    return os.path.join(_jobs_dir(), f"{job_id}.pdf")
+
+
+def _part_path(job_id: str, index: int) -> str:
+    return os.path.join(_jobs_dir(), f"{job_id}.part{index}.pdf")
+
+
+def _remove_unfinished_files(job_id: str) -> None:
+    directory = _jobs_dir()
+    for name in os.listdir(directory):
+        if name.startswith(f"{job_id}.part") or name == f"{job_id}.pdf.tmp":
+            try:
+                os.remove(os.path.join(directory, name))
+            except OSError:
+                pass
+
+
+def _get_executor() -> ProcessPoolExecutor:
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            # Пул свой в каждом uvicorn воркере: по умолчанию половина ядер, чтобы печать не вытесняла API
+            workers = settings.LABEL_RENDER_PROCESSES or max(1, (os.cpu_count() or 1) // 2)
+            # spawn: дочерние процессы не наследуют потоки и соединения БД воркера
+            _executor = ProcessPoolExecutor(
+                max_workers=workers,
+                mp_context=multiprocessing.get_context("spawn"),
+            )
+        return _executor
+
+
+def shutdown_label_executor() -> None:
+    global _executor
+    with _executor_lock:
+        if _executor is not None:
+            _executor.shutdown(wait=False, cancel_futures=True)
+            _executor = None
+
+
+def _write_state(state: dict) -> None:
+    path = _state_path(state["job_id"])
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "w") as f:
+        json.dump(state, f)
+    os.replace(tmp_path, path)
+
+
+def get_label_job(job_id: str) -> Optional[dict]:
+    if not _JOB_ID_RE.match(job_id or ""):
+        return None
+    path = _state_path(job_id)
+    try:
+        with open(path) as f:
+            state = json.load(f)
+        updated_at = os.path.getmtime(path)
+    except FileNotFoundError:
+        return None
+    if state["status"] in _ACTIVE_STATUSES and time.time() - updated_at > settings.LABEL_JOB_STALE_SECONDS:
+        # Воркер, который вёл задачу, перезапущен или упал — задача уже не завершится
+        state["status"] = "failed"
+        state["error"] = "Job was interrupted: the worker running it stopped"
+        _write_state(state)
+    return state
+
+
+def _cleanup_expired_jobs() -> None:
+    expire_before = time.time() - settings.LABEL_JOB_TTL_HOURS * 3600
+    directory = _jobs_dir()
+    for name in os.listdir(directory):
+        path = os.path.join(directory, name)
+        try:
+            if os.path.getmtime(path) < expire_before:
+                os.remove(path)
+        except OSError:
+            pass
+
+
+def _run_label_job(state: dict, assets: list[dict]) -> None:
+    """
+    Раздаёт пачки наклеек процессам и дописывает готовые части в итоговый PDF
+    в порядке исходного списка. Части лежат в файлах и склеиваются по одной,
+    файл состояния обновляется после каждой, чтобы долгая склейка не выглядела зависшей.
+    """
+    job_id = state["job_id"]
+    batch_size = max(1, settings.LABEL_JOB_BATCH_SIZE)
+    batches = [assets[i:i + batch_size] for i in range(0, len(assets), batch_size)]
+    futures = {}
+    try:
+        state["status"] = "running"
+        _write_state(state)
+
+        executor = _get_executor()
+        futures = {
+            executor.submit(render_label_batch, batch, state["size"], _part_path(job_id, index)): index
+            for index, batch in enumerate(batches)
+        }
+        pdf = PdfConcatenator()
+        ready = set()
+        next_index = 0
+        pending = set(futures)
+        tmp_path = f"{label_job_pdf_path(job_id)}.tmp"
+        with open(tmp_path, "wb") as output:
+            output.write(pdf.header())
+            while pending:
+                done, pending = wait(pending, timeout=_HEARTBEAT_SECONDS, return_when=FIRST_COMPLETED)
+                for future in done:
+                    future.result()
+                    index = futures[future]
+                    ready.add(index)
+                    state["done"] += len(batches[index])
+                _write_state(state)
+                # Следующие по порядку готовые части — в итоговый файл, файл части больше не нужен
+                while next_index in ready:
+                    part_path = _part_path(job_id, next_index)
+                    with open(part_path, "rb") as part:
+                        output.write(pdf.append(part))
+                    os.remove(part_path)
+                    ready.discard(next_index)
+                    next_index += 1
+                    _write_state(state)
+            output.write(pdf.finish())
+        os.replace(tmp_path, label_job_pdf_path(job_id))
+
+        state["status"] = "completed"
+        state["completed_at"] = datetime.utcnow().isoformat()
+    except Exception as e:
+        for future in futures:
+            future.cancel()
+        _remove_unfinished_files(job_id)
+        state["status"] = "failed"
+        state["error"] = str(e)
+    _write_state(state)
+
+
+def start_label_job(assets: list[dict], size: str) -> dict:
+    """
+    Запускает фоновую печать наклеек и сразу возвращает состояние задачи.
+    `assets` — словари с полями app.core.labels.LABEL_FIELDS в порядке печати.
+    """
+    _cleanup_expired_jobs()
+    state = {
+        "job_id": uuid.uuid4().hex,
+        "status": "queued",
+        "size": size,
+        "total": len(assets),
+        "done": 0,
+        "error": None,
+        "created_at": datetime.utcnow().isoformat(),
+        "completed_at": None,
+    }
+    _write_state(state)
+    threading.Thread(target=_run_label_job, args=(dict(state), assets), daemon=True).start()
+    return state
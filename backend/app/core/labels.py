@@ -0,0 +1,366 @@
+# Отрисовка наклеек (QR + текст) на reportlab canvas.
+# Модуль не зависит от БД и настроек приложения, поэтому его можно вызывать
+# в дочерних процессах (см. app.core.label_jobs).
+from collections import deque
+from io import BytesIO
+from functools import lru_cache
+from types import SimpleNamespace
+from typing import Any, BinaryIO, Iterable
+import qrcode
+from reportlab.lib.pagesizes import mm
+from reportlab.pdfgen import canvas
+from reportlab.lib import colors
+from app.core.text_metrics import font_metrics, string_width
+
+# Кэш матриц QR (по инвентарному номеру)
+QR_MATRIX_CACHE_SIZE = 4096
+
+# Кэш подобранной раскладки текста (кегль + строки) по (текст, шрифт, область)
+TEXT_LAYOUT_CACHE_SIZE = 8192
+
+# Поля актива, нужные для наклейки
+LABEL_FIELDS = ("id", "inventory_number", "serial_number", "vendor", "model")
+
+# Размеры наклеек (ширина x высота) в мм.
+# Важно: по ТЗ ширина должна быть больше высоты (альбомная ориентация):
+# - 30x20
+# - 40x30
+#
+# Для обратной совместимости поддерживаем старые значения "20x30" и "30x40",
+# но они маппятся на новые альбомные форматы.
+LABEL_SIZES = {
+    # Canonical (landscape)
+    "30x20": (30 * mm, 20 * mm),
+    "40x30": (40 * mm, 30 * mm),
+    # Backward-compatible aliases
+    "20x30": (30 * mm, 20 * mm),  # раньше было "20x30" (портрет), теперь печатаем как 30x20
+    "30x40": (40 * mm, 30 * mm),  # раньше было "30x40" (портрет), теперь печатаем как 40x30
+}
+
+
+def normalize_label_size(size: str) -> str:
+    """Нормализует размер наклейки к каноническому формату."""
+    if size == "20x30":
+        return "30x20"
+    if size == "30x40":
+        return "40x30"
+    return size
+
+
+def truncate_to_width(text: str, font_name: str, font_size: int, max_width: float) -> str:
+    """Обрезает строку с '...' так, чтобы она гарантированно помещалась по ширине."""
+    if string_width(text, font_name, font_size) <= max_width:
+        return text
+
+    ellipsis = "..."
+    ellipsis_width = string_width(ellipsis, font_name, font_size)
+    if ellipsis_width > max_width:
+        return ""  # совсем некуда
+
+    # Самый длинный префикс, после которого ещё помещается '...'
+    n = font_metrics(font_name).max_prefix_fitting(text, font_size, max_width - ellipsis_width)
+    return text[:n] + ellipsis
+
+
+def wrap_to_width(
+    text: str,
+    font_name: str,
+    font_size: int,
+    max_width: float,
+    max_lines: int = 2,
+) -> list[str]:
+    """
+    Переносит строку по ширине (для S/N как на макете).
+    Важно: НЕ использует '...' (по ТЗ).
+    """
+    text = (text or "").strip()
+    if not text:
+        return []
+
+    # Быстрый путь: всё влезает в одну строку
+    if string_width(text, font_name, font_size) <= max_width:
+        return [text]
+
+    # Токенизация: сначала по пробелам, затем длинные куски режем по '-'
+    raw_parts = text.split()
+    parts: list[str] = []
+    for p in raw_parts:
+        if string_width(p, font_name, font_size) <= max_width:
+            parts.append(p)
+            continue
+        # если токен слишком длинный — дробим по '-'
+        if "-" in p:
+            sub = p.split("-")
+            for i, s in enumerate(sub):
+                if s:
+                    parts.append(s + ("-" if i < len(sub) - 1 else ""))
+        else:
+            parts.append(p)
+
+    lines: list[str] = []
+    cur = ""
+
+    def flush():
+        nonlocal cur
+        if cur:
+            lines.append(cur)
+            cur = ""
+
+    queue = deque(parts)
+    while queue:
+        token = queue.popleft()
+        candidate = token if not cur else (cur + token)
+        if string_width(candidate, font_name, font_size) <= max_width:
+            cur = candidate
+            continue
+
+        # если текущая строка пустая — token сам по себе не лезет, режем по символам
+        if not cur:
+            # самый длинный влезающий префикс (минимум 1 символ)
+            n = font_metrics(font_name).max_prefix_fitting(token, font_size, max_width)
+            best = token[:max(n, 1)]
+            cur = best
+            flush()
+            # остаток токена обрабатываем следующим
+            rest = token[len(best):]
+            if rest:
+                queue.appendleft(rest)
+            if len(lines) >= max_lines:
+                break
+            continue
+
+        flush()
+        cur = token
+
+        if len(lines) >= max_lines:
+            break
+
+    flush()
+
+    # Ограничение по числу строк + ellipsis на последней
+    if len(lines) > max_lines:
+        lines = lines[:max_lines]
+
+    return lines
+
+
+def wrap_to_width_with_status(
+    text: str,
+    font_name: str,
+    font_size: int,
+    max_width: float,
+    max_lines: int,
+) -> tuple[list[str], bool]:
+    """
+    Как wrap_to_width, но возвращает флаг complete=True если весь текст уместился.
+    Важно: НЕ добавляет '...'.
+    """
+    text = (text or "").strip()
+    if not text:
+        return ([], True)
+
+    lines = wrap_to_width(text, font_name, font_size, max_width, max_lines=max_lines)
+    # Проверяем "полноту" грубо: по конкатенации без пробелов (wrap_to_width может вставлять/убирать пробелы)
+    joined = "".join(lines).replace(" ", "")
+    full = text.replace(" ", "")
+    return (lines, joined == full)
+
+
+@lru_cache(maxsize=TEXT_LAYOUT_CACHE_SIZE)
+def fit_font_size(text: str, font_name: str, font_size: int, min_size: int, max_width: float) -> int:
+    """Уменьшает кегль (не ниже min_size), пока строка не поместится в max_width."""
+    while font_size > min_size and string_width(text, font_name, font_size) > max_width:
+        font_size -= 1
+    return font_size
+
+
+@lru_cache(maxsize=TEXT_LAYOUT_CACHE_SIZE)
+def fit_wrapped_text(
+    text: str,
+    font_name: str,
+    font_size: int,
+    min_size: int,
+    max_width: float,
+    max_height: float,
+    leading_gap: float,
+    max_lines_cap: int,
+) -> tuple[int, tuple[str, ...]]:
+    """
+    Подбирает кегль и переносы так, чтобы весь текст поместился в область (без '...').
+    Возвращает (кегль, строки).
+    """
+    while True:
+        leading = font_size + leading_gap
+        max_lines_fit = max(1, int((max_height + leading_gap) // leading))
+        max_lines_fit = min(max_lines_fit, max_lines_cap)
+        lines, complete = wrap_to_width_with_status(text, font_name, font_size, max_width, max_lines=max_lines_fit)
+
+        total_h = len(lines) * leading - leading_gap if lines else leading
+        if complete and total_h <= max_height:
+            break
+        if font_size <= min_size:
+            break
+        font_size -= 1
+    return font_size, tuple(lines)
+
+
+@lru_cache(maxsize=QR_MATRIX_CACHE_SIZE)
+def qr_matrix(data: str) -> tuple[tuple[bool, ...], ...]:
+    """Матрица модулей QR кода (включая quiet zone), True = тёмный модуль"""
+    qr = qrcode.QRCode(
+        # v1–v3 по ТЗ, но оставляем fit=True чтобы при необходимости QR мог вырасти
+        # (в PDF мы всё равно масштабируем его в фиксированную область)
+        version=None,
+        # По ТЗ: Error Correction Level M или Q
+        error_correction=qrcode.constants.ERROR_CORRECT_M,
+        # Quiet zone важна для читаемости (без рамок/фона)
+        border=2,
+    )
+    qr.add_data(data)
+    qr.make(fit=True)
+    return tuple(tuple(row) for row in qr.get_matrix())
+
+
+def draw_qr_code(c: canvas.Canvas, data: str, x: float, y: float, size: float) -> None:
+    """
+    Рисует QR код векторно: каждая горизонтальная серия тёмных модулей — один прямоугольник.
+    Без растеризации в PNG и повторного декодирования.
+    """
+    matrix = qr_matrix(data)
+    module = size / len(matrix)
+    path = c.beginPath()
+    for row_index, row in enumerate(matrix):
+        row_y = y + size - (row_index + 1) * module
+        col = 0
+        n = len(row)
+        while col < n:
+            if not row[col]:
+                col += 1
+                continue
+            start = col
+            while col < n and row[col]:
+                col += 1
+            path.rect(x + start * module, row_y, (col - start) * module, module)
+    c.drawPath(path, stroke=0, fill=1)
+
+
+def draw_label(c: canvas.Canvas, asset: Any, canonical_size: str) -> None:
+    """Рисует наклейку актива на текущей странице canvas (размер страницы = размер наклейки)"""
+    width, height = LABEL_SIZES[canonical_size]
+
+    # === Новый дизайн (как на примере пользователя) ===
+    # Без рамок/фонов, только ч/б. Размеры для 30x20 при 300 DPI:
+    # - label: ~354x236 px
+    # - QR: 125x125 px  => 0.4167 in => 30 pt => ~10.58 mm
+    #
+    # Для 40x30 масштабируем пропорционально ширине.
+    margin = 1.0 * mm
+    gap = 1.0 * mm
+
+    # Шрифты по ТЗ (pt). Roboto требует встраивания TTF, поэтому используем Helvetica.
+    if canonical_size == "30x20":
+        name_size = 6
+        sn_size_target = 4
+        inv_size = 7
+        qr_px = 125
+    else:  # 40x30
+        # Масштабируем относительно ширины (40/30 = 1.333...)
+        scale = float(width / (30 * mm))
+        name_size = max(6, int(round(6 * scale)))
+        sn_size_target = max(4, int(round(4 * scale)))
+        inv_size = max(7, int(round(7 * scale)))
+        qr_px = int(round(125 * scale))
+
+    name_font = "Helvetica-Bold"
+    sn_font = "Helvetica"
+    inv_font = "Helvetica-Bold"
+
+    # QR размер в points: 125px @300dpi => 30pt. Масштабируем для 40x30.
+    qr_size_pt = 30.0 * float(width / (30 * mm))
+
+    # QR: по ТЗ 13x13мм для 30x20
+    qr_data = asset.inventory_number
+
+    # Позиции
+    qr_x = margin
+    qr_y = margin
+    qr_size = min(qr_size_pt, height - 2 * margin, width - 2 * margin)
+
+    # Рисуем QR
+    c.setFillColor(colors.black)
+    draw_qr_code(c, qr_data, qr_x, qr_y, qr_size)
+
+    # Заголовок (Vendor + Model) — 1 строка, без переноса, без "..."
+    name_text = f"{asset.vendor} {asset.model}".strip()
+    name_x = margin
+    name_w = width - 2 * margin
+    cur_name_size = fit_font_size(name_text, name_font, name_size, 3, name_w)
+    name_y = height - margin - cur_name_size
+    c.setFont(name_font, cur_name_size)
+    c.drawString(name_x, name_y, name_text)
+
+    # Инвентарный номер (внизу справа), 1 строка, 7pt, без "..."
+    inv_text = (asset.inventory_number or "").strip()
+    inv_x_right = width - margin
+    inv_y = margin
+    cur_inv_size = fit_font_size(inv_text, inv_font, inv_size, 4, width - 2 * margin - (qr_size + gap))
+    c.setFont(inv_font, cur_inv_size)
+    c.drawRightString(inv_x_right, inv_y, inv_text)
+
+    # Серийный номер (справа от QR), переносимый, шрифт 4pt (может уменьшаться, чтобы всё влезло по высоте)
+    serial_raw = (asset.serial_number or "").strip()
+    serial_x = qr_x + qr_size + gap
+    serial_w = width - margin - serial_x
+    # Вертикальная область для serial: между заголовком и инвентарным номером
+    serial_top = name_y - gap
+    serial_bottom = inv_y + cur_inv_size + gap
+    serial_h = max(serial_top - serial_bottom, 1 * mm)
+
+    # Подбор строк/шрифта: без '...', переносы разрешены
+    leading_gap = 0.6  # pt
+    min_sn_size = 3
+    max_lines_cap = 6  # чтобы не уйти в "мелкий текст", но при необходимости уменьшится шрифт
+    sn_size, lines = fit_wrapped_text(
+        serial_raw, sn_font, sn_size_target, min_sn_size, serial_w, serial_h, leading_gap, max_lines_cap
+    )
+
+    # Рисуем serial сверху вниз
+    c.setFont(sn_font, sn_size)
+    leading = sn_size + leading_gap
+    y = serial_top - sn_size
+    for line in lines:
+        c.drawString(serial_x, y, line)
+        y -= leading
+
+
+def generate_label_pdf(asset: Any, size: str = "30x20") -> BytesIO:
+    """Генерирует PDF наклейку для актива"""
+    canonical_size = normalize_label_size(size)
+    
+    buffer = BytesIO()
+    c = canvas.Canvas(buffer, pagesize=LABEL_SIZES[canonical_size])
+    draw_label(c, asset, canonical_size)
+    c.save()
+    buffer.seek(0)
+    return buffer
+
+
+def generate_labels_pdf(assets: Iterable[Any], size: str, output: BinaryIO) -> None:
+    """Рисует наклейки всех активов на одном canvas: одна страница на наклейку"""
+    canonical_size = normalize_label_size(size)
+    
+    c = canvas.Canvas(output, pagesize=LABEL_SIZES[canonical_size])
+    for asset in assets:
+        draw_label(c, asset, canonical_size)
+        c.showPage()
+    c.save()
+
+
+def render_label_batch(assets: list[dict], size: str, path: str) -> None:
+    """
+    Рендер пачки наклеек в отдельный PDF-файл (часть задачи печати).
+    Принимает словари с LABEL_FIELDS, чтобы вызываться через ProcessPoolExecutor;
+    результат остаётся на диске и не передаётся обратно в родительский процесс.
+    """
+    with open(path, "wb") as f:
+        generate_labels_pdf((SimpleNamespace(**a) for a in assets), size, f)
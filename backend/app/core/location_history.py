@@ -0,0 +1,121 @@
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from typing import Dict, Optional, Tuple
+from sqlalchemy import func, insert
+from sqlalchemy.orm import Session
+from app.models.asset import Asset, LocationType
+from app.models.location_checkpoint import LocationCheckpoint, LocationCheckpointEntry
+from app.models.movement import Movement
+
+# Расположение активов на произвольный момент: ближайший опорный снимок (checkpoint) не позже
+# момента плюс перемещения между ними. Снимки ограничивают объём проигрываемого журнала
+# интервалом между снимками, а не всей историей.
+#
+# Снимок можно делать только на момент не позже now - CHECKPOINT_SAFETY_MARGIN: moved_at
+# ставится до коммита, и транзакция в процессе может ещё добавить перемещение «в прошлое».
+CHECKPOINT_SAFETY_MARGIN = timedelta(minutes=5)
+
+Location = Tuple[LocationType, int]
+
+
+@dataclass(frozen=True)
+class LocationSnapshot:
+    at: datetime
+    checkpoint_taken_at: Optional[datetime]
+    # Активов с перемещениями между снимком и моментом (объём проигранного журнала)
+    replayed_assets: int
+    locations: Dict[int, Location]
+
+
+def _location(location_type, location_id) -> Location:
+    # Movement и Asset объявляют одинаковые, но разные enum LocationType
+    return LocationType(location_type.value), location_id
+
+
+def _one_movement_per_asset(query, newest: bool):
+    """Одно перемещение на актив (последнее или первое по moved_at, id) из отфильтрованного query"""
+    order = (Movement.moved_at.desc(), Movement.id.desc()) if newest else (Movement.moved_at.asc(), Movement.id.asc())
+    ranked = query.add_columns(
+        func.row_number().over(partition_by=Movement.asset_id, order_by=order).label("rank")
+    ).subquery()
+    return ranked, ranked.c.rank == 1
+
+
+def locations_at(db: Session, at: datetime) -> LocationSnapshot:
+    """
+    Где находился каждый актив в момент at (только активы, существующие сейчас и созданные не позже at).
+    Для актива без перемещений до at место — откуда его переместили в первый раз после at,
+    а если перемещений не было вовсе — текущее.
+    """
+    checkpoint = db.query(LocationCheckpoint).filter(
+        LocationCheckpoint.taken_at <= at
+    ).order_by(LocationCheckpoint.taken_at.desc()).first()
+    since = checkpoint.taken_at if checkpoint else None
+
+    locations: Dict[int, Location] = {}
+    if checkpoint is not None:
+        entries = db.query(
+            LocationCheckpointEntry.asset_id, LocationCheckpointEntry.location_type, LocationCheckpointEntry.location_id
+        ).filter(LocationCheckpointEntry.checkpoint_id == checkpoint.id)
+        locations = {asset_id: (location_type, location_id) for asset_id, location_type, location_id in entries}
+
+    window = db.query(Movement.asset_id, Movement.to_type, Movement.to_id).filter(Movement.moved_at <= at)
+    if since is not None:
+        window = window.filter(Movement.moved_at > since)
+    ranked, is_last = _one_movement_per_asset(window, newest=True)
+    replayed = 0
+    for asset_id, to_type, to_id in db.query(ranked.c.asset_id, ranked.c.to_type, ranked.c.to_id).filter(is_last):
+        locations[asset_id] = _location(to_type, to_id)
+        replayed += 1
+
+    assets = db.query(Asset.id, Asset.location_type, Asset.location_id).filter(Asset.created_at <= at)
+    current = {asset_id: (location_type, location_id) for asset_id, location_type, location_id in assets}
+
+    # Активы, которых нет ни в снимке, ни в проигранном окне: созданы после снимка (или снимка нет)
+    # и до at не перемещались — их место восстанавливается по первому перемещению после at
+    if any(asset_id not in locations for asset_id in current):
+        later = db.query(Movement.asset_id, Movement.from_type, Movement.from_id).filter(Movement.moved_at > at)
+        if since is not None:
+            later = later.join(Asset, Asset.id == Movement.asset_id).filter(Asset.created_at > since)
+        ranked, is_first = _one_movement_per_asset(later, newest=False)
+        for asset_id, from_type, from_id in db.query(ranked.c.asset_id, ranked.c.from_type, ranked.c.from_id).filter(is_first):
+            if asset_id in current and asset_id not in locations:
+                locations[asset_id] = _location(from_type, from_id)
+
+    return LocationSnapshot(
+        at=at,
+        checkpoint_taken_at=since,
+        replayed_assets=replayed,
+        locations={asset_id: locations.get(asset_id, location) for asset_id, location in current.items()},
+    )
+
+
+def create_checkpoint(db: Session, taken_at: Optional[datetime] = None) -> LocationCheckpoint:
+    """
+    Сохраняет опорный снимок на taken_at (по умолчанию now - CHECKPOINT_SAFETY_MARGIN).
+    Снимок строится из журнала, а не из текущих локаций, поэтому согласован с ним. Коммит — за вызывающим.
+    ValueError — момент слишком близок к текущему или снимок на этот момент уже есть.
+    """
+    latest_allowed = datetime.utcnow() - CHECKPOINT_SAFETY_MARGIN
+    if taken_at is None:
+        taken_at = latest_allowed.replace(microsecond=0)
+    elif taken_at > latest_allowed:
+        raise ValueError("Checkpoint time must be at least %d minutes in the past" % (CHECKPOINT_SAFETY_MARGIN.seconds // 60))
+    if db.query(LocationCheckpoint.id).filter(LocationCheckpoint.taken_at == taken_at).first():
+        raise ValueError("Checkpoint for this time already exists")
+
+    snapshot = locations_at(db, taken_at)
+    checkpoint = LocationCheckpoint(taken_at=taken_at, asset_count=len(snapshot.locations))
+    db.add(checkpoint)
+    db.flush()
+    if snapshot.locations:
+        db.execute(insert(LocationCheckpointEntry), [
+            {
+                "checkpoint_id": checkpoint.id,
+                "asset_id": asset_id,
+                "location_type": location_type,
+                "location_id": location_id,
+            }
+            for asset_id, (location_type, location_id) in snapshot.locations.items()
+        ])
+    return checkpoint
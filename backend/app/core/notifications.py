@@ -0,0 +1,111 @@
+import json
+import logging
+import select
+import threading
+import uuid
+from collections import defaultdict
+from typing import Any, Callable, Dict, List, Optional
+from sqlalchemy import event, text
+from sqlalchemy.orm import Session
+from app.database import engine, is_postgresql
+
+# События между uvicorn воркерами через Postgres LISTEN/NOTIFY.
+# notify() ставит событие в текущую транзакцию: pg_notify доставляется другим воркерам
+# только после COMMIT, подписчики своего воркера вызываются в after_commit.
+# При откате событие не доставляется никому.
+NOTIFY_CHANNEL = "inventorypro_events"
+
+# Пауза перед переподключением слушателя после обрыва соединения
+LISTENER_RECONNECT_DELAY = 5
+LISTENER_POLL_TIMEOUT = 5
+
+logger = logging.getLogger(__name__)
+
+# Идентификатор процесса: свои события слушатель пропускает, они уже доставлены в after_commit
+_WORKER_ID = uuid.uuid4().hex
+
+_subscribers: Dict[str, List[Callable[[Any], None]]] = defaultdict(list)
+_listener: Optional[threading.Thread] = None
+_listener_stop = threading.Event()
+_reconnect_callbacks: List[Callable[[], None]] = []
+
+
+def subscribe(topic: str, callback: Callable[[Any], None]) -> None:
+    """Подписка на события темы в этом процессе. callback получает payload события."""
+    _subscribers[topic].append(callback)
+
+
+def unsubscribe(topic: str, callback: Callable[[Any], None]) -> None:
+    try:
+        _subscribers[topic].remove(callback)
+    except ValueError:
+        pass
+
+
+def on_listener_reconnect(callback: Callable[[], None]) -> None:
+    """Вызывается после (пере)подключения слушателя: события за время обрыва потеряны."""
+    _reconnect_callbacks.append(callback)
+
+
+def notify(db: Session, topic: str, payload: Any = None) -> None:
+    """Публикует событие после коммита текущей транзакции db."""
+    db.info.setdefault("pending_notifications", []).append((topic, payload))
+    if is_postgresql(db):
+        message = json.dumps({"origin": _WORKER_ID, "topic": topic, "payload": payload}, default=str)
+        db.execute(text("SELECT pg_notify(:channel, :message)"), {"channel": NOTIFY_CHANNEL, "message": message})
+
+
+def _dispatch(topic: str, payload: Any) -> None:
+    for callback in list(_subscribers.get(topic, ())):
+        try:
+            callback(payload)
+        except Exception:
+            logger.exception("Notification handler failed for %s", topic)
+
+
+@event.listens_for(Session, "after_commit")
+def _deliver_local(session: Session) -> None:
+    for topic, payload in session.info.pop("pending_notifications", ()):
+        _dispatch(topic, payload)
+
+
+@event.listens_for(Session, "after_rollback")
+def _drop_pending(session: Session) -> None:
+    session.info.pop("pending_notifications", None)
+
+
+def _listen_forever() -> None:
+    while not _listener_stop.is_set():
+        try:
+            with engine.connect().execution_options(isolation_level="AUTOCOMMIT") as conn:
+                conn.exec_driver_sql(f"LISTEN {NOTIFY_CHANNEL}")
+                dbapi_conn = conn.connection.dbapi_connection
+                for callback in _reconnect_callbacks:
+                    callback()
+                while not _listener_stop.is_set():
+                    if select.select([dbapi_conn], [], [], LISTENER_POLL_TIMEOUT) == ([], [], []):
+                        continue
+                    dbapi_conn.poll()
+                    while dbapi_conn.notifies:
+                        message = json.loads(dbapi_conn.notifies.pop(0).payload)
+                        if message.get("origin") != _WORKER_ID:
+                            _dispatch(message["topic"], message.get("payload"))
+        except Exception:
+            logger.exception("Notification listener disconnected, reconnecting")
+            _listener_stop.wait(LISTENER_RECONNECT_DELAY)
+
+
+def start_notification_listener() -> None:
+    """Запускает поток LISTEN (только Postgres; на других БД хватает доставки в своём процессе)."""
+    global _listener
+    if engine.dialect.name != "postgresql" or _listener is not None:
+        return
+    _listener_stop.clear()
+    _listener = threading.Thread(target=_listen_forever, name="notification-listener", daemon=True)
+    _listener.start()
+
+
+def stop_notification_listener() -> None:
+    global _listener
+    _listener_stop.set()
+    _listener = None
@@ -0,0 +1,74 @@
+import base64
+import json
+from datetime import datetime
+from typing import Any, List, Optional, Sequence, Tuple, Union
+from sqlalchemy import and_, or_, text
+from sqlalchemy.orm import Query, Session
+from app.database import is_postgresql
+
+
+def encode_cursor(values: List[Any]) -> str:
+    """Непрозрачный курсор: значения ключа сортировки последней строки страницы"""
+    raw = json.dumps(values, separators=(",", ":"), default=str).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str, types: Sequence[Union[type, Tuple[type, ...]]]) -> List[Any]:
+    """
+    Обратное к encode_cursor. types — ожидаемый тип каждого значения (как для isinstance).
+    ValueError, если курсор повреждён, не того размера или значения не тех типов:
+    подправленный вручную курсор не должен дойти до сравнения в SQL.
+    """
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        values = json.loads(raw)
+    except (ValueError, UnicodeDecodeError):
+        raise ValueError("Invalid cursor")
+    if not isinstance(values, list) or len(values) != len(types):
+        raise ValueError("Invalid cursor")
+    for value, expected in zip(values, types):
+        # bool — подкласс int, но ключом сортировки не бывает
+        if isinstance(value, bool) or not isinstance(value, expected):
+            raise ValueError("Invalid cursor")
+    return values
+
+
+def encode_timestamp_cursor(moment: datetime, row_id: int) -> str:
+    """Курсор для порядка «новые сверху»: (время, id) последней строки страницы"""
+    return encode_cursor([moment.isoformat(), row_id])
+
+
+def decode_timestamp_cursor(cursor: str) -> Tuple[datetime, int]:
+    """Обратное к encode_timestamp_cursor. ValueError, если курсор повреждён."""
+    moment, row_id = decode_cursor(cursor, (str, int))
+    try:
+        return datetime.fromisoformat(moment), row_id
+    except ValueError:
+        raise ValueError("Invalid cursor")
+
+
+def older_than(moment_column, id_column, moment: datetime, row_id: int):
+    """Условие keyset для ORDER BY moment DESC, id DESC: строки после (moment, row_id)"""
+    return or_(moment_column < moment, and_(moment_column == moment, id_column < row_id))
+
+
+def estimated_row_count(db: Session, table_name: str) -> Optional[int]:
+    """
+    Оценка числа строк таблицы по статистике планировщика (pg_class.reltuples).
+    None, если оценки нет: не Postgres или таблица ещё не анализировалась.
+    """
+    if not is_postgresql(db):
+        return None
+    estimate = db.execute(
+        text("SELECT reltuples FROM pg_class WHERE oid = to_regclass(:table_name)"),
+        {"table_name": table_name},
+    ).scalar()
+    # -1 (Postgres 14+) или 0 (старые версии) — статистики ещё нет
+    if estimate is None or estimate <= 0:
+        return None
+    return int(estimate)
+
+
+def count_rows(query: Query) -> int:
+    """COUNT(*) по запросу без сортировки и лимитов"""
+    return query.order_by(None).count()
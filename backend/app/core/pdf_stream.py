@@ -0,0 +1,127 @@
+from io import BytesIO
+from typing import BinaryIO, Dict, List, Optional, Tuple, Union
+from pypdf import PdfReader
+from pypdf.generic import (
+    ArrayObject,
+    DictionaryObject,
+    IndirectObject,
+    NameObject,
+    NumberObject,
+    PdfObject,
+    TextStringObject,
+)
+
+# Номера объектов, зарезервированные под каталог и дерево страниц итогового документа
+_CATALOG = 1
+_PAGES = 2
+
+
+class PdfConcatenator:
+    """
+    Склеивает PDF-документы (части) в один по мере их готовности.
+    Каждый вызов возвращает байты, которые можно сразу отдать клиенту или дописать в файл:
+    страницы части копируются со всеми ресурсами под новыми номерами объектов,
+    в памяти остаются только смещения объектов для таблицы xref и ссылки на страницы.
+
+        pdf = PdfConcatenator(title="Report")
+        out.write(pdf.header())
+        for part in parts:
+            out.write(pdf.append(part))
+        out.write(pdf.finish())
+    """
+
+    def __init__(self, title: Optional[str] = None):
+        self.title = title
+        self._offset = 0
+        self._offsets: Dict[int, int] = {}
+        self._next_number = _PAGES + 1
+        self._pages: List[int] = []
+
+    def header(self) -> bytes:
+        return self._emit(b"%PDF-1.4\n%\xe2\xe3\xcf\xd3\n")
+
+    def append(self, part: Union[bytes, BinaryIO]) -> bytes:
+        """Добавляет все страницы части (PDF в байтах или открытый файл)."""
+        reader = PdfReader(BytesIO(part) if isinstance(part, bytes) else part)
+        # Номера объектов части -> номера в итоговом документе (общие шрифты копируются один раз)
+        numbers: Dict[Tuple[int, int], int] = {}
+        queue: List[IndirectObject] = []
+
+        def renumber(obj: PdfObject) -> PdfObject:
+            # Ссылки, уже переведённые в номера итогового документа, не трогаем
+            if isinstance(obj, IndirectObject):
+                if obj.pdf is not reader:
+                    return obj
+                key = (obj.idnum, obj.generation)
+                if key not in numbers:
+                    numbers[key] = self._allocate()
+                    queue.append(obj)
+                return IndirectObject(numbers[key], 0, None)
+            if isinstance(obj, DictionaryObject):
+                for name, value in obj.items():
+                    obj[name] = renumber(value)
+            elif isinstance(obj, ArrayObject):
+                for i, value in enumerate(obj):
+                    obj[i] = renumber(value)
+            return obj
+
+        buffer = BytesIO()
+        for page in reader.pages:
+            # Дерево страниц части не копируется: страница переходит в общее дерево.
+            # reader.pages отдаёт копию словаря страницы, поэтому пишется именно она
+            ref = page.indirect_reference
+            number = numbers[(ref.idnum, ref.generation)] = self._allocate()
+            page[NameObject("/Parent")] = IndirectObject(_PAGES, 0, None)
+            self._write_object(buffer, number, renumber(page))
+            self._pages.append(number)
+            while queue:
+                ref = queue.pop()
+                number = numbers[(ref.idnum, ref.generation)]
+                self._write_object(buffer, number, renumber(reader.get_object(ref)))
+        return self._emit(buffer.getvalue())
+
+    def finish(self) -> bytes:
+        """Дерево страниц, каталог, сведения о документе, xref и trailer."""
+        buffer = BytesIO()
+        pages = DictionaryObject({
+            NameObject("/Type"): NameObject("/Pages"),
+            NameObject("/Kids"): ArrayObject(IndirectObject(n, 0, None) for n in self._pages),
+            NameObject("/Count"): NumberObject(len(self._pages)),
+        })
+        self._write_object(buffer, _PAGES, pages)
+        catalog = DictionaryObject({
+            NameObject("/Type"): NameObject("/Catalog"),
+            NameObject("/Pages"): IndirectObject(_PAGES, 0, None),
+        })
+        self._write_object(buffer, _CATALOG, catalog)
+        info_number = None
+        if self.title:
+            info_number = self._allocate()
+            info = DictionaryObject({NameObject("/Title"): TextStringObject(self.title)})
+            self._write_object(buffer, info_number, info)
+
+        xref_offset = self._offset + buffer.tell()
+        size = self._next_number
+        buffer.write(f"xref\n0 {size}\n0000000000 65535 f \n".encode())
+        for number in range(1, size):
+            buffer.write(f"{self._offsets[number]:010d} 00000 n \n".encode())
+        trailer = f"trailer\n<< /Size {size} /Root {_CATALOG} 0 R"
+        if info_number is not None:
+            trailer += f" /Info {info_number} 0 R"
+        buffer.write(f"{trailer} >>\nstartxref\n{xref_offset}\n%%EOF\n".encode())
+        return self._emit(buffer.getvalue())
+
+    def _allocate(self) -> int:
+        number = self._next_number
+        self._next_number += 1
+        return number
+
+    def _write_object(self, buffer: BytesIO, number: int, obj: PdfObject) -> None:
+        self._offsets[number] = self._offset + buffer.tell()
+        buffer.write(f"{number} 0 obj\n".encode())
+        obj.write_to_stream(buffer)
+        buffer.write(b"\nendobj\n")
+
+    def _emit(self, data: bytes) -> bytes:
+        self._offset += len(data)
+        return data
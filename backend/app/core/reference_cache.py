@@ -0,0 +1,111 @@
+import hashlib
+import json
+import threading
+import time
+from dataclasses import dataclass
+from typing import Any, Dict, Optional, Tuple
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+from app.config import settings
+from app.core.notifications import notify, subscribe, on_listener_reconnect
+from app.models.company import Company
+from app.models.device_type import DeviceType
+from app.models.employee import Employee
+from app.models.vendor import Vendor
+from app.models.warehouse import Warehouse
+
+# Справочники в памяти воркера. Изменения через references.py вызывают
+# mark_reference_changed(): после коммита снимок сбрасывается в этом воркере,
+# остальные узнают через LISTEN/NOTIFY (app.core.notifications).
+# TTL страхует от потерянных уведомлений, промах по ключу перечитывает таблицу.
+REFERENCE_TOPIC = "reference_changed"
+
+# Таблица -> (модель, колонка-ключ для поиска)
+REFERENCE_TABLES = {
+    "companies": (Company, "code"),
+    "device_types": (DeviceType, "code"),
+    "vendors": (Vendor, "id"),
+    "employees": (Employee, "id"),
+    "warehouses": (Warehouse, "id"),
+}
+
+# Не перечитывать таблицу по промаху чаще, чем раз в столько секунд
+RELOAD_ON_MISS_INTERVAL = 1.0
+
+
+@dataclass(frozen=True)
+class ReferenceSnapshot:
+    """Неизменяемый снимок таблицы: строки (dict колонок) по id и по ключу."""
+    table: str
+    rows: Tuple[Dict[str, Any], ...]
+    by_key: Dict[Any, Dict[str, Any]]
+    version: int
+    etag: str
+    loaded_at: float
+
+
+_snapshots: Dict[str, ReferenceSnapshot] = {}
+_versions: Dict[str, int] = {table: 0 for table in REFERENCE_TABLES}
+_lock = threading.Lock()
+
+
+def _snapshot_etag(rows: Tuple[Dict[str, Any], ...]) -> str:
+    # Хэш содержимого, а не локальной версии: одинаковый во всех воркерах
+    raw = json.dumps(rows, sort_keys=True, default=str, separators=(",", ":")).encode()
+    return hashlib.sha1(raw).hexdigest()
+
+
+def _load(db: Session, table: str) -> ReferenceSnapshot:
+    model, key = REFERENCE_TABLES[table]
+    with _lock:
+        version = _versions[table]
+    rows = tuple(dict(row) for row in db.execute(select(model.__table__).order_by(model.id)).mappings())
+    snapshot = ReferenceSnapshot(
+        table=table,
+        rows=rows,
+        by_key={row[key]: row for row in rows},
+        version=version,
+        etag=_snapshot_etag(rows),
+        loaded_at=time.monotonic(),
+    )
+    with _lock:
+        # Пока читали, таблицу могли изменить — такой снимок не сохраняем
+        if _versions[table] == version:
+            _snapshots[table] = snapshot
+    return snapshot
+
+
+def get_snapshot(db: Session, table: str) -> ReferenceSnapshot:
+    snapshot = _snapshots.get(table)
+    if snapshot is None or time.monotonic() - snapshot.loaded_at > settings.REFERENCE_CACHE_TTL_SECONDS:
+        snapshot = _load(db, table)
+    return snapshot
+
+
+def get_reference(db: Session, table: str, key: Any) -> Optional[Dict[str, Any]]:
+    """
+    Строка справочника по ключу (code для companies/device_types, id для остальных) или None.
+    При промахе таблица перечитывается: запись могла появиться в другом воркере.
+    """
+    snapshot = get_snapshot(db, table)
+    row = snapshot.by_key.get(key)
+    if row is None and time.monotonic() - snapshot.loaded_at > RELOAD_ON_MISS_INTERVAL:
+        row = _load(db, table).by_key.get(key)
+    return row
+
+
+def invalidate_reference(table: Optional[str] = None) -> None:
+    """Сбрасывает снимок таблицы (или всех таблиц при table=None) в этом воркере."""
+    with _lock:
+        for name in ([table] if table else list(REFERENCE_TABLES)):
+            _versions[name] += 1
+            _snapshots.pop(name, None)
+
+
+def mark_reference_changed(db: Session, table: str) -> None:
+    """Вызывать в транзакции, меняющей справочник, до commit."""
+    notify(db, REFERENCE_TOPIC, table)
+
+
+subscribe(REFERENCE_TOPIC, invalidate_reference)
+on_listener_reconnect(invalidate_reference)
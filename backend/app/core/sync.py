@@ -0,0 +1,131 @@
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional, Tuple
+from sqlalchemy import and_, or_
+from sqlalchemy.orm import Session
+from app.core.pagination import encode_cursor, decode_cursor
+from app.models.asset import Asset
+from app.models.company import Company
+from app.models.device_type import DeviceType
+from app.models.employee import Employee
+from app.models.sync_tombstone import SyncTombstone
+from app.models.vendor import Vendor
+from app.models.warehouse import Warehouse
+
+# Таблицы дельта-синхронизации мобильного клиента (GET /sync)
+SYNC_REFERENCE_TABLES = {
+    "companies": Company,
+    "device_types": DeviceType,
+    "vendors": Vendor,
+    "employees": Employee,
+    "warehouses": Warehouse,
+}
+SYNC_TABLES = {**SYNC_REFERENCE_TABLES, "assets": Asset}
+
+# Активов в одном ответе; остальное — следующими запросами (has_more)
+SYNC_PAGE_SIZE = 5000
+
+# updated_at ставится до коммита, поэтому строка может стать видимой позже своего времени.
+# Следующий запрос начинается на SYNC_OVERLAP раньше — такие строки придут повторно, но не потеряются.
+SYNC_OVERLAP = timedelta(minutes=2)
+
+# Надгробия хранятся столько; клиент с более старым токеном получает полную выгрузку (reset)
+TOMBSTONE_RETENTION = timedelta(days=90)
+
+
+class SyncToken:
+    """
+    Водяной знак синхронизации.
+    since/after_id — ключ (updated_at, id), с которого продолжать; since=None — полная выгрузка.
+    issued_at — время выдачи токена, по нему проверяется срок хранения надгробий.
+    """
+
+    def __init__(self, since: Optional[datetime], after_id: int, issued_at: datetime):
+        self.since = since
+        self.after_id = after_id
+        self.issued_at = issued_at
+
+    def encode(self) -> str:
+        return encode_cursor([
+            self.since.isoformat() if self.since else None,
+            self.after_id,
+            self.issued_at.isoformat(),
+        ])
+
+    @classmethod
+    def decode(cls, token: str) -> "SyncToken":
+        since, after_id, issued_at = decode_cursor(token, ((str, type(None)), int, str))
+        try:
+            return cls(
+                datetime.fromisoformat(since) if since else None,
+                after_id,
+                datetime.fromisoformat(issued_at),
+            )
+        except (TypeError, ValueError):
+            raise ValueError("Invalid sync token")
+
+
+def record_tombstone(db: Session, table_name: str, row_id: int) -> None:
+    """Вызывать в транзакции удаления строки из SYNC_TABLES, до commit."""
+    db.add(SyncTombstone(table_name=table_name, row_id=row_id))
+    db.query(SyncTombstone).filter(
+        SyncTombstone.deleted_at < datetime.utcnow() - TOMBSTONE_RETENTION
+    ).delete(synchronize_session=False)
+
+
+def changed_rows(db: Session, model, since: Optional[datetime], after_id: int = 0, limit: Optional[int] = None) -> list:
+    """Строки с (updated_at, id) > (since, after_id) в порядке этого ключа; все строки при since=None."""
+    query = db.query(model)
+    if since is not None:
+        query = query.filter(or_(
+            model.updated_at > since,
+            and_(model.updated_at == since, model.id > after_id),
+        ))
+    query = query.order_by(model.updated_at.asc(), model.id.asc())
+    if limit is not None:
+        query = query.limit(limit)
+    return query.all()
+
+
+def deleted_ids(db: Session, since: datetime) -> Dict[str, List[int]]:
+    """id удалённых с момента since строк по таблицам"""
+    result: Dict[str, List[int]] = {name: [] for name in SYNC_TABLES}
+    rows = db.query(SyncTombstone.table_name, SyncTombstone.row_id).filter(
+        SyncTombstone.deleted_at >= since
+    ).order_by(SyncTombstone.id.asc()).all()
+    for table_name, row_id in rows:
+        if table_name in result:
+            result[table_name].append(row_id)
+    return result
+
+
+def collect_changes(db: Session, token: Optional[SyncToken]) -> Tuple[dict, SyncToken, bool, bool]:
+    """
+    Изменения с момента token.
+    Возвращает (строки и удаления по таблицам, следующий токен, has_more, reset).
+    reset=True — полная выгрузка: клиент заменяет локальную копию, а не дополняет её.
+    """
+    now = datetime.utcnow()
+    reset = token is None or token.issued_at < now - TOMBSTONE_RETENTION
+    since = None if reset else token.since
+    after_id = 0 if reset else token.after_id
+
+    changes = {}
+    for name, model in SYNC_REFERENCE_TABLES.items():
+        changes[name] = {"upserted": changed_rows(db, model, since), "deleted": []}
+
+    assets = changed_rows(db, Asset, since, after_id, limit=SYNC_PAGE_SIZE + 1)
+    has_more = len(assets) > SYNC_PAGE_SIZE
+    assets = assets[:SYNC_PAGE_SIZE]
+    changes["assets"] = {"upserted": assets, "deleted": []}
+
+    if since is not None:
+        for name, ids in deleted_ids(db, since).items():
+            changes[name]["deleted"] = ids
+
+    if has_more:
+        # Продолжение: ключ последнего актива; issued_at — момент, с которого у клиента полная копия
+        issued_at = now if reset else token.issued_at
+        next_token = SyncToken(assets[-1].updated_at, assets[-1].id, issued_at)
+    else:
+        next_token = SyncToken(now - SYNC_OVERLAP, 0, now)
+    return changes, next_token, has_more, reset
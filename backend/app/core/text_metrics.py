@@ -0,0 +1,49 @@
+from bisect import bisect_right
+from functools import lru_cache
+from itertools import accumulate
+from reportlab.pdfbase.pdfmetrics import stringWidth
+
+# Ширины символов в 1/1000 em, как в метриках Type1: ширина строки = сумма * size / 1000.
+# Так результат совпадает с reportlab stringWidth, но каждый символ измеряется один раз на шрифт.
+_EM = 1000
+
+
+class FontMetrics:
+    """Кэш ширин символов одного шрифта."""
+
+    __slots__ = ("font_name", "_widths")
+
+    def __init__(self, font_name: str):
+        self.font_name = font_name
+        self._widths: dict[str, float] = {}
+        for code in range(32, 127):
+            self._measure(chr(code))
+
+    def _measure(self, char: str) -> float:
+        width = stringWidth(char, self.font_name, _EM)
+        self._widths[char] = width
+        return width
+
+    def _char_widths(self, text: str) -> list[float]:
+        widths = self._widths
+        return [widths[ch] if ch in widths else self._measure(ch) for ch in text]
+
+    def string_width(self, text: str, font_size: float) -> float:
+        return sum(self._char_widths(text)) * font_size / _EM
+
+    def prefix_widths(self, text: str, font_size: float) -> list[float]:
+        """prefix[i] — ширина text[:i] (prefix[0] = 0)"""
+        return [w * font_size / _EM for w in accumulate(self._char_widths(text), initial=0.0)]
+
+    def max_prefix_fitting(self, text: str, font_size: float, max_width: float) -> int:
+        """Длина самого длинного префикса text, который помещается в max_width"""
+        return bisect_right(self.prefix_widths(text, font_size), max_width) - 1
+
+
+@lru_cache(maxsize=None)
+def font_metrics(font_name: str) -> FontMetrics:
+    return FontMetrics(font_name)
+
+
+def string_width(text: str, font_name: str, font_size: float) -> float:
+    return font_metrics(font_name).string_width(text, font_size)
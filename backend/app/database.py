@@ -1,4 +1,7 @@
+from typing import Any, Callable, TypeVar
+from fastapi.concurrency import run_in_threadpool
 from sqlalchemy import create_engine
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
 
@@ -12,8 +15,36 @@ engine = create_engine(
 
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+# Асинхронный движок (asyncpg) включается ASYNC_DATABASE_URL. Миграции, слушатель
+# LISTEN/NOTIFY и остальные эндпоинты работают через синхронный движок.
+async_engine = create_async_engine(
+    settings.ASYNC_DATABASE_URL,
+    pool_pre_ping=True,
+    echo=settings.DEBUG
+) if settings.ASYNC_DATABASE_URL else None
+
+AsyncSessionLocal = async_sessionmaker(
+    async_engine, autocommit=False, autoflush=False
+) if async_engine is not None else None
+
 Base = declarative_base()
 
+T = TypeVar("T")
+
+
+def is_postgresql(db) -> bool:
+    """Postgres-специфичные запросы (reltuples, pg_trgm, NOTIFY) включаются только на Postgres"""
+    return db.get_bind().dialect.name == "postgresql"
+
+
+def dialect_insert(db, table):
+    """insert() диалекта текущей БД: даёт on_conflict_do_nothing (Postgres и SQLite)"""
+    if is_postgresql(db):
+        from sqlalchemy.dialects.postgresql import insert
+    else:
+        from sqlalchemy.dialects.sqlite import insert
+    return insert(table)
+
 
 def get_db():
     db = SessionLocal()
@@ -23,3 +54,32 @@ def get_db():
         db.close()
 
 
+class DbRunner:
+    """
+    Выполняет синхронную функцию fn(db, ...) с доступом к БД из async-эндпоинта.
+    С async-движком — через AsyncSession.run_sync: запросы идут через asyncpg, и пока ждём БД,
+    event loop обслуживает другие запросы, поток не занят. Без него — в threadpool на обычном Session.
+    Так сервисные функции (record_scan, move_assets, ...) остаются общими для обоих путей.
+    """
+
+    def __init__(self, db):
+        self.db = db
+
+    async def run(self, fn: Callable[..., T], *args: Any, **kwargs: Any) -> T:
+        if isinstance(self.db, AsyncSession):
+            return await self.db.run_sync(fn, *args, **kwargs)
+        return await run_in_threadpool(fn, self.db, *args, **kwargs)
+
+
+async def get_db_runner():
+    """Единственная точка доступа к БД для async-эндпоинтов: AsyncSession или Session в threadpool."""
+    if AsyncSessionLocal is not None:
+        async with AsyncSessionLocal() as db:
+            yield DbRunner(db)
+        return
+    db = SessionLocal()
+    try:
+        yield DbRunner(db)
+    finally:
+        # close() отдаёт соединение в пул — блокирующий вызов, не в event loop
+        await run_in_threadpool(db.close)
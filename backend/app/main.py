@@ -2,6 +2,8 @@ from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from app.config import settings
 from app.api.v1 import api_router
+from app.core.label_jobs import shutdown_label_executor
+from app.core.notifications import start_notification_listener, stop_notification_listener
 
 app = FastAPI(
     title=settings.PROJECT_NAME,
@@ -16,12 +18,24 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Total-Count", "X-Next-Cursor"],
 )
 
 # Include API router
 app.include_router(api_router, prefix=settings.API_V1_PREFIX)
 
 
+@app.on_event("startup")
+def startup():
+    start_notification_listener()
+
+
+@app.on_event("shutdown")
+def shutdown():
+    stop_notification_listener()
+    shutdown_label_executor()
+
+
 @app.get("/")
 def root():
     return {
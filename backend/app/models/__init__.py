@@ -8,7 +8,11 @@ from app.models.movement import Movement
 from app.models.inventory_session import InventorySession
 from app.models.inventory_session_device_type import InventorySessionDeviceType
 from app.models.inventory_result import InventoryResult
+from app.models.inventory_session_stats import InventorySessionStats
 from app.models.user import User
+from app.models.inventory_number_counter import InventoryNumberCounter
+from app.models.sync_tombstone import SyncTombstone
+from app.models.location_checkpoint import LocationCheckpoint, LocationCheckpointEntry
 
 __all__ = [
     "Company",
@@ -21,7 +25,12 @@ __all__ = [
     "InventorySession",
     "InventorySessionDeviceType",
     "InventoryResult",
+    "InventorySessionStats",
     "User",
+    "InventoryNumberCounter",
+    "SyncTombstone",
+    "LocationCheckpoint",
+    "LocationCheckpointEntry",
 ]
 
 
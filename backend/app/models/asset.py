@@ -24,11 +24,20 @@ class Asset(Base):
     location_type = Column(SQLEnum(LocationType), nullable=False, index=True)
     location_id = Column(Integer, nullable=False, index=True)
     created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
-    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, nullable=False)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, nullable=False, index=True)
 
     # Индекс для комбинации location_type и location_id для быстрого поиска
     __table_args__ = (
         Index('ix_assets_location', 'location_type', 'location_id'),
+        # Триграммные индексы для поиска ILIKE '%...%' и по похожести (pg_trgm, только Postgres)
+        Index('ix_assets_inventory_number_trgm', 'inventory_number', postgresql_using='gin',
+              postgresql_ops={'inventory_number': 'gin_trgm_ops'}).ddl_if(dialect='postgresql'),
+        Index('ix_assets_serial_number_trgm', 'serial_number', postgresql_using='gin',
+              postgresql_ops={'serial_number': 'gin_trgm_ops'}).ddl_if(dialect='postgresql'),
+        Index('ix_assets_vendor_trgm', 'vendor', postgresql_using='gin',
+              postgresql_ops={'vendor': 'gin_trgm_ops'}).ddl_if(dialect='postgresql'),
+        Index('ix_assets_model_trgm', 'model', postgresql_using='gin',
+              postgresql_ops={'model': 'gin_trgm_ops'}).ddl_if(dialect='postgresql'),
     )
 
     # Relationships
@@ -1,4 +1,5 @@
-from sqlalchemy import Column, Integer, String
+from sqlalchemy import Column, Integer, String, DateTime
+from datetime import datetime
 from app.database import Base
 
 
@@ -8,5 +9,5 @@ class Company(Base):
     id = Column(Integer, primary_key=True, index=True)
     code = Column(String(3), unique=True, nullable=False, index=True)
     name = Column(String, nullable=False)
-
-
+    created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, nullable=False, index=True)
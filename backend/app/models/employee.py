@@ -1,4 +1,5 @@
-from sqlalchemy import Column, Integer, String, Enum as SQLEnum
+from sqlalchemy import Column, Integer, String, DateTime, Enum as SQLEnum
+from datetime import datetime
 from app.database import Base
 import enum
 
@@ -16,5 +17,5 @@ class Employee(Base):
     phone = Column(String(3), unique=True, nullable=False, index=True)
     position = Column(String, nullable=True)
     status = Column(SQLEnum(EmployeeStatus, name="employeestatus"), nullable=False, index=True, default=EmployeeStatus.working)
-
-
+    created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, nullable=False, index=True)
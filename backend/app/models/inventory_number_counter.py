@@ -0,0 +1,12 @@
+from sqlalchemy import Column, Integer, String, ForeignKey
+from app.database import Base
+
+
+class InventoryNumberCounter(Base):
+    """Последний выданный номер для префикса COMPANY_CODE-DEVICE_TYPE_CODE."""
+
+    __tablename__ = "inventory_number_counters"
+
+    company_code = Column(String(3), ForeignKey("companies.code"), primary_key=True)
+    device_type_code = Column(String(2), ForeignKey("device_types.code"), primary_key=True)
+    last_number = Column(Integer, nullable=False, default=0)
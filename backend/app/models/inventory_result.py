@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, Boolean, DateTime, Enum as SQLEnum, ForeignKey, Index
+from sqlalchemy import Column, Integer, Boolean, DateTime, Enum as SQLEnum, ForeignKey, Index, UniqueConstraint
 from sqlalchemy.orm import relationship
 from datetime import datetime
 from app.database import Base
@@ -16,6 +16,11 @@ class InventoryResult(Base):
     actual_location_id = Column(Integer, nullable=True)
     confirmed_at = Column(DateTime, default=datetime.utcnow, nullable=False)
 
+    # Один результат на актив в сессии (индекс (session_id, asset_id) заодно для проверок и anti-join)
+    __table_args__ = (
+        UniqueConstraint("session_id", "asset_id", name="uq_inventory_results_session_asset"),
+    )
+
     # Relationships
     session = relationship("InventorySession", back_populates="results")
     asset = relationship("Asset")
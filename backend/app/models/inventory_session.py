@@ -12,8 +12,16 @@ class InventorySession(Base):
     completed_at = Column(DateTime, nullable=True)
     description = Column(Text, nullable=True)
 
+    # Счётчики прогресса: total_assets — снимок области на момент создания,
+    # остальные увеличиваются в транзакции записи результатов (app.core.inventory_counters)
+    total_assets = Column(Integer, nullable=False, default=0)
+    checked_count = Column(Integer, nullable=False, default=0)
+    found_count = Column(Integer, nullable=False, default=0)
+    not_found_count = Column(Integer, nullable=False, default=0)
+
     # Relationships
     results = relationship("InventoryResult", back_populates="session", cascade="all, delete-orphan")
+    stats = relationship("InventorySessionStats", back_populates="session", cascade="all, delete-orphan")
     device_type_scopes = relationship(
         "InventorySessionDeviceType",
         back_populates="session",
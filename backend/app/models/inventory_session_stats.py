@@ -0,0 +1,18 @@
+from sqlalchemy import Column, Integer, String, ForeignKey
+from sqlalchemy.orm import relationship
+from app.database import Base
+
+
+class InventorySessionStats(Base):
+    """Счётчики прогресса сессии по типу устройства (итоги по сессии — в InventorySession)."""
+
+    __tablename__ = "inventory_session_stats"
+
+    session_id = Column(Integer, ForeignKey("inventory_sessions.id", ondelete="CASCADE"), primary_key=True)
+    device_type_code = Column(String(2), ForeignKey("device_types.code"), primary_key=True)
+    total_assets = Column(Integer, nullable=False, default=0)
+    checked_count = Column(Integer, nullable=False, default=0)
+    found_count = Column(Integer, nullable=False, default=0)
+    not_found_count = Column(Integer, nullable=False, default=0)
+
+    session = relationship("InventorySession", back_populates="stats")
@@ -0,0 +1,28 @@
+from sqlalchemy import Column, Integer, DateTime, Enum as SQLEnum, ForeignKey
+from sqlalchemy.orm import relationship
+from datetime import datetime
+from app.database import Base
+from app.models.asset import LocationType
+
+
+class LocationCheckpoint(Base):
+    """Снимок расположения всех активов на момент taken_at (опорная точка для истории)."""
+
+    __tablename__ = "location_checkpoints"
+
+    id = Column(Integer, primary_key=True, index=True)
+    taken_at = Column(DateTime, nullable=False, unique=True, index=True)
+    asset_count = Column(Integer, nullable=False, default=0)
+    created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+
+    entries = relationship("LocationCheckpointEntry", cascade="all, delete-orphan", passive_deletes=True)
+
+
+class LocationCheckpointEntry(Base):
+    __tablename__ = "location_checkpoint_entries"
+
+    checkpoint_id = Column(Integer, ForeignKey("location_checkpoints.id", ondelete="CASCADE"), primary_key=True)
+    # Без внешнего ключа: снимок переживает удаление актива
+    asset_id = Column(Integer, primary_key=True)
+    location_type = Column(SQLEnum(LocationType), nullable=False)
+    location_id = Column(Integer, nullable=False)
@@ -14,13 +14,23 @@ class Movement(Base):
     __tablename__ = "movements"
 
     id = Column(Integer, primary_key=True, index=True)
-    asset_id = Column(Integer, ForeignKey("assets.id"), nullable=False, index=True)
+    asset_id = Column(Integer, ForeignKey("assets.id"), nullable=False)
     from_type = Column(SQLEnum(LocationType), nullable=False)
     from_id = Column(Integer, nullable=False)
     to_type = Column(SQLEnum(LocationType), nullable=False)
     to_id = Column(Integer, nullable=False)
     moved_at = Column(DateTime, default=datetime.utcnow, nullable=False)
 
+    # История «новые сверху» по активу и по месту (откуда/куда); asset_id-префикс заменяет
+    # отдельный индекс по asset_id
+    __table_args__ = (
+        Index("ix_movements_asset_moved_at", "asset_id", "moved_at"),
+        Index("ix_movements_to_location_moved_at", "to_type", "to_id", "moved_at"),
+        Index("ix_movements_from_location_moved_at", "from_type", "from_id", "moved_at"),
+        # Проигрывание журнала от опорного снимка (app.core.location_history)
+        Index("ix_movements_moved_at", "moved_at"),
+    )
+
     # Relationships
     asset = relationship("Asset", backref="movements")
 
@@ -1,5 +1,5 @@
 from app.schemas.user import User, UserCreate, UserInDB, Token, TokenData
-from app.schemas.asset import Asset, AssetCreate, AssetUpdate
+from app.schemas.asset import Asset, AssetCreate, AssetUpdate, AssetImportResult
 from app.schemas.movement import Movement, MovementCreate
 from app.schemas.inventory import InventorySession, InventorySessionCreate, InventoryResult, InventoryResultCreate
 
@@ -12,6 +12,7 @@ __all__ = [
     "Asset",
     "AssetCreate",
     "AssetUpdate",
+    "AssetImportResult",
     "Movement",
     "MovementCreate",
     "InventorySession",
@@ -1,5 +1,5 @@
 from pydantic import BaseModel, Field, field_validator
-from typing import Optional
+from typing import List, Optional
 from datetime import datetime
 from app.models.asset import LocationType
 
@@ -55,3 +55,14 @@ class Asset(BaseModel):
         from_attributes = True
 
 
+class AssetImportError(BaseModel):
+    row: int
+    serial_number: Optional[str] = None
+    errors: List[str]
+
+
+class AssetImportResult(BaseModel):
+    total_rows: int
+    created: int
+    failed: int
+    errors: List[AssetImportError]
@@ -1,5 +1,5 @@
-from pydantic import BaseModel
-from typing import Optional, List
+from pydantic import BaseModel, Field
+from typing import Literal, Optional, List
 from datetime import datetime
 from app.models.asset import LocationType
 from app.schemas.asset import Asset as AssetSchema
@@ -30,6 +30,37 @@ class InventoryResultCreate(BaseModel):
     actual_location_id: Optional[int] = None
 
 
+class InventoryResultBatch(BaseModel):
+    items: List[InventoryResultCreate] = Field(..., min_length=1, max_length=1000)
+
+
+class InventoryResultOutcome(BaseModel):
+    asset_id: int
+    status: Literal["created", "duplicate", "not_found", "out_of_scope"]
+    result_id: Optional[int] = None
+
+
+class InventoryResultBatchResponse(BaseModel):
+    session_id: int
+    created: int
+    duplicates: int
+    rejected: int
+    items: List[InventoryResultOutcome]
+
+
+class InventoryScanRequest(BaseModel):
+    payload: str = Field(..., description="Raw QR code content (inventory number)")
+    found: bool = True
+    actual_location_type: Optional[LocationType] = None
+    actual_location_id: Optional[int] = None
+
+
+class InventoryScanResult(BaseModel):
+    status: Literal["created", "duplicate"]
+    result_id: Optional[int] = None
+    asset: AssetSchema
+
+
 class InventoryResultBase(BaseModel):
     asset_id: int
     found: bool
@@ -51,6 +82,17 @@ class InventoryProgress(BaseModel):
     checked: int
     total: int
     remaining: int
+    found: int = 0
+    not_found: int = 0
+
+
+class InventoryDeviceTypeProgress(BaseModel):
+    device_type_code: str
+    checked: int
+    total: int
+    remaining: int
+    found: int
+    not_found: int
 
 
 class InventoryCheckedItem(BaseModel):
@@ -62,3 +104,22 @@ class InventoryCheckedItem(BaseModel):
     class Config:
         from_attributes = True
 
+
+class InventoryCheckedRow(BaseModel):
+    """Строка компактного списка проверенных (порядок полей = порядок колонок запроса)"""
+    id: int
+    found: bool
+    confirmed_at: datetime
+    asset_id: int
+    inventory_number: str
+    device_type_code: str
+    model: str
+    location_type: LocationType
+    location_id: int
+
+
+class InventoryRemainingLocation(BaseModel):
+    location_type: LocationType
+    location_id: int
+    location_name: Optional[str] = None
+    remaining: int
@@ -1,4 +1,5 @@
-from pydantic import BaseModel, validator
+from pydantic import BaseModel, Field, model_validator, validator
+from typing import List, Literal, Optional
 from datetime import datetime
 from app.models.movement import LocationType
 
@@ -23,3 +24,36 @@ class Movement(MovementBase):
         from_attributes = True
 
 
+class MovementBulkCreate(BaseModel):
+    """Либо asset_ids + одно место назначения (to_type, to_id), либо items с местом для каждого актива."""
+    asset_ids: List[int] = Field(default_factory=list, max_length=1000)
+    to_type: Optional[LocationType] = None
+    to_id: Optional[int] = None
+    items: List[MovementCreate] = Field(default_factory=list, max_length=1000)
+
+    @model_validator(mode="after")
+    def check_form(self):
+        if self.items and self.asset_ids:
+            raise ValueError("Use either asset_ids with to_type/to_id, or items")
+        if self.asset_ids and (self.to_type is None or self.to_id is None):
+            raise ValueError("to_type and to_id are required with asset_ids")
+        if not self.items and not self.asset_ids:
+            raise ValueError("Nothing to move")
+        return self
+
+    def moves(self) -> List[MovementCreate]:
+        if self.items:
+            return self.items
+        return [MovementCreate(asset_id=asset_id, to_type=self.to_type, to_id=self.to_id) for asset_id in self.asset_ids]
+
+
+class MovementBulkOutcome(BaseModel):
+    asset_id: int
+    status: Literal["moved", "not_found", "same_location", "invalid_destination", "duplicate"]
+    movement_id: Optional[int] = None
+
+
+class MovementBulkResponse(BaseModel):
+    moved: int
+    skipped: int
+    items: List[MovementBulkOutcome]
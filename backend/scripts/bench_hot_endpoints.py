@@ -0,0 +1,83 @@
+#!/usr/bin/env python3
+"""
+Нагрузочный замер горячих эндпоинтов (requests/sec) против запущенного API.
+
+Сравнение sync и async пути: запустить API без ASYNC_DATABASE_URL, замерить,
+перезапустить с ASYNC_DATABASE_URL=postgresql+asyncpg://... и замерить снова.
+
+    python scripts/bench_hot_endpoints.py --url http://localhost:8000/api/v1 \\
+        --username admin --password admin123 --concurrency 100 --duration 20
+
+Нужна открытая сессия инвентаризации (--session) и активы в БД; сканы повторяются,
+после первого прохода это сканы-повторы (тот же путь, без вставки).
+Требует httpx (pip install httpx), в requirements.txt его нет — это инструмент, не зависимость API.
+"""
+import argparse
+import asyncio
+import statistics
+import time
+
+import httpx
+
+
+async def _worker(client: httpx.AsyncClient, make_request, deadline: float, latencies: list, errors: list):
+    i = 0
+    while time.perf_counter() < deadline:
+        started = time.perf_counter()
+        response = await make_request(client, i)
+        latencies.append(time.perf_counter() - started)
+        if response.status_code >= 500:
+            errors.append(response.status_code)
+        i += 1
+
+
+async def _run(name: str, make_request, args, headers) -> None:
+    latencies: list = []
+    errors: list = []
+    limits = httpx.Limits(max_connections=args.concurrency, max_keepalive_connections=args.concurrency)
+    async with httpx.AsyncClient(base_url=args.url, headers=headers, limits=limits, timeout=60) as client:
+        deadline = time.perf_counter() + args.duration
+        await asyncio.gather(*[
+            _worker(client, make_request, deadline, latencies, errors) for _ in range(args.concurrency)
+        ])
+    latencies.sort()
+    p95 = latencies[int(len(latencies) * 0.95) - 1] if latencies else 0
+    print(
+        f"{name:<12} {len(latencies) / args.duration:8.1f} req/s  "
+        f"p50 {statistics.median(latencies) * 1000 if latencies else 0:7.1f} ms  "
+        f"p95 {p95 * 1000:7.1f} ms  5xx {len(errors)}"
+    )
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--url", default="http://localhost:8000/api/v1")
+    parser.add_argument("--username", default="admin")
+    parser.add_argument("--password", default="admin123")
+    parser.add_argument("--session", type=int, help="open inventory session id for the scan benchmark")
+    parser.add_argument("--concurrency", type=int, default=50)
+    parser.add_argument("--duration", type=float, default=10)
+    args = parser.parse_args()
+
+    async with httpx.AsyncClient(base_url=args.url) as client:
+        response = await client.post("/auth/login", data={"username": args.username, "password": args.password})
+        response.raise_for_status()
+        headers = {"Authorization": f"Bearer {response.json()['access_token']}"}
+        assets = (await client.get("/assets/", params={"limit": 1000}, headers=headers)).json()
+    numbers = [a["inventory_number"] for a in assets] or ["missing"]
+
+    async def assets_page(client, i):
+        return await client.get("/assets/", params={"limit": 50})
+
+    async def scan(client, i):
+        return await client.post(
+            f"/inventory/sessions/{args.session}/scan", json={"payload": numbers[i % len(numbers)]}
+        )
+
+    await _run("assets list", assets_page, args, headers)
+    if args.session:
+        await _run("scan", scan, args, headers)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,217 @@
+#!/usr/bin/env python3
+"""
+Микро-замер раскладки текста наклеек: reportlab stringWidth против кэша ширин символов
+(app.core.text_metrics) и кэша раскладки (lru_cache в app.core.labels).
+
+    python scripts/bench_label_layout.py --labels 300 --repeat 5
+
+Режимы:
+  original     — раскладка labels.py до кэшей (копия ниже), canvas.stringWidth на каждый замер;
+                 перед замером проверяется, что она даёт те же кегли и строки, что и текущая
+  cached cold  — кэши сброшены перед проходом (первая печать партии)
+  cached warm  — повторный проход по тем же наклейкам (перепечатка)
+Раскладка повторяет draw_label для 30x20: заголовок, инвентарный номер и перенос S/N, без рисования.
+"""
+import argparse
+import os
+import sys
+import time
+from io import BytesIO
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from reportlab.lib.pagesizes import mm
+from reportlab.pdfgen import canvas
+
+from app.core import labels, text_metrics
+
+WIDTH, HEIGHT = labels.LABEL_SIZES["30x20"]
+MARGIN = GAP = 1.0 * mm
+QR_SIZE = 30.0
+NAME_WIDTH = WIDTH - 2 * MARGIN
+INV_WIDTH = WIDTH - 2 * MARGIN - (QR_SIZE + GAP)
+SERIAL_WIDTH = WIDTH - MARGIN - (MARGIN + QR_SIZE + GAP)
+SERIAL_HEIGHT = (HEIGHT - MARGIN - 6 - GAP) - (MARGIN + 7 + GAP)
+
+VENDOR_MODELS = [
+    ("Dell", "Latitude 5420"), ("Lenovo", "ThinkPad T14 Gen 3"), ("HP", "EliteBook 840 G8"),
+    ("Apple", "MacBook Pro 14"), ("Samsung", "Galaxy S23 Ultra"), ("Cisco", "IP Phone 8845"),
+]
+
+
+def _assets(count: int) -> list:
+    return [
+        (
+            "%s %s" % VENDOR_MODELS[i % len(VENDOR_MODELS)],
+            f"WWP-01/{i:05d}",
+            f"SN-{i:06d}-5CG{i * 7919 % 100000:05d}-REV{i % 4}",
+        )
+        for i in range(count)
+    ]
+
+
+# --- Исходная раскладка (labels.py до кэша ширин), без изменений кроме имён ---
+
+def _original_wrap_to_width(c, text, font_name, font_size, max_width, max_lines=2):
+    text = (text or "").strip()
+    if not text:
+        return []
+
+    if c.stringWidth(text, font_name, font_size) <= max_width:
+        return [text]
+
+    raw_parts = text.split()
+    parts = []
+    for p in raw_parts:
+        if c.stringWidth(p, font_name, font_size) <= max_width:
+            parts.append(p)
+            continue
+        if "-" in p:
+            sub = p.split("-")
+            for i, s in enumerate(sub):
+                if s:
+                    parts.append(s + ("-" if i < len(sub) - 1 else ""))
+        else:
+            parts.append(p)
+
+    lines = []
+    cur = ""
+
+    def flush():
+        nonlocal cur
+        if cur:
+            lines.append(cur)
+            cur = ""
+
+    for token in parts:
+        candidate = token if not cur else (cur + token)
+        if c.stringWidth(candidate, font_name, font_size) <= max_width:
+            cur = candidate
+            continue
+
+        if not cur:
+            lo, hi = 1, len(token)
+            best = token[0]
+            while lo <= hi:
+                mid = (lo + hi) // 2
+                cand = token[:mid]
+                if c.stringWidth(cand, font_name, font_size) <= max_width:
+                    best = cand
+                    lo = mid + 1
+                else:
+                    hi = mid - 1
+            cur = best
+            flush()
+            rest = token[len(best):]
+            if rest:
+                parts.insert(0, rest)
+            continue
+
+        flush()
+        cur = token
+
+        if len(lines) >= max_lines:
+            break
+
+    flush()
+
+    if len(lines) > max_lines:
+        lines = lines[:max_lines]
+
+    return lines
+
+
+def _original_wrap_to_width_with_status(c, text, font_name, font_size, max_width, max_lines):
+    text = (text or "").strip()
+    if not text:
+        return ([], True)
+
+    lines = _original_wrap_to_width(c, text, font_name, font_size, max_width, max_lines=max_lines)
+    joined = "".join(lines).replace(" ", "")
+    full = text.replace(" ", "")
+    return (lines, joined == full)
+
+
+def _original_fit_font_size(c, text, font_name, font_size, min_size, max_width):
+    # Цикл подбора кегля заголовка/инвентарного номера из draw_label
+    c.setFont(font_name, font_size)
+    while font_size > min_size and c.stringWidth(text, font_name, font_size) > max_width:
+        font_size -= 1
+        c.setFont(font_name, font_size)
+    return font_size
+
+
+def _original_fit_wrapped_text(c, text, font_name, font_size, min_size, max_width, max_height, leading_gap, max_lines_cap):
+    # Цикл подбора кегля и переносов S/N из draw_label
+    while True:
+        c.setFont(font_name, font_size)
+        leading = font_size + leading_gap
+        max_lines_fit = max(1, int((max_height + leading_gap) // leading))
+        max_lines_fit = min(max_lines_fit, max_lines_cap)
+        lines, complete = _original_wrap_to_width_with_status(c, text, font_name, font_size, max_width, max_lines=max_lines_fit)
+
+        total_h = len(lines) * leading - leading_gap if lines else leading
+        if complete and total_h <= max_height:
+            break
+        if font_size <= min_size:
+            break
+        font_size -= 1
+    return font_size, tuple(lines)
+
+
+def _layout(fit_font_size, fit_wrapped_text, name: str, inventory: str, serial: str) -> tuple:
+    return (
+        fit_font_size(name, "Helvetica-Bold", 6, 3, NAME_WIDTH),
+        fit_font_size(inventory, "Helvetica-Bold", 7, 4, INV_WIDTH),
+        fit_wrapped_text(serial, "Helvetica", 4, 3, SERIAL_WIDTH, SERIAL_HEIGHT, 0.6, 6),
+    )
+
+
+def _run(assets: list, fit_font_size, fit_wrapped_text) -> float:
+    started = time.perf_counter()
+    for asset in assets:
+        _layout(fit_font_size, fit_wrapped_text, *asset)
+    return (time.perf_counter() - started) / len(assets) * 1e6
+
+
+def _clear_caches() -> None:
+    labels.fit_font_size.cache_clear()
+    labels.fit_wrapped_text.cache_clear()
+    text_metrics.font_metrics.cache_clear()
+
+
+def _best(runs: list) -> str:
+    return f"{min(runs):8.1f} us/label"
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--labels", type=int, default=300)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+    assets = _assets(args.labels)
+
+    # Исходный код: ширины через canvas.stringWidth, раскладка не мемоизирована
+    c = canvas.Canvas(BytesIO())
+    original_font_size = lambda *a: _original_fit_font_size(c, *a)
+    original_wrapped = lambda *a: _original_fit_wrapped_text(c, *a)
+    for asset in assets:
+        expected = _layout(original_font_size, original_wrapped, *asset)
+        if _layout(labels.fit_font_size, labels.fit_wrapped_text, *asset) != expected:
+            raise SystemExit(f"layout differs from the original for {asset}")
+
+    uncached = [_run(assets, original_font_size, original_wrapped) for _ in range(args.repeat)]
+
+    cold, warm = [], []
+    for _ in range(args.repeat):
+        _clear_caches()
+        cold.append(_run(assets, labels.fit_font_size, labels.fit_wrapped_text))
+        warm.append(_run(assets, labels.fit_font_size, labels.fit_wrapped_text))
+
+    print(f"original     {_best(uncached)}")
+    print(f"cached cold  {_best(cold)}  x{min(uncached) / min(cold):.1f}")
+    print(f"cached warm  {_best(warm)}  x{min(uncached) / min(warm):.1f}")
+
+
+if __name__ == "__main__":
+    main()
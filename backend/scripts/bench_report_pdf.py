@@ -0,0 +1,102 @@
+#!/usr/bin/env python3
+"""
+Замер экспорта отчёта в PDF (export_pdf) на синтетических строках: время, пиковая память
+и время до первого байта ответа. БД не нужна — строки генерируются в памяти.
+
+    python scripts/bench_report_pdf.py --sizes 1000 10000 100000
+
+Каждый размер считается в отдельном процессе, чтобы пик RSS не наследовался от предыдущего.
+Время до первого байта: export_pdf отдаёт заголовок файла сразу, а страницы — частями
+по PDF_PAGES_PER_PART по мере вёрстки, поэтому в таблице отдельно время до первой части
+со страницами (first part).
+"""
+import argparse
+import asyncio
+import json
+import os
+import resource
+import subprocess
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+# export_pdf не обращается к БД, но app.config требует настройки
+os.environ.setdefault("DATABASE_URL", "sqlite://")
+os.environ.setdefault("SECRET_KEY", "bench")
+os.environ.setdefault("DEBUG", "false")
+
+
+def _peak_rss_mb() -> float:
+    # ru_maxrss на Linux — в КБ
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def _rows(count: int):
+    from app.api.v1.reports import ReportRow
+
+    for i in range(count):
+        yield ReportRow(
+            device_type="Laptop",
+            vendor_model=f"Dell Latitude {5000 + i % 500}",
+            serial=f"SN{i:010d}",
+            inventory=f"WWP-01/{i:05d}",
+            location="Main warehouse" if i % 3 else f"Employee Name {i % 1000}",
+            phone="" if i % 3 else f"{100 + i % 900}",
+        )
+
+
+def _measure(count: int) -> dict:
+    from app.api.v1.reports import export_pdf
+
+    async def consume():
+        # Как Starlette отдаёт ответ: время до первого куска body_iterator и до последнего
+        response = export_pdf(_rows(count))
+        first_byte = first_part = None
+        size = 0
+        async for chunk in response.body_iterator:
+            if first_byte is None:
+                first_byte = time.perf_counter() - started
+            elif first_part is None:
+                first_part = time.perf_counter() - started
+            size += len(chunk)
+        return first_byte, first_part, size
+
+    rss_before = _peak_rss_mb()
+    started = time.perf_counter()
+    first_byte, first_part, size = asyncio.run(consume())
+    return {
+        "rows": count,
+        "first_byte_s": first_byte,
+        "first_part_s": first_part,
+        "total_s": time.perf_counter() - started,
+        "bytes": size,
+        "peak_rss_mb": _peak_rss_mb(),
+        "rss_growth_mb": _peak_rss_mb() - rss_before,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 10000, 100000])
+    parser.add_argument("--child", type=int, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child is not None:
+        print(json.dumps(_measure(args.child)))
+        return
+
+    print(f"{'rows':>8} {'first byte':>11} {'first part':>11} {'total':>9} {'size':>9} {'peak RSS':>10} {'growth':>9}")
+    for count in args.sizes:
+        output = subprocess.run(
+            [sys.executable, os.path.abspath(__file__), "--child", str(count)],
+            check=True, capture_output=True, text=True,
+        ).stdout
+        r = json.loads(output.strip().splitlines()[-1])
+        print(
+            f"{r['rows']:>8} {r['first_byte_s']:>9.2f} s {r['first_part_s']:>9.2f} s {r['total_s']:>7.2f} s "
+            f"{r['bytes'] / 1024 / 1024:>6.1f} MB {r['peak_rss_mb']:>7.1f} MB {r['rss_growth_mb']:>6.1f} MB"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,167 @@
+import os
+
+# Настройки читаются при импорте app.config
+os.environ.setdefault("DATABASE_URL", "sqlite://")
+os.environ.setdefault("SECRET_KEY", "test-secret")
+os.environ.setdefault("DEBUG", "false")
+
+import pytest
+from sqlalchemy import MetaData, create_engine, text
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import NullPool, StaticPool
+
+import app.models  # noqa: F401  (регистрирует все таблицы в Base.metadata)
+from app.database import Base, DbRunner, get_db, get_db_runner
+from app.core.asset_summary import invalidate_asset_counts
+from app.core.reference_cache import invalidate_reference
+from app.core.security import create_access_token
+from app.models import Company, DeviceType, Employee, User, Vendor, Warehouse
+from app.models.user import UserRole
+
+# Тесты с маркером postgres идут на настоящем Postgres (psycopg2 + asyncpg), например:
+#   TEST_POSTGRES_URL=postgresql://postgres@localhost/inventorypro_test pytest -m postgres
+# База пересоздаётся целиком. Без переменной эти тесты пропускаются.
+POSTGRES_URL = os.environ.get("TEST_POSTGRES_URL", "")
+
+
+def pytest_collection_modifyitems(config, items):
+    if POSTGRES_URL:
+        return
+    skip = pytest.mark.skip(reason="TEST_POSTGRES_URL is not set")
+    for item in items:
+        if "postgres" in item.keywords:
+            item.add_marker(skip)
+
+
+def _reset_caches() -> None:
+    invalidate_reference()
+    invalidate_asset_counts()
+
+
+def seed_references(db) -> None:
+    """Минимальные справочники: компания WWP, типы 01/02, вендор Dell, склад Main, сотрудник Ann."""
+    db.add_all([
+        Company(code="WWP", name="W"),
+        DeviceType(code="01", name="Laptop"),
+        DeviceType(code="02", name="Phone"),
+        Vendor(name="Dell"),
+        Warehouse(name="Main"),
+        Employee(name="Ann", phone="101"),
+    ])
+    db.commit()
+
+
+def _api_client(db, runner_dependency):
+    """TestClient API: синхронные эндпоинты на db, async — через runner_dependency; токен администратора."""
+    from fastapi.testclient import TestClient
+    from app.main import app
+
+    db.add(User(username="admin", email="admin@example.com", hashed_password="-", role=UserRole.admin))
+    db.commit()
+
+    def override_get_db():
+        yield db
+
+    app.dependency_overrides[get_db] = override_get_db
+    app.dependency_overrides[get_db_runner] = runner_dependency
+    try:
+        test_client = TestClient(app)
+        test_client.headers["Authorization"] = "Bearer " + create_access_token({"sub": "admin"})
+        yield test_client
+    finally:
+        app.dependency_overrides.clear()
+
+
+@pytest.fixture
+def db():
+    """Сессия на чистой SQLite в памяти; кэши процесса сбрасываются между тестами."""
+    engine = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+    Base.metadata.create_all(engine)
+    session = sessionmaker(autocommit=False, autoflush=False, bind=engine)()
+    _reset_caches()
+    try:
+        yield session
+    finally:
+        session.close()
+        engine.dispose()
+        _reset_caches()
+
+
+@pytest.fixture
+def references(db):
+    seed_references(db)
+    return db
+
+
+@pytest.fixture
+def client(references):
+    """TestClient API на тестовой БД; async-эндпоинты идут через threadpool (как без ASYNC_DATABASE_URL)."""
+    async def override_get_db_runner():
+        yield DbRunner(references)
+
+    yield from _api_client(references, override_get_db_runner)
+
+
+def _postgres_metadata(with_trigram_indexes: bool) -> MetaData:
+    """Копия схемы; без pg_trgm (голый тестовый сервер без contrib) — без триграммных индексов."""
+    metadata = MetaData()
+    for table in Base.metadata.sorted_tables:
+        copy = table.to_metadata(metadata)
+        if not with_trigram_indexes:
+            copy.indexes = {index for index in copy.indexes if not index.name.endswith("_trgm")}
+    return metadata
+
+
+@pytest.fixture(scope="session")
+def pg_engine():
+    engine = create_engine(POSTGRES_URL)
+    with engine.begin() as conn:
+        has_trigram = conn.execute(
+            text("SELECT 1 FROM pg_available_extensions WHERE name = 'pg_trgm'")
+        ).scalar() is not None
+        if has_trigram:
+            conn.execute(text("CREATE EXTENSION IF NOT EXISTS pg_trgm"))
+        metadata = _postgres_metadata(has_trigram)
+        metadata.drop_all(conn)
+        metadata.create_all(conn)
+    yield engine
+    engine.dispose()
+
+
+@pytest.fixture
+def pg_db(pg_engine):
+    """Сессия на тестовом Postgres; все таблицы очищаются перед тестом."""
+    tables = ", ".join(table.name for table in Base.metadata.sorted_tables)
+    with pg_engine.begin() as conn:
+        conn.execute(text(f"TRUNCATE {tables} RESTART IDENTITY CASCADE"))
+    session = sessionmaker(autocommit=False, autoflush=False, bind=pg_engine)()
+    _reset_caches()
+    try:
+        yield session
+    finally:
+        session.close()
+        _reset_caches()
+
+
+@pytest.fixture
+def pg_references(pg_db):
+    seed_references(pg_db)
+    return pg_db
+
+
+@pytest.fixture
+def pg_async_sessions():
+    """Фабрика AsyncSession на asyncpg (как при ASYNC_DATABASE_URL). NullPool: у TestClient свой event loop."""
+    engine = create_async_engine(POSTGRES_URL.replace("postgresql://", "postgresql+asyncpg://", 1), poolclass=NullPool)
+    return async_sessionmaker(engine, autocommit=False, autoflush=False)
+
+
+@pytest.fixture
+def pg_client(pg_references, pg_async_sessions):
+    """TestClient API на Postgres: async-эндпоинты работают через AsyncSession.run_sync поверх asyncpg."""
+    async def override_get_db_runner():
+        async with pg_async_sessions() as session:
+            yield DbRunner(session)
+
+    yield from _api_client(pg_references, override_get_db_runner)
@@ -0,0 +1,74 @@
+import csv
+import io
+import zipfile
+
+import pytest
+from openpyxl.utils.exceptions import InvalidFileException
+
+from app.core import asset_import
+from app.core.asset_import import BATCH_SIZE, import_assets, iter_csv_rows, iter_xlsx_rows
+from app.models import Asset
+
+HEADER = b"company_code,device_type_code,serial_number,vendor,model,location_type,location_id\n"
+
+
+def _row(serial: bytes) -> bytes:
+    return b"WWP,01," + serial + b",Dell,Latitude,warehouse,1\n"
+
+
+def _csv(*rows: bytes) -> io.BytesIO:
+    return io.BytesIO(HEADER + b"".join(rows))
+
+
+def test_bad_encoding_after_first_batch_is_reported_per_row(references):
+    db = references
+    rows = [_row(b"SN%05d" % i) for i in range(BATCH_SIZE + 10)]
+    rows.insert(BATCH_SIZE + 5, _row(b"SN-\xff\xfe"))
+
+    result = import_assets(db, iter_csv_rows(_csv(*rows)))
+
+    assert result.total_rows == BATCH_SIZE + 11
+    assert result.created == BATCH_SIZE + 10
+    assert result.failed == 1
+    assert result.errors[0].row == BATCH_SIZE + 7  # заголовок — строка 1
+    assert "UTF-8" in result.errors[0].errors[0]
+    assert db.query(Asset).count() == BATCH_SIZE + 10
+
+
+def test_unreadable_tail_returns_partial_result(references):
+    db = references
+    rows = [_row(b"SN%05d" % i) for i in range(BATCH_SIZE + 10)]
+    # Поле больше csv.field_size_limit() (так выглядит незакрытая кавычка) — csv.Error, дальше файл не читается
+    rows.insert(BATCH_SIZE + 5, _row(b"X" * 200_000))
+
+    result = import_assets(db, iter_csv_rows(_csv(*rows)))
+
+    assert result.created == BATCH_SIZE + 5
+    assert result.failed == 1
+    assert "Cannot read file" in result.errors[0].errors[0]
+    assert db.query(Asset).count() == BATCH_SIZE + 5
+
+
+def test_unreadable_header_raises(references):
+    with pytest.raises(csv.Error):
+        import_assets(references, iter_csv_rows(io.BytesIO(b"serial\xff\n" + _row(b"SN1"))))
+
+
+def test_zip_that_is_not_a_workbook_raises(references):
+    archive = io.BytesIO()
+    with zipfile.ZipFile(archive, "w") as z:
+        z.writestr("notes.txt", "not a workbook")
+    archive.seek(0)
+
+    with pytest.raises(InvalidFileException):
+        import_assets(references, iter_xlsx_rows(archive))
+
+
+def test_bug_during_import_is_not_reported_as_unreadable_file(references, monkeypatch):
+    def broken_reserve(*args, **kwargs):
+        raise KeyError("bug")
+
+    monkeypatch.setattr(asset_import, "reserve_inventory_numbers", broken_reserve)
+
+    with pytest.raises(KeyError):
+        import_assets(references, iter_csv_rows(_csv(_row(b"SN1"))))
@@ -0,0 +1,39 @@
+import pytest
+
+from app.models import Asset
+from app.models.asset import LocationType
+
+SERIALS = ["AB_12", "ABX12", "50%OFF", "500OFF", "C:\\X"]
+
+
+@pytest.fixture
+def assets(client, references):
+    references.add_all([
+        Asset(
+            company_code="WWP",
+            device_type_code="01",
+            inventory_number=f"WWP-01/{i:05d}",
+            serial_number=serial,
+            vendor_id=1,
+            vendor="Dell",
+            model="Latitude",
+            location_type=LocationType.warehouse,
+            location_id=1,
+        )
+        for i, serial in enumerate(SERIALS)
+    ])
+    references.commit()
+    return client
+
+
+@pytest.mark.parametrize("search_mode", ["contains", "ranked"])
+@pytest.mark.parametrize("search, expected", [
+    ("b_1", ["AB_12"]),
+    ("0%o", ["50%OFF"]),
+    ("ab_", ["AB_12"]),
+    ("c:\\", ["C:\\X"]),
+])
+def test_like_wildcards_are_literal(assets, search, expected, search_mode):
+    response = assets.get("/api/v1/assets/", params={"search": search, "search_mode": search_mode})
+    assert response.status_code == 200
+    assert [a["serial_number"] for a in response.json()] == expected
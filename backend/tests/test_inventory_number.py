@@ -0,0 +1,127 @@
+import importlib.util
+import os
+
+import pytest
+from alembic.migration import MigrationContext
+from alembic.operations import Operations
+from sqlalchemy import event, text
+
+from app.core.inventory_number import reserve_inventory_numbers
+from app.models import Asset, InventoryNumberCounter
+from app.models.asset import LocationType
+
+MIGRATION = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+    "alembic", "versions", "e7b2c4a91f3d_inventory_number_counters.py",
+)
+
+
+def _add_asset(db, inventory_number: str, device_type_code: str = "01") -> None:
+    db.add(Asset(
+        company_code="WWP",
+        device_type_code=device_type_code,
+        inventory_number=inventory_number,
+        serial_number=f"SN-{inventory_number}",
+        vendor_id=1,
+        vendor="Dell",
+        model="Latitude",
+        location_type=LocationType.warehouse,
+        location_id=1,
+    ))
+    db.commit()
+
+
+def _counter(db, device_type_code: str = "01") -> int:
+    return db.query(InventoryNumberCounter.last_number).filter(
+        InventoryNumberCounter.company_code == "WWP",
+        InventoryNumberCounter.device_type_code == device_type_code,
+    ).scalar()
+
+
+def test_sequential_reservations(references):
+    db = references
+    numbers = []
+    for _ in range(3):
+        numbers.append(reserve_inventory_numbers(db, "WWP", "01"))
+        db.commit()
+
+    assert numbers == [1, 2, 3]
+    assert _counter(db) == 3
+
+
+def test_range_is_reserved_with_one_update(references):
+    db = references
+    reserve_inventory_numbers(db, "WWP", "01")
+    db.commit()
+
+    statements = []
+
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    engine = db.get_bind()
+    event.listen(engine, "before_cursor_execute", before_cursor_execute)
+    try:
+        last = reserve_inventory_numbers(db, "WWP", "01", count=5)
+    finally:
+        event.remove(engine, "before_cursor_execute", before_cursor_execute)
+    db.commit()
+
+    assert last == 6  # зарезервированы 2..6
+    assert len(statements) == 1
+    assert statements[0].lstrip().upper().startswith("UPDATE")
+    assert "RETURNING" in statements[0].upper()
+    assert reserve_inventory_numbers(db, "WWP", "01") == 7
+
+
+def test_first_reservation_seeds_counter_from_existing_assets(references):
+    db = references
+    _add_asset(db, "WWP-01/0042")
+    _add_asset(db, "WWP-01/0007")
+    _add_asset(db, "WWP-02/0100", device_type_code="02")
+    assert _counter(db) is None
+
+    assert reserve_inventory_numbers(db, "WWP", "01") == 43
+    db.commit()
+    assert _counter(db) == 43
+    assert _counter(db, "02") is None
+
+
+def test_first_reservation_for_empty_prefix_starts_at_one(references):
+    assert reserve_inventory_numbers(references, "WWP", "02", count=2) == 2
+
+
+def test_reservation_beyond_maximum_is_rejected(references):
+    db = references
+    _add_asset(db, "WWP-01/9998")
+
+    with pytest.raises(ValueError):
+        reserve_inventory_numbers(db, "WWP", "01", count=2)
+
+
+def _run_counter_migration(engine) -> None:
+    spec = importlib.util.spec_from_file_location("counter_migration", MIGRATION)
+    migration = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(migration)
+    with engine.begin() as conn:
+        conn.execute(text("DROP TABLE inventory_number_counters"))
+        with Operations.context(MigrationContext.configure(conn)):
+            migration.upgrade()
+
+
+@pytest.mark.postgres
+def test_migration_seeds_counters_from_max_existing_number(pg_engine, pg_references):
+    db = pg_references
+    for number in ("WWP-01/0005", "WWP-01/0120", "WWP-01/0031", "WWP-02/0009"):
+        _add_asset(db, number, device_type_code=number[4:6])
+    # Номер не по формату при сидировании пропускается
+    _add_asset(db, "WWP-01/12A4")
+    db.close()
+
+    _run_counter_migration(pg_engine)
+
+    assert _counter(db) == 120
+    assert _counter(db, "02") == 9
+    assert reserve_inventory_numbers(db, "WWP", "01") == 121
+    assert reserve_inventory_numbers(db, "WWP", "02", count=3) == 12
+    db.commit()
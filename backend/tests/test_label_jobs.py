@@ -0,0 +1,86 @@
+import os
+import time
+
+from app.config import settings
+from app.core import label_jobs
+
+
+def _write_job(status: str, age_seconds: float) -> str:
+    job_id = "a" * 32
+    label_jobs._write_state({"job_id": job_id, "status": status, "done": 0, "total": 10, "error": None})
+    stamp = time.time() - age_seconds
+    os.utime(label_jobs._state_path(job_id), (stamp, stamp))
+    return job_id
+
+
+def test_stale_running_job_is_marked_failed(tmp_path, monkeypatch):
+    monkeypatch.setattr(settings, "LABEL_JOBS_DIR", str(tmp_path))
+    job_id = _write_job("running", settings.LABEL_JOB_STALE_SECONDS + 60)
+
+    state = label_jobs.get_label_job(job_id)
+
+    assert state["status"] == "failed"
+    assert "interrupted" in state["error"]
+    assert label_jobs.get_label_job(job_id)["status"] == "failed"
+
+
+def test_recent_running_job_is_left_alone(tmp_path, monkeypatch):
+    monkeypatch.setattr(settings, "LABEL_JOBS_DIR", str(tmp_path))
+    job_id = _write_job("running", 5)
+
+    assert label_jobs.get_label_job(job_id)["status"] == "running"
+
+
+def _assets(count: int) -> list[dict]:
+    return [
+        {"id": i, "inventory_number": f"WWP-01/{i:04d}", "serial_number": f"SN{i}", "vendor": "Dell", "model": "Latitude"}
+        for i in range(count)
+    ]
+
+
+def _run_job(monkeypatch, tmp_path, count: int) -> tuple[dict, list[dict]]:
+    from concurrent.futures import ThreadPoolExecutor
+
+    monkeypatch.setattr(settings, "LABEL_JOBS_DIR", str(tmp_path))
+    monkeypatch.setattr(settings, "LABEL_JOB_BATCH_SIZE", 2)
+    executor = ThreadPoolExecutor(max_workers=2)
+    monkeypatch.setattr(label_jobs, "_get_executor", lambda: executor)
+    writes = []
+    write_state = label_jobs._write_state
+    monkeypatch.setattr(label_jobs, "_write_state", lambda state: (writes.append(dict(state)), write_state(state)))
+
+    state = {"job_id": "b" * 32, "status": "queued", "size": "30x20", "total": count, "done": 0, "error": None}
+    try:
+        label_jobs._run_label_job(state, _assets(count))
+    finally:
+        executor.shutdown()
+    return state, writes
+
+
+def test_job_merges_parts_in_order(tmp_path, monkeypatch):
+    from pypdf import PdfReader
+
+    state, writes = _run_job(monkeypatch, tmp_path, 5)
+
+    assert (state["status"], state["done"], state["error"]) == ("completed", 5, None)
+    pdf = PdfReader(label_jobs.label_job_pdf_path(state["job_id"]), strict=True)
+    assert [page.extract_text().split("\n")[1] for page in pdf.pages] == [f"WWP-01/{i:04d}" for i in range(5)]
+    # Состояние обновляется после каждой из трёх склеенных частей
+    assert len(writes) >= 1 + 3 + 1
+    assert sorted(os.listdir(tmp_path)) == [f"{state['job_id']}.json", f"{state['job_id']}.pdf"]
+
+
+def test_failed_part_removes_unfinished_files(tmp_path, monkeypatch):
+    render = label_jobs.render_label_batch
+
+    def render_or_fail(assets, size, path):
+        if assets[0]["id"] == 2:
+            raise RuntimeError("render failed")
+        render(assets, size, path)
+
+    monkeypatch.setattr(label_jobs, "render_label_batch", render_or_fail)
+
+    state, _ = _run_job(monkeypatch, tmp_path, 5)
+
+    assert (state["status"], state["error"]) == ("failed", "render failed")
+    assert os.listdir(tmp_path) == [f"{state['job_id']}.json"]
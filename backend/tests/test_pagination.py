@@ -0,0 +1,48 @@
+import base64
+import json
+from datetime import datetime
+
+import pytest
+
+from app.core.pagination import decode_cursor, decode_timestamp_cursor, encode_cursor, encode_timestamp_cursor
+
+
+def _raw_cursor(values) -> str:
+    return base64.urlsafe_b64encode(json.dumps(values).encode()).decode().rstrip("=")
+
+
+def test_round_trip():
+    assert decode_cursor(encode_cursor(["WWP-01/00001"]), (str,)) == ["WWP-01/00001"]
+    moment = datetime(2026, 10, 18, 12, 30, 5, 123456)
+    assert decode_timestamp_cursor(encode_timestamp_cursor(moment, 42)) == (moment, 42)
+
+
+@pytest.mark.parametrize("cursor", [
+    "not base64 !",
+    _raw_cursor({"v": 1}),
+    _raw_cursor([1]),
+    _raw_cursor([None]),
+    _raw_cursor([["WWP"]]),
+    _raw_cursor(["a", "b"]),
+])
+def test_invalid_key_cursor(cursor):
+    with pytest.raises(ValueError):
+        decode_cursor(cursor, (str,))
+
+
+@pytest.mark.parametrize("values", [
+    ["yesterday", 1],
+    ["2026-10-18T12:00:00", "1"],
+    ["2026-10-18T12:00:00", 1.5],
+    ["2026-10-18T12:00:00", True],
+    [1760000000, 1],
+])
+def test_invalid_timestamp_cursor(values):
+    with pytest.raises(ValueError):
+        decode_timestamp_cursor(_raw_cursor(values))
+
+
+def test_assets_list_rejects_cursor_with_wrong_value_type(client):
+    response = client.get("/api/v1/assets/", params={"limit": 10, "cursor": _raw_cursor([1])})
+    assert response.status_code == 400
+    assert response.json()["detail"] == "Invalid cursor"
@@ -0,0 +1,42 @@
+from io import BytesIO
+
+from pypdf import PdfReader
+from reportlab.pdfgen import canvas
+
+from app.core.pdf_stream import PdfConcatenator
+
+
+def _part(tag: str, pages: int) -> bytes:
+    output = BytesIO()
+    c = canvas.Canvas(output)
+    for i in range(pages):
+        c.drawString(72, 72, f"{tag}-{i}")
+        c.showPage()
+    c.save()
+    return output.getvalue()
+
+
+def test_parts_are_joined_in_order():
+    pdf = PdfConcatenator(title="Joined")
+    chunks = [pdf.header(), pdf.append(_part("a", 2)), pdf.append(BytesIO(_part("b", 3))), pdf.finish()]
+    data = b"".join(chunks)
+
+    reader = PdfReader(BytesIO(data), strict=True)
+
+    assert [page.extract_text().strip() for page in reader.pages] == ["a-0", "a-1", "b-0", "b-1", "b-2"]
+    assert reader.metadata.title == "Joined"
+    # Дерево страниц части не копируется, шрифт части — один раз на часть
+    assert data.count(b"/Type /Pages") == 1
+    assert data.count(b"/BaseFont") == 2
+
+
+def test_xref_offsets_point_at_objects():
+    pdf = PdfConcatenator()
+    data = pdf.header() + pdf.append(_part("a", 2)) + pdf.append(_part("b", 1)) + pdf.finish()
+
+    xref = int(data.rsplit(b"startxref\n", 1)[1].split()[0])
+    lines = data[xref:].split(b"\n")
+    size = int(lines[1].split()[1])
+    for number in range(1, size):
+        offset = int(lines[2 + number][:10])
+        assert data[offset:].startswith(b"%d 0 obj" % number)
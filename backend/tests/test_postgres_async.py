@@ -0,0 +1,114 @@
+import asyncio
+
+import httpx
+import pytest
+
+from app.models import Asset, InventoryResult, Movement
+from app.models.asset import LocationType
+
+# Горячие эндпоинты в режиме ASYNC_DATABASE_URL: DbRunner поверх AsyncSession (asyncpg),
+# сервисы выполняются через run_sync, NOTIFY уходит в той же транзакции
+pytestmark = pytest.mark.postgres
+
+
+def _add_assets(db, count: int) -> list[int]:
+    assets = [
+        Asset(
+            company_code="WWP",
+            device_type_code="01",
+            inventory_number=f"WWP-01/{i:04d}",
+            serial_number=f"SN{i}",
+            vendor_id=1,
+            vendor="Dell",
+            model="Latitude",
+            location_type=LocationType.warehouse,
+            location_id=1,
+        )
+        for i in range(1, count + 1)
+    ]
+    db.add_all(assets)
+    db.commit()
+    return [asset.id for asset in assets]
+
+
+def _open_session(client) -> int:
+    response = client.post("/api/v1/inventory/sessions", json={"description": "pg"})
+    assert response.status_code == 201, response.text
+    return response.json()["id"]
+
+
+def test_scan_records_result_once(pg_client, pg_references):
+    _add_assets(pg_references, 3)
+    session_id = _open_session(pg_client)
+
+    first = pg_client.post(f"/api/v1/inventory/sessions/{session_id}/scan", json={"payload": " wwp-01/0002 "})
+    again = pg_client.post(f"/api/v1/inventory/sessions/{session_id}/scan", json={"payload": "WWP-01/0002"})
+
+    assert first.status_code == 200, first.text
+    assert first.json()["status"] == "created"
+    assert (again.json()["status"], again.json()["result_id"]) == ("duplicate", None)
+    progress = pg_client.get(f"/api/v1/inventory/sessions/{session_id}/progress").json()
+    assert (progress["checked"], progress["found"], progress["total"]) == (1, 1, 3)
+    assert pg_references.query(InventoryResult).count() == 1
+
+
+def test_concurrent_scans_of_one_asset_create_one_result(pg_client, pg_references):
+    _add_assets(pg_references, 1)
+    session_id = _open_session(pg_client)
+
+    async def scan_many():
+        transport = httpx.ASGITransport(app=pg_client.app)
+        async with httpx.AsyncClient(
+            transport=transport, base_url="http://test", headers=dict(pg_client.headers)
+        ) as client:
+            return await asyncio.gather(*[
+                client.post(f"/api/v1/inventory/sessions/{session_id}/scan", json={"payload": "WWP-01/0001"})
+                for _ in range(10)
+            ])
+
+    responses = asyncio.run(scan_many())
+
+    assert [r.status_code for r in responses] == [200] * 10
+    assert sorted(r.json()["status"] for r in responses) == ["created"] + ["duplicate"] * 9
+    assert pg_references.query(InventoryResult).count() == 1
+    assert pg_client.get(f"/api/v1/inventory/sessions/{session_id}/progress").json()["checked"] == 1
+
+
+def test_batch_results(pg_client, pg_references):
+    asset_ids = _add_assets(pg_references, 3)
+    session_id = _open_session(pg_client)
+    items = [{"asset_id": asset_id, "found": True} for asset_id in asset_ids]
+
+    response = pg_client.post(
+        f"/api/v1/inventory/sessions/{session_id}/results/batch",
+        json={"items": items + [items[0], {"asset_id": 999, "found": False}]},
+    )
+
+    assert response.status_code == 200, response.text
+    body = response.json()
+    assert (body["created"], body["duplicates"], body["rejected"]) == (3, 1, 1)
+    assert pg_client.get(f"/api/v1/inventory/sessions/{session_id}/progress").json()["checked"] == 3
+
+
+def test_bulk_move_and_single_move(pg_client, pg_references):
+    asset_ids = _add_assets(pg_references, 3)
+
+    bulk = pg_client.post("/api/v1/move/bulk", json={"asset_ids": asset_ids[:2] + [999], "to_type": "employee", "to_id": 1})
+    single = pg_client.post("/api/v1/move/", json={"asset_id": asset_ids[2], "to_type": "employee", "to_id": 1})
+
+    assert bulk.status_code == 200, bulk.text
+    assert [item["status"] for item in bulk.json()["items"]] == ["moved", "moved", "not_found"]
+    assert single.status_code == 201, single.text
+    pg_references.expire_all()
+    assert {a.location_type for a in pg_references.query(Asset)} == {LocationType.employee}
+    assert pg_references.query(Movement).count() == 3
+
+
+def test_assets_keyset_pages(pg_client, pg_references):
+    _add_assets(pg_references, 5)
+
+    first = pg_client.get("/api/v1/assets/", params={"limit": 3})
+    second = pg_client.get("/api/v1/assets/", params={"limit": 3, "cursor": first.headers["X-Next-Cursor"]})
+
+    assert [a["inventory_number"] for a in first.json() + second.json()] == [f"WWP-01/{i:04d}" for i in range(1, 6)]
+    assert "X-Next-Cursor" not in second.headers
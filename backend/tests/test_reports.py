@@ -0,0 +1,81 @@
+from sqlalchemy import event
+
+from app.api.v1.reports import build_report_query, to_report_row
+from app.models import Asset
+from app.models.asset import LocationType
+
+
+def _add_assets(db, count: int) -> None:
+    # Половина у сотрудника, половина на складе — обе ветки LEFT JOIN
+    db.add_all([
+        Asset(
+            company_code="WWP",
+            device_type_code="01",
+            inventory_number=f"WWP-01/{i:05d}",
+            serial_number=f"SN{i}",
+            vendor_id=1,
+            vendor="Dell",
+            model="Latitude",
+            location_type=LocationType.employee if i % 2 else LocationType.warehouse,
+            location_id=1,
+        )
+        for i in range(count)
+    ])
+    db.commit()
+
+
+def _count_report_statements(db) -> int:
+    statements = []
+
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    engine = db.get_bind()
+    event.listen(engine, "before_cursor_execute", before_cursor_execute)
+    try:
+        rows = [to_report_row(row) for row in build_report_query(db)]
+    finally:
+        event.remove(engine, "before_cursor_execute", before_cursor_execute)
+    assert rows
+    return len(statements)
+
+
+def test_report_query_count_does_not_grow_with_assets(references):
+    db = references
+    _add_assets(db, 1)
+    single = _count_report_statements(db)
+
+    db.query(Asset).delete()
+    db.commit()
+    _add_assets(db, 50)
+    many = _count_report_statements(db)
+
+    assert single == many == 1
+
+
+def test_report_row_resolves_location_and_phone(references):
+    db = references
+    _add_assets(db, 2)
+
+    rows = [to_report_row(row) for row in build_report_query(db)]
+
+    assert [(r.location, r.phone) for r in rows] == [("Main", ""), ("Ann", "101")]
+    assert rows[0].device_type == "Laptop"
+
+
+def test_pdf_export_streams_all_pages(client, references):
+    from io import BytesIO
+    from pypdf import PdfReader
+    from app.api.v1 import reports
+
+    _add_assets(references, reports.PDF_ROWS_FIRST_PAGE + reports.PDF_ROWS_PER_PAGE * reports.PDF_PAGES_PER_PART + 1)
+
+    response = client.get("/api/v1/reports/export", params={"format": "pdf"})
+
+    assert response.status_code == 200
+    pdf = PdfReader(BytesIO(response.content), strict=True)
+    assert len(pdf.pages) == reports.PDF_PAGES_PER_PART + 2
+    assert pdf.metadata.title == "Assets Report"
+    first, last = pdf.pages[0].extract_text(), pdf.pages[-1].extract_text()
+    assert first.startswith("Assets Report") and "WWP-01/00000" in first
+    assert "Device Type" in last and "Serial" in last
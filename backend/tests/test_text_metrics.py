@@ -0,0 +1,30 @@
+import pytest
+from reportlab.pdfbase.pdfmetrics import stringWidth
+
+from app.core.labels import truncate_to_width
+from app.core.text_metrics import font_metrics, string_width
+
+TEXTS = ["", "WWP-01/00042", "Dell Latitude 5420", "SN: 5CG1234XYZ-ABC", "Склад №1", "µ€—"]
+FONTS = ["Helvetica", "Helvetica-Bold", "Courier"]
+
+
+@pytest.mark.parametrize("font_name", FONTS)
+@pytest.mark.parametrize("font_size", [5, 7.5, 12])
+@pytest.mark.parametrize("text", TEXTS)
+def test_cached_width_matches_reportlab(text, font_name, font_size):
+    assert string_width(text, font_name, font_size) == pytest.approx(stringWidth(text, font_name, font_size))
+
+
+def test_prefix_widths_match_reportlab():
+    text = "Dell Latitude 5420"
+    prefixes = font_metrics("Helvetica").prefix_widths(text, 8)
+    assert prefixes == pytest.approx([stringWidth(text[:i], "Helvetica", 8) for i in range(len(text) + 1)])
+
+
+def test_truncate_matches_char_by_char_trimming():
+    text, width = "Dell Latitude 5420 with a long model name", 60
+    expected = text
+    while stringWidth(expected + "...", "Helvetica", 8) > width:
+        expected = expected[:-1]
+
+    assert truncate_to_width(text, "Helvetica", 8, width) == expected + "..."
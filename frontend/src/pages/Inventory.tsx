@@ -1,14 +1,18 @@
-import { useState } from 'react';
+import { useEffect, useState } from 'react';
 import { useQuery, useMutation, useQueryClient } from '@tanstack/react-query';
 import { inventoryService } from '../services/inventory';
 import { assetsService } from '../services/assets';
 import { referencesService } from '../services/references';
-import { Asset, LocationType } from '../types';
+import { Asset, InventoryResult, LocationType } from '../types';
 import Card from '../components/common/Card';
 import Button from '../components/common/Button';
 import Input from '../components/common/Input';
 import Modal from '../components/common/Modal';
 
+// События results от сканеров сессии сводятся в одно перечитывание списков за это окно,
+// а не в запрос на каждое событие у каждого наблюдателя
+const LIST_REFETCH_WINDOW_MS = 2000;
+
 export default function Inventory() {
   const [currentSessionId, setCurrentSessionId] = useState<number | null>(null);
   const [scanNumber, setScanNumber] = useState('');
@@ -52,6 +56,52 @@ export default function Inventory() {
     enabled: !!currentSessionId,
   });
 
+  // Живые обновления: результаты других сканеров приходят событиями, без опроса
+  useEffect(() => {
+    if (!currentSessionId) return;
+    let refetchTimer: ReturnType<typeof setTimeout> | undefined;
+    const refetchLists = () => {
+      if (refetchTimer) return;
+      refetchTimer = setTimeout(() => {
+        refetchTimer = undefined;
+        queryClient.invalidateQueries({ queryKey: ['inventory-results', currentSessionId] });
+        queryClient.invalidateQueries({ queryKey: ['inventory-remaining', currentSessionId] });
+        queryClient.invalidateQueries({ queryKey: ['inventory-checked', currentSessionId] });
+      }, LIST_REFETCH_WINDOW_MS);
+    };
+
+    const unsubscribe = inventoryService.subscribeEvents(currentSessionId, {
+      onProgress: (data) => queryClient.setQueryData(['inventory-progress', currentSessionId], data),
+      onResults: (assetIds) => {
+        if (!assetIds) {
+          refetchLists();
+          return;
+        }
+        // Проверенные активы убираются из списка оставшихся прямо в кэше
+        const checked = new Set(assetIds);
+        queryClient.setQueryData<Asset[]>(
+          ['inventory-remaining', currentSessionId],
+          (remaining) => remaining?.filter((asset) => !checked.has(asset.id))
+        );
+        // Строк результатов в событии нет; свои сканы уже в кэше после мутации — перечитывать нечего
+        const known = new Set(
+          (queryClient.getQueryData<InventoryResult[]>(['inventory-results', currentSessionId]) ?? []).map((r) => r.asset_id)
+        );
+        if (assetIds.some((id) => !known.has(id))) {
+          refetchLists();
+        }
+      },
+      onCompleted: () => {
+        queryClient.invalidateQueries({ queryKey: ['inventory-sessions'] });
+        queryClient.invalidateQueries({ queryKey: ['inventory-session', currentSessionId] });
+      },
+    });
+    return () => {
+      clearTimeout(refetchTimer);
+      unsubscribe();
+    };
+  }, [currentSessionId, queryClient]);
+
   const { data: remainingAssets = [] } = useQuery({
     queryKey: ['inventory-remaining', currentSessionId],
     queryFn: () => inventoryService.getRemaining(currentSessionId!),
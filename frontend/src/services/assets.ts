@@ -9,11 +9,31 @@ export const assetsService = {
     location_type?: string;
     location_id?: number;
     search?: string;
+    search_mode?: 'contains' | 'ranked';
   }): Promise<Asset[]> {
     const response = await api.get<Asset[]>('/assets', { params });
     return response.data;
   },
 
+  async getPage(params: {
+    cursor?: string;
+    limit?: number;
+    include_total?: boolean;
+    device_type_code?: string;
+    location_type?: string;
+    location_id?: number;
+    search?: string;
+    search_mode?: 'contains' | 'ranked';
+  }): Promise<{ items: Asset[]; nextCursor: string | null; total: number | null }> {
+    const response = await api.get<Asset[]>('/assets', { params });
+    const total = response.headers['x-total-count'];
+    return {
+      items: response.data,
+      nextCursor: response.headers['x-next-cursor'] ?? null,
+      total: total !== undefined ? Number(total) : null,
+    };
+  },
+
   async getById(id: number): Promise<Asset> {
     const response = await api.get<Asset>(`/assets/${id}`);
     return response.data;
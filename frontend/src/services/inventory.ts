@@ -1,5 +1,13 @@
 import api from './api';
-import { InventorySession, InventoryResult, Asset } from '../types';
+import { InventorySession, InventoryResult, InventoryProgress, Asset } from '../types';
+
+export interface InventoryEventHandlers {
+  // Снимок при подключении и после resync; в событиях results — новые итоги
+  onProgress: (progress: InventoryProgress) => void;
+  // Добавлены результаты по assetIds; null — список не передан (большая пачка) или события потеряны
+  onResults: (assetIds: number[] | null) => void;
+  onCompleted: () => void;
+}
 
 export const inventoryService = {
   async createSession(data: { description?: string; device_type_codes?: string[] }): Promise<InventorySession> {
@@ -37,13 +45,35 @@ export const inventoryService = {
     return response.data;
   },
 
-  async getProgress(sessionId: number): Promise<{ session_id: number; checked: number; total: number; remaining: number }> {
-    const response = await api.get<{ session_id: number; checked: number; total: number; remaining: number }>(
-      `/inventory/sessions/${sessionId}/progress`
-    );
+  async getProgress(sessionId: number): Promise<InventoryProgress> {
+    const response = await api.get<InventoryProgress>(`/inventory/sessions/${sessionId}/progress`);
     return response.data;
   },
 
+  // Server-Sent Events по сессии вместо опроса progress/checked. Возвращает функцию отписки.
+  subscribeEvents(sessionId: number, handlers: InventoryEventHandlers): () => void {
+    // EventSource не умеет заголовки — токен передаётся в query string
+    const token = localStorage.getItem('access_token') || '';
+    const source = new EventSource(
+      `${api.defaults.baseURL}/inventory/sessions/${sessionId}/events?token=${encodeURIComponent(token)}`
+    );
+    source.addEventListener('progress', (e) => handlers.onProgress(JSON.parse((e as MessageEvent).data)));
+    source.addEventListener('results', (e) => {
+      const event = JSON.parse((e as MessageEvent).data);
+      handlers.onProgress(event.progress);
+      handlers.onResults(event.asset_ids ?? null);
+    });
+    source.addEventListener('resync', (e) => {
+      handlers.onProgress(JSON.parse((e as MessageEvent).data));
+      handlers.onResults(null);
+    });
+    source.addEventListener('completed', () => {
+      source.close();
+      handlers.onCompleted();
+    });
+    return () => source.close();
+  },
+
   async getRemaining(sessionId: number): Promise<Asset[]> {
     const response = await api.get<Asset[]>(`/inventory/sessions/${sessionId}/remaining`);
     return response.data;
@@ -13,7 +13,28 @@ export interface ReportData {
   rows: ReportRow[];
 }
 
+export interface SummaryBucket {
+  key: string;
+  name: string;
+  count: number;
+}
+
+export interface AssetSummary {
+  total: number;
+  by_device_type: SummaryBucket[];
+  by_company: SummaryBucket[];
+  by_location_type: SummaryBucket[];
+  by_warehouse: SummaryBucket[];
+  top_employees: SummaryBucket[];
+  computed_at: string;
+}
+
 export const reportsService = {
+  async getSummary(params?: { top_employees?: number }): Promise<AssetSummary> {
+    const response = await api.get<AssetSummary>('/reports/summary', { params });
+    return response.data;
+  },
+
   async getData(params?: {
     device_type_code?: string;
     employee_id?: number;
@@ -104,6 +104,15 @@ export interface InventorySession {
   device_type_codes?: string[];
 }
 
+export interface InventoryProgress {
+  session_id: number;
+  checked: number;
+  total: number;
+  remaining: number;
+  found: number;
+  not_found: number;
+}
+
 export interface InventoryResult {
   id: number;
   session_id: number;
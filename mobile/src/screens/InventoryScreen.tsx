@@ -9,7 +9,6 @@ import {
   ActivityIndicator,
 } from 'react-native';
 import { useQuery, useMutation, useQueryClient } from '@tanstack/react-query';
-import { assetsService } from '../services/assets';
 import { inventoryService } from '../services/inventory';
 import { InventorySession } from '../types';
 import BarcodeScanner from '../components/BarcodeScanner';
@@ -42,17 +41,6 @@ export default function InventoryScreen() {
     },
   });
 
-  const addResultMutation = useMutation({
-    mutationFn: ({ sessionId, assetId }: { sessionId: number; assetId: number }) =>
-      inventoryService.addResult(sessionId, {
-        asset_id: assetId,
-        found: true,
-      }),
-    onSuccess: () => {
-      Alert.alert('Success', 'Asset checked in inventory');
-    },
-  });
-
   const handleScan = async (data: string) => {
     if (!activeSession) {
       Alert.alert('Error', 'Please start an inventory session first');
@@ -62,11 +50,13 @@ export default function InventoryScreen() {
 
     setShowScanner(false);
     try {
-      const asset = await assetsService.scan(data);
-      addResultMutation.mutate({
-        sessionId: activeSession,
-        assetId: asset.id,
-      });
+      const result = await inventoryService.scan(activeSession, data);
+      Alert.alert(
+        'Success',
+        result.status === 'duplicate'
+          ? `${result.asset.inventory_number} already checked`
+          : 'Asset checked in inventory'
+      );
     } catch (error: any) {
       Alert.alert('Error', error.response?.data?.detail || 'Asset not found');
     }
@@ -1,5 +1,5 @@
 import { getApi } from './api';
-import { InventorySession, InventoryResult } from '../types';
+import { InventorySession, InventoryResult, InventoryResultBatchResponse, InventoryScanResult } from '../types';
 
 export const inventoryService = {
   async createSession(data: { description?: string }): Promise<InventorySession> {
@@ -30,5 +30,26 @@ export const inventoryService = {
     const response = await api.post<InventoryResult>(`/inventory/sessions/${sessionId}/results`, data);
     return response.data;
   },
-};
 
+  // Скан QR кода: поиск актива и запись результата одним запросом
+  async scan(sessionId: number, payload: string): Promise<InventoryScanResult> {
+    const api = await getApi();
+    const response = await api.post<InventoryScanResult>(`/inventory/sessions/${sessionId}/scan`, { payload });
+    return response.data;
+  },
+
+  // Накопленные офлайн сканы одним запросом (до 1000 штук)
+  async addResultsBatch(sessionId: number, items: {
+    asset_id: number;
+    found: boolean;
+    actual_location_type?: string;
+    actual_location_id?: number;
+  }[]): Promise<InventoryResultBatchResponse> {
+    const api = await getApi();
+    const response = await api.post<InventoryResultBatchResponse>(
+      `/inventory/sessions/${sessionId}/results/batch`,
+      { items },
+    );
+    return response.data;
+  },
+};
@@ -1,29 +1,40 @@
 import { getApi } from './api';
 import { Company, DeviceType, Warehouse, Employee } from '../types';
 
+// Последний ответ по ETag: сервер отвечает 304 без тела, если справочник не менялся
+const etagCache = new Map<string, { etag: string; data: unknown }>();
+
+async function getWithEtag<T>(url: string): Promise<T> {
+  const api = await getApi();
+  const cached = etagCache.get(url);
+  const response = await api.get<T>(url, {
+    headers: cached ? { 'If-None-Match': cached.etag } : undefined,
+    validateStatus: (status) => (status >= 200 && status < 300) || status === 304,
+  });
+  if (response.status === 304 && cached) {
+    return cached.data as T;
+  }
+  const etag = response.headers['etag'];
+  if (etag) {
+    etagCache.set(url, { etag, data: response.data });
+  }
+  return response.data;
+}
+
 export const referencesService = {
   async getCompanies(): Promise<Company[]> {
-    const api = await getApi();
-    const response = await api.get<Company[]>('/references/companies');
-    return response.data;
+    return getWithEtag<Company[]>('/references/companies');
   },
 
   async getDeviceTypes(): Promise<DeviceType[]> {
-    const api = await getApi();
-    const response = await api.get<DeviceType[]>('/references/device-types');
-    return response.data;
+    return getWithEtag<DeviceType[]>('/references/device-types');
   },
 
   async getWarehouses(): Promise<Warehouse[]> {
-    const api = await getApi();
-    const response = await api.get<Warehouse[]>('/references/warehouses');
-    return response.data;
+    return getWithEtag<Warehouse[]>('/references/warehouses');
   },
 
   async getEmployees(): Promise<Employee[]> {
-    const api = await getApi();
-    const response = await api.get<Employee[]>('/references/employees');
-    return response.data;
+    return getWithEtag<Employee[]>('/references/employees');
   },
 };
-
@@ -0,0 +1,14 @@
+import { getApi } from './api';
+import { SyncResponse } from '../types';
+
+export const syncService = {
+  // Изменения с момента token (без token — полная выгрузка).
+  // Применить upserted, затем deleted; при has_more сразу вызвать снова с новым token.
+  async pull(token?: string | null): Promise<SyncResponse> {
+    const api = await getApi();
+    const response = await api.get<SyncResponse>('/sync', {
+      params: token ? { since: token } : undefined,
+    });
+    return response.data;
+  },
+};
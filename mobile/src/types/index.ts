@@ -82,6 +82,48 @@ export interface InventoryResult {
   confirmed_at: string;
 }
 
+export interface InventoryScanResult {
+  status: 'created' | 'duplicate';
+  result_id?: number | null;
+  asset: Asset;
+}
+
+export interface InventoryResultOutcome {
+  asset_id: number;
+  status: 'created' | 'duplicate' | 'not_found' | 'out_of_scope';
+  result_id?: number | null;
+}
+
+export interface InventoryResultBatchResponse {
+  session_id: number;
+  created: number;
+  duplicates: number;
+  rejected: number;
+  items: InventoryResultOutcome[];
+}
+
+export interface Vendor {
+  id: number;
+  name: string;
+}
+
+export interface SyncChanges<T> {
+  upserted: T[];
+  deleted: number[];
+}
+
+export interface SyncResponse {
+  token: string;
+  has_more: boolean;
+  reset: boolean;
+  companies: SyncChanges<Company>;
+  device_types: SyncChanges<DeviceType>;
+  vendors: SyncChanges<Vendor>;
+  employees: SyncChanges<Employee>;
+  warehouses: SyncChanges<Warehouse>;
+  assets: SyncChanges<Asset>;
+}
+
 export interface Token {
   access_token: string;
   token_type: string;